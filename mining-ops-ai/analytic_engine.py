@@ -0,0 +1,90 @@
+import numpy as np
+
+# Default faktor muatan & probabilitas delay, sama dengan fallback heuristik
+# di simulator.truck_process_hybrid ketika prediksi ML tidak tersedia.
+LOAD_FACTOR = 0.87
+DEFAULT_DELAY_PROBABILITY = 0.05
+
+
+def simulate_shift_batch(num_trucks, num_excavators, distance_km, slot_capacity, slot_fuel_rate, slot_maint_rate,
+                         calibrated_params, speed_factor=1.0, loading_factor=1.0, duration_hours=8.0,
+                         load_factor=LOAD_FACTOR, delay_probability=DEFAULT_DELAY_PROBABILITY):
+    """
+    Mesin analitik (tanpa SimPy) untuk menghitung satu shift banyak skenario sekaligus.
+
+    Setiap skenario s memakai num_trucks[s] truk pertama dari armada (slot k = truk
+    ke-k, sama dengan urutan alokasi di run_hybrid_simulation) dan num_excavators[s]
+    excavator sebagai server antrian bersama.
+
+    Antrian excavator dimodelkan sebagai bottleneck deterministik:
+      - Semua truk berangkat bersamaan, sehingga pada siklus pertama truk ke-k
+        menunggu floor(k / c) * waktu_loading.
+      - Jika ceil(N / c) * waktu_loading <= waktu siklus tanpa antrian, excavator
+        tidak jenuh dan tidak ada antrian lagi setelah siklus pertama.
+      - Jika tidak, excavator jenuh: throughput dibatasi c / waktu_loading siklus
+        per jam dan tiap truk menunggu N * L / c - siklus_dasar per siklus.
+
+    Args:
+        num_trucks, num_excavators, distance_km: array (S,) per skenario.
+        slot_capacity, slot_fuel_rate, slot_maint_rate: array (K,) atribut truk per slot,
+            K >= max(num_trucks).
+        calibrated_params: dict hasil calibrate_simulation_parameters.
+        speed_factor, loading_factor: skalar dari simulator.get_speed_factors.
+
+    Returns:
+        Dict berisi array (S,) dengan kunci yang sama seperti metrik run_hybrid_simulation.
+    """
+    N = np.asarray(num_trucks, dtype=np.int64)
+    c = np.maximum(np.asarray(num_excavators, dtype=np.int64), 1)
+    d = np.asarray(distance_km, dtype=np.float64)
+    H = float(duration_hours)
+
+    k_max = int(N.max()) if N.size else 0
+    cap = np.asarray(slot_capacity, dtype=np.float64)[:k_max]
+    fuel_rate = np.asarray(slot_fuel_rate, dtype=np.float64)[:k_max]
+    maint_rate = np.asarray(slot_maint_rate, dtype=np.float64)[:k_max]
+
+    haul = d / (calibrated_params['avg_hauling_speed_kmh'] * speed_factor)
+    ret = d / (calibrated_params['avg_return_speed_kmh'] * speed_factor)
+    load_t = (calibrated_params['avg_loading_time_min'] * loading_factor) / 60.0
+    dump_t = calibrated_params['avg_dumping_time_min'] / 60.0
+    base_cycle = haul + load_t + ret + dump_t
+
+    k = np.arange(k_max)[None, :]
+    mask = k < N[:, None]
+    stagger = np.floor(k / c[:, None]) * load_t
+    stagger = np.where(mask, stagger, 0.0)
+
+    # Excavator tidak jenuh: tiap truk hanya tertunda di siklus pertama
+    cycles_free = np.floor((H - stagger) / base_cycle[:, None])
+    cycles_free = np.where(mask, np.maximum(cycles_free, 0.0), 0.0)
+
+    # Excavator jenuh: total siklus dibatasi kapasitas loading
+    rounds = np.ceil(N / c)
+    saturated = rounds * load_t > base_cycle
+    loads_per_server = np.maximum(np.floor((H - haul - ret - dump_t) / load_t), 0.0)
+    total_saturated = np.minimum(c * loads_per_server, cycles_free.sum(axis=1))
+    cycles_saturated = np.where(mask, (total_saturated / np.maximum(N, 1))[:, None], 0.0)
+
+    cycles = np.where(saturated[:, None], cycles_saturated, cycles_free)
+    total_cycles = cycles.sum(axis=1)
+
+    first_wait = np.where(haul[:, None] + stagger < H, stagger, 0.0).sum(axis=1)
+    steady_wait = np.where(saturated, np.maximum(N * load_t / c - base_cycle, 0.0), 0.0)
+    total_wait = first_wait + np.maximum(total_cycles - N, 0.0) * steady_wait
+
+    avg_cycle = base_cycle + np.where(total_cycles > 0, total_wait / np.maximum(total_cycles, 1e-9), 0.0)
+
+    return {
+        'total_tonase': (cycles * cap[None, :]).sum(axis=1) * load_factor,
+        'total_bbm_liter': (cycles * fuel_rate[None, :]).sum(axis=1) * d * 2,
+        'jumlah_siklus_selesai': total_cycles,
+        'total_waktu_antri_jam': total_wait,
+        'total_probabilitas_delay': total_cycles * delay_probability,
+        'total_cycle_time_hours': total_cycles * base_cycle + total_wait,
+        'total_maintenance_cost': (cycles * maint_rate[None, :]).sum(axis=1) * avg_cycle,
+        'total_loading_time_hours': total_cycles * load_t,
+        'total_dumping_time_hours': total_cycles * dump_t,
+        'total_hauling_time_hours': total_cycles * haul,
+        'total_return_time_hours': total_cycles * ret
+    }
@@ -5,45 +5,110 @@ import pandas as pd
 import os
 import uuid
 import re
+import queue
+import asyncio
+import threading
+from itertools import product
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
 
 # --- 1. IMPOR "OTAK" AI DARI SIMULATOR.PY ---
-# Ini akan memuat model ML dan database ke memori saat server start
-try:
-    from simulator import (
-        CONFIG,
-        get_strategic_recommendations,
-        format_konteks_for_llm,
-        LLM_PROVIDER,
-        OLLAMA_MODEL,
-        load_fresh_data,
-        analyze_hauling_for_production,
-        get_hauling_based_recommendations,
-        get_recommendations_with_allocations,
-        generate_dynamic_hauling_allocation
-    )
-    print("✅ Berhasil mengimpor 'otak' dari simulator.py")
-except ImportError as e:
-    print(f"❌ ERROR CRITICAL: Gagal mengimpor dari 'simulator.py'.")
-    print(f"Pastikan file 'simulator.py' ada di folder yang sama.")
-    print(f"Detail Error: {e}")
-    exit()
-except Exception as e:
-    print(f"❌ ERROR saat inisialisasi simulator: {e}")
-    exit()
-
-from chatbot import execute_and_summarize
+# Import simulator tidak memuat model/data; keduanya di-warmup di background
+# setelah server start (lihat WARMUP di bawah dan endpoint /ready)
+import simulator
+from simulator import (
+    CONFIG,
+    get_strategic_recommendations,
+    format_konteks_for_llm,
+    OLLAMA_MODEL,
+    get_data_snapshot,
+    DATA_SNAPSHOT,
+    ensure_ml_models,
+    check_llm_provider,
+    analyze_hauling_for_production,
+    get_hauling_based_recommendations,
+    get_recommendations_with_allocations,
+    generate_dynamic_hauling_allocation,
+    reprice_physical_results
+)
+from physical_store import condition_key
+from feature_store import get_feature_store
+from warmup import WarmupManager
+from sweep_executor import shutdown_pool
+from sweep_progress import SweepProgress, SweepCancelled
+from job_manager import JobManager, JobQueueFull
+
+# Batas titik harga per request /reprice_strategies
+REPRICE_MAX_POINTS = int(os.getenv("REPRICE_MAX_POINTS", "1000"))
+
+# Interval polling event sweep / deteksi disconnect pada endpoint streaming (detik)
+STREAM_POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", "0.2"))
+
+# Warmup dijalankan otomatis saat startup (set 0 untuk menunda sampai /ready dipanggil)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") != "0"
+
+# Fungsi chatbot diisi oleh warmup (import chatbot ditunda)
+CHATBOT = {}
+
+def _warm_llm():
+    if check_llm_provider() != "ollama":
+        raise RuntimeError("Ollama tidak terhubung")
+
+def _warm_models():
+    # Tanpa artefak model (gitignored) simulasi tetap jalan heuristik (lihat ensure_ml_models)
+    if not ensure_ml_models():
+        raise RuntimeError(f"model ML tidak tersedia, simulasi memakai heuristik: {simulator.MODEL_LOAD_ERROR}")
+
+def _warm_chatbot():
+    from chatbot import execute_and_summarize
+    CHATBOT['execute_and_summarize'] = execute_and_summarize
+
+WARMUP = WarmupManager()
+WARMUP.register('models', _warm_models, optional=True)
+WARMUP.register('data_snapshot', get_data_snapshot)
+WARMUP.register('feature_store', lambda: get_feature_store(get_data_snapshot()), depends_on=['data_snapshot'])
+WARMUP.register('llm', _warm_llm, optional=True)
+WARMUP.register('chatbot', _warm_chatbot, optional=True)
+
+# Job simulasi asinkron (/jobs): pool terbatas, antrian, timeout, hasil di SQLite dengan TTL
+JOBS = JobManager()
+
+# Komponen yang dibutuhkan endpoint simulasi ('models' optional: tanpa model simulasi jalan heuristik)
+SIMULATION_COMPONENTS = ('data_snapshot', 'feature_store')
+
+def require_ready(*components):
+    """503 (dengan Retry-After) jika komponen yang dibutuhkan endpoint belum siap."""
+    missing = WARMUP.missing(*components)
+    if missing:
+        # Komponen yang gagal disertai alasannya (mis. Ollama tidak terhubung)
+        errors = {name: c['error'] for name, c in WARMUP.status()['components'].items() if c['error']}
+        detail = ', '.join(f"{name} ({errors[name]})" if name in errors else name for name in missing)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server masih warmup, komponen belum siap: {detail}",
+            headers={"Retry-After": "5"}
+        )
+
+@asynccontextmanager
+async def lifespan(app):
+    if WARMUP_ON_STARTUP:
+        print("\n--- INITIALIZING SYSTEM (v3.1 - Dynamic Data) ---")
+        WARMUP.start()
+    yield
+    JOBS.shutdown()
+    shutdown_pool()
 
 # --- 2. INISIALISASI APLIKASI API ---
 app = FastAPI(
     title="Mining Ops AI API",
     description="Backend API untuk simulasi tambang hybrid, logistik kapal, dan chatbot KTT (Ollama).",
-    version="3.1.0"
+    version="3.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS for Cloudflare Tunnel access
@@ -86,6 +151,7 @@ class FixedConditions(BaseModel):
     simulation_start_date: Optional[str] = Field(None, description="Tanggal mulai simulasi (ISO 8601)")
     totalProductionTarget: Optional[float] = Field(0, description="Target Produksi Batubara (Ton)")
     miningSiteId: Optional[str] = Field(None, description="ID Mining Site yang dipilih user")
+    dispatch_policy: Optional[str] = Field(None, description="Dispatch truk ke excavator: 'pooled' (default, satu antrian gabungan), 'fixed', 'shortest_queue' atau 'min_expected_wait' (resource per excavator, durasi loading dari bucketCapacity)")
 
 # Model untuk Variabel Keputusan
 class DecisionVariables(BaseModel):
@@ -94,6 +160,30 @@ class DecisionVariables(BaseModel):
     min_excavators: int = Field(1, ge=1, le=20, description="Minimum number of excavators to test")
     max_excavators: int = Field(3, ge=1, le=20, description="Maximum number of excavators to test")
 
+# Model untuk Opsi Mesin Simulasi
+class SimulationOptions(BaseModel):
+    """Opsi mesin pencarian strategi (Opsional)"""
+    screening_mode: str = Field("none", description="'none' = sweep SimPy biasa, 'analytic' = screening NumPy cepat lalu verifikasi SimPy; diabaikan (sweep_report.screening = 'ignored') untuk search_mode 'surrogate'/'metamodel'")
+    screening_top_k: int = Field(30, ge=1, le=300, description="Jumlah kandidat teratas per objektif yang diverifikasi dengan SimPy")
+    screening_max_candidates: int = Field(20000, ge=1, le=200000, description="Batas jumlah kombinasi yang di-screening")
+    workers: Optional[int] = Field(None, ge=1, le=64, description="Jumlah proses worker untuk sweep skenario (default: SWEEP_WORKERS server)")
+    engine: Optional[str] = Field(None, description="Mesin simulasi: 'simpy', 'kernel' (heap event khusus) atau 'lockstep' (banyak skenario sekaligus sebagai array); hasil identik, default: SIM_ENGINE server")
+    search_mode: str = Field("exhaustive", description="'exhaustive' = semua skenario 8 jam, 'successive_halving' = horizon pendek dulu, hanya kandidat terbaik disimulasikan penuh, 'surrogate' = random forest + expected improvement dengan budget simulasi, 'metamodel' = ranking instan dari metamodel offline")
+    sh_min_hours: float = Field(1.0, gt=0, le=8, description="Horizon simulasi rung pertama successive halving (jam)")
+    sh_eta: int = Field(3, ge=2, le=10, description="Faktor reduksi per rung: 1/eta kandidat terbaik naik ke horizon eta kali lebih panjang")
+    sh_replications: int = Field(2, ge=1, le=10, description="Jumlah replikasi independen untuk finalis di horizon penuh")
+    surrogate_budget: int = Field(40, ge=1, le=300, description="Maksimum jumlah simulasi pada mode surrogate")
+    surrogate_init: int = Field(12, ge=1, le=100, description="Jumlah skenario acak awal sebelum surrogate dipakai")
+    surrogate_batch: int = Field(4, ge=1, le=32, description="Jumlah skenario yang disimulasikan per iterasi surrogate")
+    metamodel_verify_top: int = Field(3, ge=0, le=20, description="Kandidat teratas per objektif yang diverifikasi dengan simulator pada mode metamodel (0 = tanpa verifikasi)")
+    replications: int = Field(1, ge=1, le=50, description="Maksimum replikasi Monte Carlo per skenario (1 = satu run; >1 = replikasi sekuensial dengan interval kepercayaan)")
+    replication_min: int = Field(3, ge=2, le=50, description="Replikasi minimum sebelum kriteria berhenti diperiksa")
+    replication_precision: float = Field(0.02, gt=0, le=1, description="Setengah lebar CI relatif terhadap mean yang dianggap cukup presisi")
+    replication_confidence: float = Field(0.95, gt=0.5, lt=1, description="Tingkat kepercayaan interval")
+    replication_top_k: int = Field(5, ge=1, le=50, description="Skenario berhenti direplikasi jika CI-nya jelas di luar top-k")
+    seed: Optional[int] = Field(None, ge=0, description="Seed sweep: sampling kandidat dan stream acak per truk reproducible (request + seed sama = hasil identik)")
+    record_events: bool = Field(False, description="Simulasi ulang strategi terpilih dengan log event per fase dan lampirkan CYCLE_BREAKDOWN (utilisasi per truk, distribusi waktu antri, fraksi sibuk excavator)")
+
 # Model Request Utama (Simulasi)
 class RecommendationRequest(BaseModel):
     """Payload utama untuk Endpoint Strategi"""
@@ -101,6 +191,24 @@ class RecommendationRequest(BaseModel):
     decision_variables: DecisionVariables
     # Opsional: Jika user tidak mengirim ini, server pakai default
     financial_params: Optional[FinancialParams] = None 
+    simulation_options: Optional[SimulationOptions] = None
+
+# Model Request Job Asinkron
+class StrategyJobRequest(RecommendationRequest):
+    """Payload POST /jobs/strategies (sama dengan endpoint strategi + varian & timeout)"""
+    variant: str = Field("top_3", description="'top_3' = /get_top_3_strategies, 'hauling' = /get_strategies_with_hauling, 'allocations' = /get_strategies_with_allocations")
+    timeout_seconds: Optional[float] = Field(None, gt=0, description="Batas waktu job (default: JOB_TIMEOUT_SECONDS server)")
+
+# Model Request Re-pricing (what-if finansial tanpa simulasi ulang)
+class RepriceRequest(BaseModel):
+    """Payload untuk re-ranking hasil fisik sweep tersimpan dengan parameter finansial baru"""
+    physical_key: Optional[str] = Field(None, description="sweep_report.physical_key dari response strategi")
+    fixed_conditions: Optional[FixedConditions] = Field(None, description="Alternatif physical_key: kondisi sweep sebelumnya")
+    decision_variables: Optional[DecisionVariables] = None
+    financial_params: Optional[FinancialParams] = Field(None, description="Parameter dasar (default: parameter saat sweep)")
+    price_points: Optional[List[Dict[str, float]]] = Field(None, description="Daftar override parameter, mis. [{'HargaSolar': 17000}]")
+    price_grid: Optional[Dict[str, List[float]]] = Field(None, description="Grid sensitivitas (kombinasi semua nilai), mis. {'HargaSolar': [14000, 16000]}")
+    top_k: int = Field(5, ge=1, le=50, description="Jumlah skenario profit tertinggi per titik harga")
 
 # Model Request Chatbot
 class ChatRequest(BaseModel):
@@ -125,6 +233,105 @@ class NewSchedule(BaseModel):
     plannedQuantity: float
     buyer: str
 
+def get_simulation_options(request: RecommendationRequest):
+    """Opsi mesin simulasi dari request, atau None untuk perilaku default."""
+    if request.simulation_options is None:
+        return None
+    return request.simulation_options.dict()
+
+def format_strategies_response(top_3_list, data, with_hauling=False, with_allocations=False):
+    """Format top-3 untuk response endpoint strategi (biasa maupun streaming)."""
+    formatted_json_str = format_konteks_for_llm(top_3_list, data)
+    formatted_data = json.loads(formatted_json_str)
+    
+    for i, strategy in enumerate(formatted_data):
+        key = f"OPSI_{i+1}"
+        if key in strategy and i < len(top_3_list):
+            raw_strategy = top_3_list[i]
+            
+            if with_allocations:
+                # Add hauling allocations
+                strategy[key]['HAULING_ALLOCATIONS'] = raw_strategy.get('hauling_allocations', [])
+                strategy[key]['ALLOCATION_SUMMARY'] = raw_strategy.get('allocation_summary', {})
+            
+            if with_hauling or with_allocations:
+                strategy[key]['HAULING_DATA'] = {
+                    'has_hauling_data': raw_strategy.get('has_hauling_data', False),
+                    'hauling_activity_count': raw_strategy.get('hauling_activity_count', 0),
+                    'hauling_analysis': raw_strategy.get('hauling_analysis', {})
+                }
+            
+            if 'cycle_breakdown' in raw_strategy:
+                strategy[key]['CYCLE_BREAKDOWN'] = raw_strategy['cycle_breakdown']
+    return formatted_data
+
+def run_strategy_sweep(request, recommend, progress, with_hauling=False, with_allocations=False):
+    """Jalankan sweep strategi dengan SweepProgress (streaming / job). Returns top_3_strategies terformat."""
+    if request.financial_params:
+        active_financial_params = request.financial_params.dict()
+    else:
+        active_financial_params = CONFIG['financial_params']
+    data = get_data_snapshot()
+    options = get_simulation_options(request) or {}
+    options['progress'] = progress
+    top_3_list = recommend(
+        request.fixed_conditions.dict(),
+        request.decision_variables.dict(),
+        active_financial_params,
+        options,
+        data
+    )
+    if not top_3_list:
+        raise RuntimeError("Simulasi selesai tapi tidak menghasilkan rekomendasi valid.")
+    progress.step("formatting", "Menyusun hasil strategi")
+    return format_strategies_response(top_3_list, data, with_hauling, with_allocations)
+
+def stream_strategy_sweep(request, http_request, recommend, endpoint, with_hauling=False, with_allocations=False):
+    """
+    Versi streaming endpoint strategi (NDJSON). Sweep berjalan di thread terpisah,
+    event dari SweepProgress diteruskan per baris:
+      start -> step/progress/provisional ... -> result (payload sama dengan endpoint biasa)
+    atau error / cancelled. Jika client disconnect, sweep dibatalkan agar tidak
+    terus memakai CPU.
+    """
+    events = queue.Queue()
+    tracker = SweepProgress(events.put)
+    
+    def run():
+        try:
+            formatted_data = run_strategy_sweep(request, recommend, tracker, with_hauling, with_allocations)
+            events.put({"type": "result", "top_3_strategies": formatted_data})
+        except SweepCancelled:
+            print(f"   🛑 Sweep /{endpoint}/stream dibatalkan (client disconnect)")
+            events.put({"type": "cancelled", "message": "Sweep dibatalkan"})
+        except Exception as e:
+            print(f"❌ Error di /{endpoint}/stream: {str(e)}")
+            events.put({"type": "error", "message": f"Internal Server Error: {str(e)}"})
+        finally:
+            events.put(None)
+    
+    async def generate():
+        worker = threading.Thread(target=run, name=f"sweep-stream-{endpoint}", daemon=True)
+        worker.start()
+        try:
+            yield json.dumps({"type": "start", "endpoint": endpoint}) + "\n"
+            while True:
+                try:
+                    event = events.get_nowait()
+                except queue.Empty:
+                    if await http_request.is_disconnected():
+                        return
+                    await asyncio.sleep(STREAM_POLL_SECONDS)
+                    continue
+                if event is None:
+                    return
+                yield json.dumps(simulator._json_safe(event)) + "\n"
+        finally:
+            # Selesai, disconnect, atau generator ditutup server: hentikan sweep yang masih berjalan
+            tracker.cancel()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 # --- 4. ENDPOINT API UTAMA ---
 
 @app.get("/")
@@ -137,12 +344,27 @@ def health_check():
         "status": "healthy",
         "service": "Mining Ops AI",
         "version": "3.1.0",
-        "llm_provider": LLM_PROVIDER,
+        "llm_provider": simulator.LLM_PROVIDER,
+        "data_snapshot": DATA_SNAPSHOT.info(),
+        "scenario_cache": simulator.SCENARIO_CACHE.stats(),
+        "jobs": JOBS.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/ready")
+def readiness_check():
+    """Status warmup per komponen. 200 jika komponen inti siap (models/llm/chatbot optional), 503 jika belum."""
+    status = WARMUP.status()
+    if status['uptime_seconds'] is None:
+        # Warmup belum dimulai (WARMUP_ON_STARTUP=0): mulai sekarang
+        WARMUP.start()
+        status = WARMUP.status()
+    status['timestamp'] = datetime.now().isoformat()
+    return JSONResponse(status_code=200 if status['ready'] else 503, content=status)
+
 @app.post("/get_top_3_strategies")
 async def dapatkan_rekomendasi_strategis(request: RecommendationRequest):
+    require_ready(*SIMULATION_COMPONENTS)
     try:
         print(f"📡 Menerima request strategi baru...")
         
@@ -154,16 +376,18 @@ async def dapatkan_rekomendasi_strategis(request: RecommendationRequest):
             active_financial_params = CONFIG['financial_params']
             print("   ℹ️ Menggunakan Parameter Finansial Default Server")
         
+        # Satu snapshot data untuk seluruh request (simulasi + format konteks)
+        data = get_data_snapshot()
         top_3_list = get_strategic_recommendations(
             request.fixed_conditions.dict(),
             request.decision_variables.dict(),
-            active_financial_params 
+            active_financial_params,
+            get_simulation_options(request),
+            data
         )
         
         if top_3_list:
-            data = load_fresh_data()
-            formatted_json_str = format_konteks_for_llm(top_3_list, data)
-            formatted_data = json.loads(formatted_json_str)
+            formatted_data = format_strategies_response(top_3_list, data)
             
             return {"top_3_strategies": formatted_data}
         else:
@@ -180,6 +404,7 @@ async def dapatkan_strategi_dengan_hauling(request: RecommendationRequest):
     ENDPOINT ENHANCED: Get AI strategies WITH matching hauling activity data.
     This enables production creation from REAL hauling data instead of simulations only.
     """
+    require_ready(*SIMULATION_COMPONENTS)
     try:
         print(f"📡 Menerima request strategi dengan integrasi hauling...")
         
@@ -190,27 +415,19 @@ async def dapatkan_strategi_dengan_hauling(request: RecommendationRequest):
             active_financial_params = CONFIG['financial_params']
         
         # Use enhanced function that includes hauling analysis
+        # Satu snapshot data untuk seluruh request (simulasi + format konteks)
+        data = get_data_snapshot()
         top_3_list = get_hauling_based_recommendations(
             request.fixed_conditions.dict(),
             request.decision_variables.dict(),
-            active_financial_params 
+            active_financial_params,
+            get_simulation_options(request),
+            data
         )
         
         if top_3_list:
-            data = load_fresh_data()
-            formatted_json_str = format_konteks_for_llm(top_3_list, data)
-            formatted_data = json.loads(formatted_json_str)
-            
             # Add hauling analysis to each strategy in the response
-            for i, strategy in enumerate(formatted_data):
-                key = f"OPSI_{i+1}"
-                if key in strategy and i < len(top_3_list):
-                    raw_strategy = top_3_list[i]
-                    strategy[key]['HAULING_DATA'] = {
-                        'has_hauling_data': raw_strategy.get('has_hauling_data', False),
-                        'hauling_activity_count': raw_strategy.get('hauling_activity_count', 0),
-                        'hauling_analysis': raw_strategy.get('hauling_analysis', {})
-                    }
+            formatted_data = format_strategies_response(top_3_list, data, with_hauling=True)
             
             return {"top_3_strategies": formatted_data}
         else:
@@ -236,6 +453,7 @@ async def dapatkan_strategi_dengan_alokasi(request: RecommendationRequest):
         - excavatorOperatorId (optional, filtered by OPERATOR_ALAT_BERAT license)
     - allocation_summary: Summary of allocated resources
     """
+    require_ready(*SIMULATION_COMPONENTS)
     try:
         print(f"📡 Menerima request strategi dengan hauling allocations...")
         
@@ -246,33 +464,19 @@ async def dapatkan_strategi_dengan_alokasi(request: RecommendationRequest):
             active_financial_params = CONFIG['financial_params']
         
         # Get recommendations with pre-computed allocations
+        # Satu snapshot data untuk seluruh request (simulasi + format konteks)
+        data = get_data_snapshot()
         top_3_list = get_recommendations_with_allocations(
             request.fixed_conditions.dict(),
             request.decision_variables.dict(),
-            active_financial_params 
+            active_financial_params,
+            get_simulation_options(request),
+            data
         )
         
         if top_3_list:
-            data = load_fresh_data()
-            formatted_json_str = format_konteks_for_llm(top_3_list, data)
-            formatted_data = json.loads(formatted_json_str)
-            
-            # Add hauling allocations to each strategy in the response
-            for i, strategy in enumerate(formatted_data):
-                key = f"OPSI_{i+1}"
-                if key in strategy and i < len(top_3_list):
-                    raw_strategy = top_3_list[i]
-                    
-                    # Add hauling allocations
-                    strategy[key]['HAULING_ALLOCATIONS'] = raw_strategy.get('hauling_allocations', [])
-                    strategy[key]['ALLOCATION_SUMMARY'] = raw_strategy.get('allocation_summary', {})
-                    
-                    # Also include hauling data for backward compatibility
-                    strategy[key]['HAULING_DATA'] = {
-                        'has_hauling_data': raw_strategy.get('has_hauling_data', False),
-                        'hauling_activity_count': raw_strategy.get('hauling_activity_count', 0),
-                        'hauling_analysis': raw_strategy.get('hauling_analysis', {})
-                    }
+            # Add hauling allocations (+ hauling data for backward compatibility) to each strategy
+            formatted_data = format_strategies_response(top_3_list, data, with_allocations=True)
             
             return {"top_3_strategies": formatted_data}
         else:
@@ -283,16 +487,118 @@ async def dapatkan_strategi_dengan_alokasi(request: RecommendationRequest):
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
+@app.post("/get_top_3_strategies/stream")
+async def stream_rekomendasi_strategis(request: RecommendationRequest, http_request: Request):
+    """Streaming NDJSON /get_top_3_strategies: progress, ETA, top-3 sementara, lalu hasil akhir."""
+    require_ready(*SIMULATION_COMPONENTS)
+    print(f"📡 Menerima request strategi (streaming)...")
+    return stream_strategy_sweep(request, http_request, get_strategic_recommendations, "get_top_3_strategies")
+
+
+@app.post("/get_strategies_with_hauling/stream")
+async def stream_strategi_dengan_hauling(request: RecommendationRequest, http_request: Request):
+    """Streaming NDJSON /get_strategies_with_hauling."""
+    require_ready(*SIMULATION_COMPONENTS)
+    print(f"📡 Menerima request strategi dengan integrasi hauling (streaming)...")
+    return stream_strategy_sweep(request, http_request, get_hauling_based_recommendations,
+                                 "get_strategies_with_hauling", with_hauling=True)
+
+
+@app.post("/get_strategies_with_allocations/stream")
+async def stream_strategi_dengan_alokasi(request: RecommendationRequest, http_request: Request):
+    """Streaming NDJSON /get_strategies_with_allocations."""
+    require_ready(*SIMULATION_COMPONENTS)
+    print(f"📡 Menerima request strategi dengan hauling allocations (streaming)...")
+    return stream_strategy_sweep(request, http_request, get_recommendations_with_allocations,
+                                 "get_strategies_with_allocations", with_allocations=True)
+
+
+# Varian job strategi: (fungsi rekomendasi, with_hauling, with_allocations)
+STRATEGY_JOB_VARIANTS = {
+    'top_3': (get_strategic_recommendations, False, False),
+    'hauling': (get_hauling_based_recommendations, True, False),
+    'allocations': (get_recommendations_with_allocations, False, True),
+}
+
+@app.post("/jobs/strategies", status_code=202)
+async def submit_strategy_job(request: StrategyJobRequest):
+    """
+    ENDPOINT: Sweep strategi sebagai job asinkron (untuk sweep yang melebihi timeout proxy).
+    Mengembalikan job_id; status, progress, dan hasil diambil lewat GET /jobs/{job_id}.
+    """
+    require_ready(*SIMULATION_COMPONENTS)
+    if request.variant not in STRATEGY_JOB_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"variant harus salah satu dari: {', '.join(STRATEGY_JOB_VARIANTS)}")
+    recommend, with_hauling, with_allocations = STRATEGY_JOB_VARIANTS[request.variant]
+    
+    def job(progress):
+        return {"top_3_strategies": run_strategy_sweep(request, recommend, progress, with_hauling, with_allocations)}
+    
+    try:
+        status = JOBS.submit(f"strategies:{request.variant}", job, request=request.dict(),
+                             timeout_seconds=request.timeout_seconds)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    status['job_id'] = status['id']
+    status['status_url'] = f"/jobs/{status['id']}"
+    return status
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status job (queued/running/succeeded/failed/cancelled/timeout), progress terakhir, dan hasil."""
+    status = JOBS.get(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan atau hasilnya sudah kedaluwarsa")
+    return status
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Batalkan job yang masih queued/running (job yang sudah selesai tidak berubah)."""
+    status = JOBS.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan atau hasilnya sudah kedaluwarsa")
+    return status
+
+
+@app.post("/reprice_strategies")
+async def reprice_strategies(request: RepriceRequest):
+    """
+    ENDPOINT: What-if finansial tanpa simulasi ulang.
+    Hasil fisik sweep terakhir (per kondisi) dihitung ulang untuk satu atau banyak
+    titik harga sekaligus, lalu di-ranking ulang seperti get_top_3_strategies.
+    """
+    key = request.physical_key
+    if key is None:
+        if request.fixed_conditions is None or request.decision_variables is None:
+            raise HTTPException(status_code=422, detail="Isi physical_key atau fixed_conditions + decision_variables.")
+        key = condition_key(request.fixed_conditions.dict(), request.decision_variables.dict())
+    
+    price_points = list(request.price_points or [])
+    if request.price_grid:
+        names = list(request.price_grid.keys())
+        price_points.extend(dict(zip(names, values)) for values in product(*(request.price_grid[n] for n in names)))
+    if len(price_points) > REPRICE_MAX_POINTS:
+        raise HTTPException(status_code=422, detail=f"Maksimal {REPRICE_MAX_POINTS} titik harga per request.")
+    
+    base_params = request.financial_params.dict() if request.financial_params else None
+    data = get_data_snapshot() if WARMUP.is_ready('data_snapshot') else None
+    result = reprice_physical_results(key, price_points or [{}], base_params, data, top_k=request.top_k)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Belum ada hasil sweep untuk kunci {key}. Jalankan endpoint strategi terlebih dahulu.")
+    print(f"💱 Re-pricing {result['scenarios']} skenario x {result['price_points']} titik harga ({result['elapsed_ms']:.1f} ms)")
+    return result
+
 @app.post("/analyze_hauling_activities")
 async def analyze_hauling(request: FixedConditions):
     """
     ENDPOINT: Analyze existing hauling activities without running full simulation.
     Returns aggregated metrics and activity IDs that can be used for production creation.
     """
+    require_ready('data_snapshot')
     try:
         print(f"📡 Analyzing hauling activities for production...")
         
-        data = load_fresh_data()
+        data = get_data_snapshot()
         analysis = analyze_hauling_for_production(request.dict(), data)
         
         return analysis
@@ -310,8 +616,8 @@ async def tanya_jawab_chatbot(request: ChatRequest):
     Mendukung percakapan berkelanjutan dengan conversation history.
     """
     
-    if LLM_PROVIDER != "ollama":
-        raise HTTPException(status_code=503, detail="Layanan Chatbot (Ollama) tidak terhubung di server.")
+    # 'llm' siap = Ollama terhubung; komponen yang gagal dicoba ulang di background (503 + Retry-After)
+    require_ready('llm', 'chatbot')
 
     try:
         print(f"💬 Menerima pertanyaan chatbot: {request.pertanyaan_user}")
@@ -420,7 +726,7 @@ async def tanya_jawab_chatbot(request: ChatRequest):
             session_id = request.session_id
             conversation_history = request.conversation_history
             
-            result = execute_and_summarize(
+            result = CHATBOT['execute_and_summarize'](
                 request.pertanyaan_user, 
                 session_id=session_id,
                 conversation_history=conversation_history
@@ -0,0 +1,116 @@
+import time
+import numpy as np
+import simpy
+from haul_kernel import run_haul_cycles
+
+# Skenario sintetis (tanpa ML/DB) untuk mengukur overhead mesin event murni
+NUM_TRUCKS = [10, 50, 100]
+NUM_EXCAVATORS = 3
+HORIZON_HOURS = [8, 24 * 7]
+HAUL_HOURS = 0.12
+LOAD_HOURS = 0.05
+RETURN_HOURS = 0.10
+DUMP_HOURS = 0.033
+
+
+def new_metrics():
+    return {
+        'total_tonase': 0, 'total_bbm_liter': 0,
+        'jumlah_siklus_selesai': 0, 'total_waktu_antri_jam': 0.0,
+        'total_probabilitas_delay': 0.0, 'total_cycle_time_hours': 0.0,
+        'total_maintenance_cost': 0.0, 'total_loading_time_hours': 0.0,
+        'total_dumping_time_hours': 0.0, 'total_hauling_time_hours': 0.0,
+        'total_return_time_hours': 0.0
+    }
+
+
+def sample_cycle(rng, capacity):
+    return 10.0 * rng.uniform(0.95, 1.05), capacity * 0.87 * rng.uniform(0.95, 1.05), 0.05
+
+
+class CountingEnvironment(simpy.Environment):
+    """simpy.Environment yang menghitung jumlah event yang diproses."""
+
+    def __init__(self):
+        super().__init__()
+        self.events_processed = 0
+
+    def step(self):
+        self.events_processed += 1
+        super().step()
+
+
+def truck_process(env, k, excavator, metrics, rng, capacities, maint_rate):
+    # Struktur sama dengan simulator.truck_process_hybrid, tanpa lookup data & ML
+    while True:
+        start_cycle_time = env.now
+        fuel, load, delay = sample_cycle(rng, capacities[k])
+        haul_start = env.now
+        yield env.timeout(HAUL_HOURS)
+        metrics['total_hauling_time_hours'] += env.now - haul_start
+        waktu_masuk_antrian = env.now
+        with excavator.request() as req:
+            yield req
+            metrics['total_waktu_antri_jam'] += env.now - waktu_masuk_antrian
+            loading_start = env.now
+            yield env.timeout(LOAD_HOURS)
+            metrics['total_loading_time_hours'] += env.now - loading_start
+        return_start = env.now
+        yield env.timeout(RETURN_HOURS)
+        metrics['total_return_time_hours'] += env.now - return_start
+        dump_start = env.now
+        yield env.timeout(DUMP_HOURS)
+        metrics['total_dumping_time_hours'] += env.now - dump_start
+        cycle_duration_hours = env.now - start_cycle_time
+        metrics['total_cycle_time_hours'] += cycle_duration_hours
+        metrics['total_tonase'] += load
+        metrics['total_bbm_liter'] += fuel
+        metrics['total_probabilitas_delay'] += delay
+        metrics['jumlah_siklus_selesai'] += 1
+        metrics['total_maintenance_cost'] += cycle_duration_hours * maint_rate[k]
+
+
+def run_simpy(num_trucks, horizon, capacities, maint_rate, seed=7):
+    rng = np.random.RandomState(seed)
+    metrics = new_metrics()
+    env = CountingEnvironment()
+    excavator = simpy.Resource(env, capacity=NUM_EXCAVATORS)
+    for k in range(num_trucks):
+        env.process(truck_process(env, k, excavator, metrics, rng, capacities, maint_rate))
+    start = time.perf_counter()
+    env.run(until=horizon)
+    return metrics, env.events_processed, time.perf_counter() - start
+
+
+def run_kernel(num_trucks, horizon, capacities, maint_rate, seed=7):
+    rng = np.random.RandomState(seed)
+    metrics = new_metrics()
+    start = time.perf_counter()
+    _, events = run_haul_cycles(
+        NUM_EXCAVATORS,
+        [HAUL_HOURS] * num_trucks, [LOAD_HOURS] * num_trucks,
+        [RETURN_HOURS] * num_trucks, [DUMP_HOURS] * num_trucks,
+        maint_rate, horizon,
+        lambda k, t: sample_cycle(rng, capacities[k]),
+        metrics
+    )
+    return metrics, events, time.perf_counter() - start
+
+
+def benchmark():
+    print("--- BENCHMARK MESIN EVENT: SimPy vs haul_kernel ---")
+    print(f"{'TRUK':>5} | {'HORIZON':>8} | {'EVENT':>9} | {'SIMPY ev/s':>12} | {'KERNEL ev/s':>12} | {'SPEEDUP':>7} | {'IDENTIK':>7}")
+    print("-" * 80)
+    for num_trucks in NUM_TRUCKS:
+        capacities = np.random.RandomState(0).uniform(20, 40, num_trucks)
+        maint_rate = np.random.RandomState(1).uniform(50000, 150000, num_trucks)
+        for horizon in HORIZON_HOURS:
+            m_simpy, ev_simpy, t_simpy = run_simpy(num_trucks, horizon, capacities, maint_rate)
+            m_kernel, ev_kernel, t_kernel = run_kernel(num_trucks, horizon, capacities, maint_rate)
+            identical = m_simpy == m_kernel
+            print(f"{num_trucks:>5} | {horizon:>7}h | {ev_simpy:>9,} | {ev_simpy / t_simpy:>12,.0f} | "
+                  f"{ev_kernel / t_kernel:>12,.0f} | {t_simpy / t_kernel:>6.1f}x | {str(identical):>7}")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,8 +1,18 @@
 import pandas as pd
+import numpy as np
 import os
-from database import fetch_dataframe
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from database import fetch_dataframe, get_engine
 import warnings
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 DATA_FOLDER = 'data'
 
 # Mapping from "logical name" (used in code) to DB table name
@@ -22,38 +32,379 @@ TABLE_MAPPING = {
     'system_configs': 'system_configs'
 }
 
-def load_data(table_key, csv_filename=None):
+# Kolom yang benar-benar dibaca simulator/API dari bundle load_fresh_data, beserta dtype ringkas:
+#   'category' untuk enum/ID berulang, 'float32' untuk metrik aktivitas, 'int32' untuk durasi,
+#   'datetime' untuk timestamp, 'bool' untuk flag, 'float64' untuk atribut entitas yang
+#   masuk ke perhitungan simulasi, 'str' untuk teks/ID unik (dtype bawaan reader).
+TABLE_SCHEMAS = {
+    'trucks': {
+        'id': 'str', 'code': 'str', 'name': 'str', 'brand': 'category', 'model': 'category',
+        'capacity': 'float64', 'fuelConsumption': 'float64', 'maintenanceCost': 'float64',
+        'status': 'category', 'isActive': 'bool', 'purchaseDate': 'datetime',
+        'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'excavators': {
+        'id': 'str', 'code': 'str', 'name': 'str', 'brand': 'category', 'model': 'category',
+        'bucketCapacity': 'float64', 'fuelConsumption': 'float64', 'maintenanceCost': 'float64',
+        'status': 'category', 'isActive': 'bool', 'purchaseDate': 'datetime',
+        'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'operators': {
+        'id': 'str', 'employeeNumber': 'str', 'licenseType': 'category', 'competency': 'str',
+        'status': 'category', 'shift': 'category', 'rating': 'float64', 'salary': 'float64',
+        'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'road_segments': {
+        'id': 'str', 'code': 'str', 'name': 'str', 'miningSiteId': 'str',
+        'distance': 'float64', 'roadCondition': 'category', 'gradient': 'float64',
+        'isActive': 'bool', 'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'sailing_schedules': {
+        'id': 'str', 'vesselId': 'category', 'loadingPort': 'category', 'destination': 'category',
+        'etaLoading': 'datetime', 'etsLoading': 'datetime', 'plannedQuantity': 'float64',
+        'actualQuantity': 'float64', 'buyer': 'category', 'status': 'category',
+        'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'vessels': {
+        'id': 'str', 'code': 'str', 'name': 'str', 'capacity': 'float64', 'status': 'category',
+        'isActive': 'bool', 'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'maintenance_logs': {
+        'id': 'str', 'truckId': 'category', 'excavatorId': 'category', 'completionDate': 'datetime',
+        'status': 'category', 'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'hauling_activities': {
+        'id': 'str', 'activityNumber': 'str', 'truckId': 'category', 'excavatorId': 'category',
+        'operatorId': 'category', 'excavatorOperatorId': 'category', 'roadSegmentId': 'category',
+        'shift': 'category', 'loadingStartTime': 'datetime', 'loadingEndTime': 'datetime',
+        'dumpingStartTime': 'datetime', 'dumpingEndTime': 'datetime',
+        'loadingDuration': 'int32', 'haulingDuration': 'int32', 'dumpingDuration': 'int32',
+        'returnDuration': 'int32', 'totalCycleTime': 'int32',
+        'loadWeight': 'float32', 'targetWeight': 'float32', 'distance': 'float32', 'fuelConsumed': 'float32',
+        'status': 'category', 'weatherCondition': 'category', 'roadCondition': 'category',
+        'createdAt': 'datetime', 'updatedAt': 'datetime'
+    },
+    'system_configs': {
+        'id': 'str', 'configKey': 'str', 'configValue': 'str', 'isActive': 'bool',
+        'createdAt': 'datetime', 'updatedAt': 'datetime'
+    }
+}
+
+def _csv_read_dtypes(schema):
+    # Kategori langsung di reader; angka/tanggal/bool dirapikan di apply_schema
+    return {c: 'category' for c, t in schema.items() if t == 'category'}
+
+def _read_csv_projected(csv_path, schema):
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [c for c in header if c in schema]
+    if HAS_PYARROW:
+        # Engine pyarrow: multi-thread dan parse timestamp ISO secara native
+        try:
+            return pd.read_csv(csv_path, usecols=usecols, engine='pyarrow')
+        except Exception:
+            pass
+    return pd.read_csv(csv_path, usecols=usecols, dtype=_csv_read_dtypes(schema))
+
+def _parse_timestamps(s):
+    # ISO8601 (format Database/CSV export) jauh lebih cepat daripada inferensi 'mixed'
+    try:
+        return pd.to_datetime(s, errors='coerce', format='ISO8601')
+    except (ValueError, TypeError):
+        return pd.to_datetime(s, errors='coerce', format='mixed')
+
+def apply_schema(df, schema):
+    """Terapkan projection + dtype ringkas. Kolom yang tidak ada di df dilewati."""
+    if not schema or df is None or df.empty:
+        return df
+    df = df[[c for c in schema if c in df.columns]].copy()
+    for col, kind in schema.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        try:
+            if kind == 'category':
+                if not isinstance(s.dtype, pd.CategoricalDtype):
+                    df[col] = s.astype('category')
+            elif kind == 'datetime':
+                if not pd.api.types.is_datetime64_any_dtype(s):
+                    df[col] = _parse_timestamps(s)
+            elif kind == 'bool':
+                if s.dtype != bool:
+                    df[col] = s.map(lambda v: str(v).strip().lower() in ('true', '1', 't')).astype(bool)
+            elif kind == 'int32':
+                num = pd.to_numeric(s, errors='coerce')
+                # Kolom int dengan NULL tetap float agar NaN terjaga
+                df[col] = num.astype(np.int32) if not num.isna().any() else num.astype(np.float32)
+            elif kind in ('float32', 'float64'):
+                df[col] = pd.to_numeric(s, errors='coerce').astype(kind)
+        except Exception as e:
+            print(f"⚠️ Gagal konversi kolom '{col}' ke {kind}: {e}")
+    return df
+
+def memory_report(frames):
+    """Memori (MB, deep) per tabel untuk dict nama -> DataFrame."""
+    return {
+        name: round(df.memory_usage(deep=True).sum() / 1e6, 3)
+        for name, df in frames.items() if isinstance(df, pd.DataFrame)
+    }
+
+
+# Tabel dimuat incremental: DataFrame resident per tabel, hanya baris dengan
+# "updatedAt" >= watermark yang diambil lalu di-upsert berdasarkan id.
+# Full reload berkala (reconcile) menangani baris yang dihapus.
+INCREMENTAL_LOADING = os.getenv("DATA_INCREMENTAL_LOADING", "1") != "0"
+FULL_RECONCILE_SECONDS = float(os.getenv("DATA_FULL_RECONCILE_SECONDS", "3600"))
+
+# Jumlah thread untuk load_tables (satu koneksi pool per tabel)
+LOAD_WORKERS = int(os.getenv("DATA_LOAD_WORKERS", "9"))
+
+_RESIDENT = {}
+LAST_LOAD_STATS = {}
+_RESIDENT_LOCKS = {}
+_RESIDENT_LOCKS_GUARD = threading.Lock()
+
+def _table_lock(table_key):
+    with _RESIDENT_LOCKS_GUARD:
+        if table_key not in _RESIDENT_LOCKS:
+            _RESIDENT_LOCKS[table_key] = threading.Lock()
+        return _RESIDENT_LOCKS[table_key]
+
+def _max_updated_at(df):
+    if 'updatedAt' not in df.columns or df.empty:
+        return None
+    value = pd.to_datetime(df['updatedAt'], errors='coerce').max()
+    return None if pd.isna(value) else value
+
+def upsert_by_id(resident, delta):
     """
-    Loads data from Postgres. If fails or empty, falls back to CSV.
+    Gabungkan baris delta ke resident berdasarkan kolom id tanpa mengubah resident.
+    Baris lama tetap di posisi semula, baris baru ditambahkan di akhir.
     """
-    df = None
-    
-    # 1. Try loading from Database
-    if table_key in TABLE_MAPPING:
-        db_table = TABLE_MAPPING[table_key]
+    if delta.empty:
+        return resident
+    delta = delta.drop_duplicates(subset='id', keep='last')
+    position = pd.Series(np.arange(len(resident)), index=resident['id'].values)
+    merged = pd.concat([resident[~resident['id'].isin(delta['id'])], delta], ignore_index=True)
+    order = merged['id'].map(position)
+    is_new = order.isna()
+    order[is_new] = len(resident) + np.arange(int(is_new.sum()))
+    return merged.iloc[np.argsort(order.to_numpy(), kind='stable')].reset_index(drop=True)
+
+def _select_sql(db_table, columns):
+    if not columns:
+        return f"SELECT * FROM {db_table}"
+    return "SELECT " + ", ".join(f'"{c}"' for c in columns) + f" FROM {db_table}"
+
+def _fetch_table(db_table, columns, where="", params=None):
+    """SELECT dengan projection; jika kolom tidak ada di Database (schema drift), fallback ke SELECT *."""
+    try:
+        return fetch_dataframe(_select_sql(db_table, columns) + where, params=params)
+    except Exception:
+        if not columns:
+            raise
+        df = fetch_dataframe(f"SELECT * FROM {db_table}" + where, params=params)
+        return df[[c for c in columns if c in df.columns]]
+
+def _load_from_db(table_key, db_table, resident_key, schema):
+    """Full atau delta load dari Database. Return None jika tabel kosong."""
+    entry = _RESIDENT.get(resident_key)
+    now = time.monotonic()
+    columns = list(schema) if schema else None
+    incremental = (
+        INCREMENTAL_LOADING and entry is not None and entry['source'] == 'db'
+        and entry['watermark'] is not None and now - entry['last_full'] < FULL_RECONCILE_SECONDS
+    )
+
+    if incremental:
         try:
-            print(f"🔄 Loading '{table_key}' from Database table '{db_table}'...")
-            query = f"SELECT * FROM {db_table}"
-            df = fetch_dataframe(query)
-            if not df.empty:
-                print(f"✅ Loaded {len(df)} rows from Database for '{table_key}'.")
-                # Handle specific column conversions if necessary to match CSV format
-                # e.g. ensure dates are datetime objects if CSV loader did that
+            delta = _fetch_table(
+                db_table, columns, ' WHERE "updatedAt" >= :watermark',
+                params={'watermark': entry['watermark'].to_pydatetime()}
+            )
+            watermark = _max_updated_at(delta)
+            df = upsert_by_id(entry['df'], apply_schema(delta, schema))
+            if schema and not delta.empty:
+                # concat kategori dengan kategori berbeda menghasilkan object: rapikan lagi
+                df = apply_schema(df, schema)
+            _RESIDENT[resident_key] = {
+                **entry,
+                'df': df,
+                'watermark': max(entry['watermark'], watermark) if watermark is not None else entry['watermark']
+            }
+            print(f"✅ Delta load '{table_key}': {len(delta)} rows changed, {len(df)} resident rows.")
+            return df
+        except Exception as e:
+            print(f"⚠️ Delta load '{table_key}' gagal ({e}), full reload...")
+
+    print(f"🔄 Loading '{table_key}' from Database table '{db_table}'...")
+    df = _fetch_table(db_table, columns)
+    if df.empty:
+        print(f"⚠️ Database table '{db_table}' is empty.")
+        return None
+    print(f"✅ Loaded {len(df)} rows from Database for '{table_key}'.")
+    watermark = _max_updated_at(df)
+    df = apply_schema(df, schema)
+    if INCREMENTAL_LOADING and 'id' in df.columns:
+        _RESIDENT[resident_key] = {
+            'source': 'db', 'df': df, 'watermark': watermark, 'last_full': now
+        }
+    return df
+
+def _load_from_csv(table_key, csv_path, csv_filename, resident_key, schema):
+    """CSV dimuat ulang hanya jika mtime/size file berubah."""
+    stat = os.stat(csv_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    entry = _RESIDENT.get(resident_key)
+    if INCREMENTAL_LOADING and entry is not None and entry['source'] == 'csv' and entry.get('signature') == signature:
+        print(f"📂 '{table_key}' CSV tidak berubah, memakai {len(entry['df'])} rows resident.")
+        return entry['df']
+
+    print(f"📂 Fallback: Loading '{table_key}' from CSV '{csv_filename}'...")
+    if schema:
+        df = _read_csv_projected(csv_path, schema)
+    else:
+        df = pd.read_csv(csv_path)
+    df = apply_schema(df, schema)
+    print(f"✅ Loaded {len(df)} rows from CSV.")
+    if INCREMENTAL_LOADING:
+        _RESIDENT[resident_key] = {'source': 'csv', 'df': df, 'signature': signature}
+    return df
+
+def load_data(table_key, csv_filename=None, projected=False):
+    """
+    Loads data from Postgres. If fails or empty, falls back to CSV.
+    projected=True: hanya kolom di TABLE_SCHEMAS dengan dtype ringkas (dipakai load_fresh_data).
+    DataFrame hasil dipakai bersama (resident) dan tidak boleh diubah in-place.
+    """
+    schema = TABLE_SCHEMAS.get(table_key) if projected else None
+    resident_key = (table_key, bool(schema))
+    start = time.perf_counter()
+    with _table_lock(resident_key):
+        # 1. Try loading from Database
+        if table_key in TABLE_MAPPING:
+            db_table = TABLE_MAPPING[table_key]
+            try:
+                df = _load_from_db(table_key, db_table, resident_key, schema)
+                if df is not None:
+                    _record_load(table_key, 'db', df, start)
+                    return df
+            except Exception as e:
+                print(f"⚠️ Failed to load from Database: {e}")
+        
+        # 2. Fallback to CSV
+        if csv_filename:
+            csv_path = os.path.join(DATA_FOLDER, csv_filename)
+            if os.path.exists(csv_path):
+                df = _load_from_csv(table_key, csv_path, csv_filename, resident_key, schema)
+                _record_load(table_key, 'csv', df, start)
                 return df
             else:
-                print(f"⚠️ Database table '{db_table}' is empty.")
+                print(f"❌ CSV file not found: {csv_path}")
+        
+        _record_load(table_key, 'empty', None, start)
+        return pd.DataFrame() # Return empty DF if all fails
+
+def _record_load(table_key, source, df, start):
+    LAST_LOAD_STATS[table_key] = {
+        'source': source,
+        'rows': 0 if df is None else int(len(df)),
+        'seconds': round(time.perf_counter() - start, 4)
+    }
+
+def load_tables(specs, max_workers=None, projected=True):
+    """
+    Memuat beberapa tabel secara paralel (thread pool di atas connection pool SQLAlchemy).
+    Fallback Database -> CSV tetap berlaku per tabel.
+
+    Args:
+        specs: list (table_key, csv_filename)
+    Returns:
+        (frames, timings): dict table_key -> DataFrame, dict table_key -> {source, rows, seconds}
+    """
+    max_workers = max_workers or LOAD_WORKERS
+    frames, timings = {}, {}
+    start = time.perf_counter()
+
+    def _load(spec):
+        table_key, csv_filename = spec
+        try:
+            return table_key, load_data(table_key, csv_filename, projected=projected), None
         except Exception as e:
-            print(f"⚠️ Failed to load from Database: {e}")
-    
-    # 2. Fallback to CSV
-    if csv_filename:
-        csv_path = os.path.join(DATA_FOLDER, csv_filename)
-        if os.path.exists(csv_path):
-            print(f"📂 Fallback: Loading '{table_key}' from CSV '{csv_filename}'...")
-            df = pd.read_csv(csv_path)
-            print(f"✅ Loaded {len(df)} rows from CSV.")
-            return df
-        else:
-            print(f"❌ CSV file not found: {csv_path}")
-    
-    return pd.DataFrame() # Return empty DF if all fails
+            return table_key, pd.DataFrame(), str(e)
+
+    if max_workers <= 1:
+        results = [_load(spec) for spec in specs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(specs)), thread_name_prefix='load') as pool:
+            results = list(pool.map(_load, specs))
+
+    for table_key, df, error in results:
+        frames[table_key] = df
+        timings[table_key] = dict(LAST_LOAD_STATS.get(table_key, {}))
+        if error:
+            timings[table_key]['error'] = error
+    wall = time.perf_counter() - start
+    slowest = max((t.get('seconds', 0) for t in timings.values()), default=0)
+    print(f"⏱️ Loaded {len(specs)} tables in {wall:.2f}s (slowest table {slowest:.2f}s, {max_workers} threads)")
+    timings['_total'] = {'seconds': round(wall, 4), 'sum_seconds': round(sum(t.get('seconds', 0) for t in timings.values()), 4)}
+    return frames, timings
+
+def reset_resident_tables():
+    """Buang semua DataFrame resident; load berikutnya menjadi full load."""
+    with _RESIDENT_LOCKS_GUARD:
+        _RESIDENT.clear()
+
+def _csv_watermark(table_key):
+    csv_path = os.path.join(DATA_FOLDER, f"{TABLE_MAPPING.get(table_key, table_key)}.csv")
+    if os.path.exists(csv_path):
+        stat = os.stat(csv_path)
+        return ('csv', stat.st_mtime_ns, stat.st_size)
+    return ('missing',)
+
+def get_table_watermarks(table_keys):
+    """
+    Watermark murah per tabel untuk deteksi perubahan data:
+    (max("updatedAt"), count(*)) dari Database, atau mtime/size file CSV jika Database tidak tersedia.
+    count(*) ikut dihitung supaya DELETE juga terdeteksi.
+    """
+    db_tables = [(k, TABLE_MAPPING[k]) for k in table_keys if k in TABLE_MAPPING]
+    watermarks = {}
+    if db_tables and get_engine() is not None:
+        union = " UNION ALL ".join(
+            f"SELECT '{key}' AS table_key, MAX(\"updatedAt\")::text AS watermark, COUNT(*) AS row_count FROM {table}"
+            for key, table in db_tables
+        )
+        try:
+            df = fetch_dataframe(union)
+            for _, row in df.iterrows():
+                watermarks[row['table_key']] = ('db', row['watermark'], int(row['row_count']))
+        except Exception:
+            # Satu query gabungan gagal (mis. tabel tanpa updatedAt): cek per tabel
+            for key, table in db_tables:
+                try:
+                    df = fetch_dataframe(f"SELECT MAX(\"updatedAt\")::text AS watermark, COUNT(*) AS row_count FROM {table}")
+                    watermarks[key] = ('db', df.iloc[0]['watermark'], int(df.iloc[0]['row_count']))
+                except Exception:
+                    try:
+                        df = fetch_dataframe(f"SELECT COUNT(*) AS row_count FROM {table}")
+                        watermarks[key] = ('db', None, int(df.iloc[0]['row_count']))
+                    except Exception:
+                        watermarks[key] = _csv_watermark(key)
+    for key in table_keys:
+        if key not in watermarks:
+            watermarks[key] = _csv_watermark(key)
+    return watermarks
+
+if __name__ == "__main__":
+    # Laporan memori per tabel: semua kolom (SELECT * / CSV penuh) vs projection TABLE_SCHEMAS
+    print(f"{'table':<22}{'rows':>8}{'full MB':>10}{'proj MB':>10}{'ratio':>8}{'full s':>9}{'proj s':>9}")
+    for key in TABLE_SCHEMAS:
+        csv_name = f"{TABLE_MAPPING.get(key, key)}.csv"
+        t0 = time.perf_counter(); full = load_data(key, csv_name); t_full = time.perf_counter() - t0
+        t0 = time.perf_counter(); proj = load_data(key, csv_name, projected=True); t_proj = time.perf_counter() - t0
+        if full.empty:
+            print(f"{key:<22}{'-':>8}")
+            continue
+        m_full = memory_report({key: full})[key]
+        m_proj = memory_report({key: proj})[key]
+        print(f"{key:<22}{len(full):>8}{m_full:>10.3f}{m_proj:>10.3f}{m_full / max(m_proj, 1e-9):>7.1f}x{t_full:>9.3f}{t_proj:>9.3f}")
@@ -0,0 +1,134 @@
+import os
+import time
+import threading
+from datetime import datetime
+from data_loader import get_table_watermarks
+
+# Umur maksimum snapshot sebelum dimuat ulang walaupun watermark tidak berubah
+SNAPSHOT_TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", "300"))
+# Jeda minimum antar query watermark (request beruntun tidak perlu cek ulang)
+SNAPSHOT_CHECK_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_CHECK_INTERVAL_SECONDS", "5"))
+
+# Tabel yang dimuat load_fresh_data
+SNAPSHOT_TABLES = [
+    'trucks', 'excavators', 'operators', 'road_segments', 'sailing_schedules',
+    'vessels', 'maintenance_logs', 'hauling_activities', 'system_configs'
+]
+
+
+class DataSnapshotManager:
+    """
+    Menyimpan satu bundle data (hasil load_fresh_data) yang dipakai bersama oleh
+    semua request. Bundle diperlakukan read-only: fungsi yang perlu mengubah
+    DataFrame harus .copy() terlebih dahulu.
+
+    Snapshot baru dimuat hanya jika:
+      - belum ada snapshot, atau force_refresh=True
+      - umur snapshot melewati ttl_seconds
+      - watermark tabel (max updatedAt + count, atau mtime CSV) berubah;
+        watermark dicek paling sering sekali per check_interval_seconds
+
+    Setiap snapshot mendapat nomor versi baru di bundle['snapshot']['version'].
+    """
+
+    def __init__(self, loader, ttl_seconds=SNAPSHOT_TTL_SECONDS,
+                 check_interval_seconds=SNAPSHOT_CHECK_INTERVAL_SECONDS,
+                 tables=None, prepare=None):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.tables = list(tables or SNAPSHOT_TABLES)
+        self.prepare = prepare
+        self._snapshot = None
+        self._version = 0
+        self._loaded_at = 0.0
+        self._watermarks = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self.stats = {'loads': 0, 'reuses': 0, 'watermark_checks': 0}
+
+    @property
+    def version(self):
+        return self._version
+
+    def _is_stale(self):
+        now = time.monotonic()
+        if now - self._loaded_at >= self.ttl_seconds:
+            return True
+        if now - self._last_check < self.check_interval_seconds:
+            return False
+        # Hanya satu thread yang menjalankan query watermark
+        if not self._check_lock.acquire(blocking=False):
+            return False
+        try:
+            self._last_check = time.monotonic()
+            self.stats['watermark_checks'] += 1
+            try:
+                current = get_table_watermarks(self.tables)
+            except Exception as e:
+                print(f"   ⚠️ Gagal cek watermark data: {e}")
+                return False
+            if current != self._watermarks:
+                changed = [t for t in self.tables if current.get(t) != (self._watermarks or {}).get(t)]
+                print(f"   🔄 Data berubah ({', '.join(changed)}), snapshot akan dimuat ulang")
+                return True
+            return False
+        finally:
+            self._check_lock.release()
+
+    def _load(self):
+        watermarks = get_table_watermarks(self.tables)
+        bundle = self.loader()
+        self._version += 1
+        bundle['snapshot'] = {
+            'version': self._version,
+            'loaded_at': datetime.now().isoformat(),
+            'watermarks': {k: list(v) for k, v in watermarks.items()}
+        }
+        if self.prepare is not None:
+            self.prepare(bundle)
+        self._snapshot = bundle
+        self._watermarks = watermarks
+        self._loaded_at = time.monotonic()
+        self._last_check = self._loaded_at
+        self.stats['loads'] += 1
+        print(f"📦 Data snapshot v{self._version} siap")
+        return bundle
+
+    def get(self, force_refresh=False):
+        snapshot = self._snapshot
+        if snapshot is not None and not force_refresh and not self._is_stale():
+            self.stats['reuses'] += 1
+            return snapshot
+
+        if snapshot is not None and not force_refresh:
+            # Refresh sedang berjalan di thread lain: pakai snapshot lama
+            if not self._lock.acquire(blocking=False):
+                self.stats['reuses'] += 1
+                return snapshot
+        else:
+            self._lock.acquire()
+        try:
+            if self._snapshot is not None and self._snapshot is not snapshot and not force_refresh:
+                return self._snapshot
+            return self._load()
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Paksa snapshot dimuat ulang pada pemanggilan get() berikutnya."""
+        self._loaded_at = 0.0
+
+    def info(self):
+        snapshot = self._snapshot
+        meta = snapshot.get('snapshot', {}) if snapshot is not None else {}
+        return {
+            'version': self._version,
+            'loaded_at': meta.get('loaded_at'),
+            'age_seconds': (time.monotonic() - self._loaded_at) if snapshot is not None else None,
+            'ttl_seconds': self.ttl_seconds,
+            'check_interval_seconds': self.check_interval_seconds,
+            'load_timings': snapshot.get('load_timings') if snapshot is not None else None,
+            **self.stats
+        }
@@ -1,4 +1,5 @@
 import os
+import threading
 from sqlalchemy import create_engine, text
 import pandas as pd
 
@@ -10,16 +11,28 @@ DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_DB_URL)
 if "?schema=" in DATABASE_URL:
     DATABASE_URL = DATABASE_URL.split("?")[0]
 
+# Connection pool: load_fresh_data memuat beberapa tabel secara paralel
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+
 engine = None
+_engine_lock = threading.Lock()
 
 def get_engine():
     global engine
     if engine is None:
-        try:
-            engine = create_engine(DATABASE_URL)
-            print(f"✅ Connected to Database: {DATABASE_URL.split('@')[1]}") # Hide credentials
-        except Exception as e:
-            print(f"❌ Failed to connect to database: {e}")
+        with _engine_lock:
+            if engine is None:
+                try:
+                    engine = create_engine(
+                        DATABASE_URL,
+                        pool_size=DB_POOL_SIZE,
+                        max_overflow=DB_MAX_OVERFLOW,
+                        pool_pre_ping=True
+                    )
+                    print(f"✅ Connected to Database: {DATABASE_URL.split('@')[1]}") # Hide credentials
+                except Exception as e:
+                    print(f"❌ Failed to connect to database: {e}")
     return engine
 
 def get_connection():
@@ -0,0 +1,109 @@
+import heapq
+
+# 'pooled' = satu resource gabungan berkapasitas jumlah_excavator (model lama, default);
+# kebijakan lain memakai resource per excavator dan memilih excavator saat truk tiba di front
+DISPATCH_POLICIES = ('pooled', 'fixed', 'shortest_queue', 'min_expected_wait')
+
+
+def dispatch_policy(skenario):
+    """Kebijakan dispatch skenario; nilai tidak dikenal -> 'pooled'."""
+    policy = skenario.get('dispatch_policy') or 'pooled'
+    return policy if policy in DISPATCH_POLICIES else 'pooled'
+
+
+class ExcavatorDispatcher:
+    """
+    Memilih excavator untuk truk yang selesai hauling (excavator kapasitas 1, antrian FIFO).
+
+    - fixed: truk k selalu ke excavator k % E (excavator 0 = target_excavator_id).
+    - shortest_queue: excavator dengan truk terassign paling sedikit (antri + sedang loading).
+    - min_expected_wait: excavator dengan perkiraan selesai loading paling awal
+      (max(siap, sekarang) + durasi loading excavator). Durasi loading deterministik,
+      sehingga waktu siap tiap excavator cukup diperbarui saat assignment.
+
+    Semua pilihan O(log E) memakai heap dengan lazy deletion (entri membawa versi);
+    seri dipecah ke indeks excavator terkecil.
+    """
+
+    def __init__(self, policy, load_hours):
+        self.policy = policy
+        self.load = [float(x) for x in load_hours]
+        E = len(self.load)
+        self.count = [0] * E
+        self.served = [0] * E
+        if policy == 'shortest_queue':
+            self.heap = [(0, e) for e in range(E)]
+        elif policy == 'min_expected_wait':
+            self.ready = [0.0] * E
+            self.version = [0] * E
+            self.busy = [False] * E
+            # idle: (durasi loading, e); busy: (perkiraan selesai, e); expiry: (siap, e)
+            self.idle = [(self.load[e], e, 0) for e in range(E)]
+            heapq.heapify(self.idle)
+            self.busy_heap = []
+            self.expiry = []
+
+    def choose(self, truck, t):
+        """Excavator untuk truk `truck` yang tiba pada jam t (assignment langsung dicatat)."""
+        if self.policy == 'shortest_queue':
+            e = self._shortest_queue()
+        elif self.policy == 'min_expected_wait':
+            e = self._min_expected_wait(t)
+        else:
+            e = truck % len(self.load)
+        self.count[e] += 1
+        self.served[e] += 1
+        if self.policy == 'shortest_queue':
+            heapq.heappush(self.heap, (self.count[e], e))
+        return e
+
+    def release(self, e):
+        """Truk selesai loading di excavator e."""
+        self.count[e] -= 1
+        if self.policy == 'shortest_queue':
+            heapq.heappush(self.heap, (self.count[e], e))
+
+    def _shortest_queue(self):
+        heap, count = self.heap, self.count
+        if len(heap) > 4 * len(count):
+            heap[:] = [(c, e) for e, c in enumerate(count)]
+            heapq.heapify(heap)
+        while heap[0][0] != count[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def _min_expected_wait(self, t):
+        version, busy = self.version, self.busy
+        expiry, idle, busy_heap = self.expiry, self.idle, self.busy_heap
+        # Excavator yang sudah siap pada jam t pindah ke heap idle
+        while expiry and expiry[0][0] <= t:
+            _, e, v = heapq.heappop(expiry)
+            if v == version[e] and busy[e]:
+                busy[e] = False
+                heapq.heappush(idle, (self.load[e], e, v))
+        while busy_heap and (busy_heap[0][2] != version[busy_heap[0][1]] or not busy[busy_heap[0][1]]):
+            heapq.heappop(busy_heap)
+        while idle and (idle[0][2] != version[idle[0][1]] or busy[idle[0][1]]):
+            heapq.heappop(idle)
+
+        if idle and (not busy_heap or (t + idle[0][0], idle[0][1]) <= (busy_heap[0][0], busy_heap[0][1])):
+            e = heapq.heappop(idle)[1]
+        else:
+            e = heapq.heappop(busy_heap)[1]
+        self.ready[e] = max(self.ready[e], t) + self.load[e]
+        version[e] += 1
+        busy[e] = True
+        heapq.heappush(busy_heap, (self.ready[e] + self.load[e], e, version[e]))
+        heapq.heappush(expiry, (self.ready[e], e, version[e]))
+        if len(expiry) > 4 * len(self.load):
+            self._rebuild()
+        return e
+
+    def _rebuild(self):
+        # Buang entri basi agar ukuran heap tetap O(E)
+        version, busy = self.version, self.busy
+        self.expiry[:] = [(self.ready[e], e, version[e]) for e in range(len(self.load)) if busy[e]]
+        self.busy_heap[:] = [(self.ready[e] + self.load[e], e, version[e]) for e in range(len(self.load)) if busy[e]]
+        self.idle[:] = [(self.load[e], e, version[e]) for e in range(len(self.load)) if not busy[e]]
+        for heap in (self.expiry, self.busy_heap, self.idle):
+            heapq.heapify(heap)
@@ -0,0 +1,226 @@
+import os
+import uuid
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Kapasitas awal buffer (baris); tumbuh 2x saat penuh
+EVENT_RECORDER_CAPACITY = int(os.getenv("EVENT_RECORDER_CAPACITY", "4096"))
+# Buffer di memori yang melebihi batas ini ditulis ke Parquet (butuh pyarrow)
+EVENT_RECORDER_MAX_BYTES = int(os.getenv("EVENT_RECORDER_MAX_BYTES", str(64 * 1024 * 1024)))
+EVENT_SPILL_DIR = os.getenv("EVENT_SPILL_DIR", os.path.join("cache", "events"))
+# Baris ditampung di list kecil lalu disalin per blok ke kolom NumPy (lebih murah dari set skalar per kolom)
+EVENT_FLUSH_ROWS = 1024
+
+# Fase yang dicatat per siklus truk; PHASE_CYCLE = satu baris ringkasan siklus (muatan & BBM)
+PHASE_HAUL = 0
+PHASE_QUEUE = 1
+PHASE_LOAD = 2
+PHASE_RETURN = 3
+PHASE_DUMP = 4
+PHASE_CYCLE = 5
+PHASE_NAMES = ('haul', 'queue', 'load', 'return', 'dump', 'cycle')
+
+EVENT_COLUMNS = (
+    ('truck_index', np.int32),
+    ('cycle_no', np.int32),
+    ('phase', np.int8),
+    ('t_start', np.float64),
+    ('t_end', np.float64),
+    ('load', np.float64),
+    ('fuel', np.float64)
+)
+_ROW_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in EVENT_COLUMNS)
+
+
+class EventRecorder:
+    """
+    Log event siklus haul (opsional) dalam bentuk struct-of-arrays.
+
+    Setiap baris = (truck_index, cycle_no, phase, t_start, t_end, load, fuel); load/fuel
+    hanya diisi pada baris PHASE_CYCLE. record() hanya menambah tuple ke list staging;
+    tiap EVENT_FLUSH_ROWS baris disalin sekaligus ke kolom NumPy yang dialokasikan di
+    depan dan tumbuh geometris (2x). Jika buffer melebihi max_bytes dan pyarrow tersedia, isi buffer
+    ditulis ke file Parquet (spill) lalu buffer dipakai ulang, sehingga memori tetap
+    terbatas untuk horizon panjang. Tanpa pyarrow buffer terus tumbuh di memori.
+    """
+
+    def __init__(self, capacity=EVENT_RECORDER_CAPACITY, max_bytes=EVENT_RECORDER_MAX_BYTES, spill_dir=EVENT_SPILL_DIR):
+        self.capacity = max(16, int(capacity))
+        self.max_bytes = int(max_bytes)
+        self.spill_dir = spill_dir
+        self.size = 0
+        self.spilled_rows = 0
+        self.spill_files = []
+        self._pending = []
+        self._warned = False
+        self._alloc(self.capacity)
+
+    def _alloc(self, capacity):
+        self.truck_index = np.empty(capacity, dtype=np.int32)
+        self.cycle_no = np.empty(capacity, dtype=np.int32)
+        self.phase = np.empty(capacity, dtype=np.int8)
+        self.t_start = np.empty(capacity, dtype=np.float64)
+        self.t_end = np.empty(capacity, dtype=np.float64)
+        self.load = np.empty(capacity, dtype=np.float64)
+        self.fuel = np.empty(capacity, dtype=np.float64)
+        self.capacity = capacity
+
+    def _columns(self):
+        return [getattr(self, name) for name, _ in EVENT_COLUMNS]
+
+    def __len__(self):
+        return self.spilled_rows + self.size + len(self._pending)
+
+    @property
+    def nbytes(self):
+        return self.capacity * _ROW_BYTES
+
+    def record(self, truck_index, cycle_no, phase, t_start, t_end, load=np.nan, fuel=np.nan):
+        pending = self._pending
+        pending.append((truck_index, cycle_no, phase, t_start, t_end, load, fuel))
+        if len(pending) >= EVENT_FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        """Salin baris staging ke kolom NumPy (tumbuh 2x atau spill jika penuh)."""
+        pending = self._pending
+        if not pending:
+            return
+        n = len(pending)
+        while self.size + n > self.capacity:
+            self._make_room(n)
+        i = self.size
+        for col, values in zip(self._columns(), zip(*pending)):
+            col[i:i + n] = values
+        self.size = i + n
+        pending.clear()
+
+    def _make_room(self, n):
+        if self.size and 2 * self.nbytes > self.max_bytes:
+            if HAS_PYARROW:
+                self.spill()
+                return
+            if not self._warned:
+                print("   ⚠️ EventRecorder: pyarrow tidak tersedia, event tetap di memori (tanpa spill Parquet)")
+                self._warned = True
+        old = self._columns()
+        self._alloc(self.capacity * 2)
+        for dst, src in zip(self._columns(), old):
+            dst[:self.size] = src[:self.size]
+
+    def spill(self):
+        """Tulis isi buffer ke file Parquet baru dan kosongkan buffer."""
+        if not self.size:
+            return None
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"events-{uuid.uuid4().hex}.parquet")
+        self._buffer_frame().to_parquet(path, index=False)
+        self.spill_files.append(path)
+        self.spilled_rows += self.size
+        self.size = 0
+        return path
+
+    def _buffer_frame(self):
+        return pd.DataFrame({name: col[:self.size] for (name, _), col in zip(EVENT_COLUMNS, self._columns())})
+
+    def to_frame(self):
+        """Semua event (file spill + buffer) sebagai DataFrame, urutan sesuai pencatatan."""
+        self.flush()
+        frames = [pd.read_parquet(path) for path in self.spill_files]
+        frames.append(self._buffer_frame())
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def arrays(self):
+        """Dict kolom NumPy untuk semua event (salinan buffer, aman dipakai setelah recorder lanjut mencatat)."""
+        self.flush()
+        if not self.spill_files:
+            return {name: col[:self.size].copy() for (name, _), col in zip(EVENT_COLUMNS, self._columns())}
+        frame = self.to_frame()
+        return {name: frame[name].to_numpy(dtype=dtype) for name, dtype in EVENT_COLUMNS}
+
+    def close(self):
+        """Hapus file spill (dipanggil pemilik recorder setelah hasil tidak dibutuhkan)."""
+        for path in self.spill_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.spill_files = []
+        self.spilled_rows = 0
+        self.size = 0
+        self._pending.clear()
+
+
+def summarize_events(events, duration_hours, num_trucks, num_excavators, queue_bins=10):
+    """
+    Ringkasan vektor dari log event (EventRecorder.arrays()):
+      - per truk: siklus selesai, jam per fase, utilisasi (jam kerja / horizon), tonase, BBM
+      - distribusi waktu antri (menit): mean, persentil, histogram
+      - fraksi sibuk excavator (total jam loading / (jumlah excavator x horizon))
+    Fase yang belum selesai saat horizon berakhir tidak tercatat.
+    """
+    truck = events['truck_index'].astype(np.int64)
+    phase = events['phase']
+    duration = events['t_end'] - events['t_start']
+    horizon = float(duration_hours) if duration_hours else 0.0
+    n = int(num_trucks)
+
+    hours = np.zeros((len(PHASE_NAMES), n))
+    for p in range(PHASE_CYCLE):
+        sel = phase == p
+        hours[p] = np.bincount(truck[sel], weights=duration[sel], minlength=n)[:n]
+    cycle = phase == PHASE_CYCLE
+    cycles = np.bincount(truck[cycle], minlength=n)[:n]
+    tonase = np.bincount(truck[cycle], weights=events['load'][cycle], minlength=n)[:n]
+    bbm = np.bincount(truck[cycle], weights=events['fuel'][cycle], minlength=n)[:n]
+    working = hours[PHASE_HAUL] + hours[PHASE_LOAD] + hours[PHASE_RETURN] + hours[PHASE_DUMP]
+    utilization = working / horizon if horizon > 0 else np.zeros(n)
+
+    queue_min = duration[phase == PHASE_QUEUE] * 60.0
+    if len(queue_min):
+        counts, edges = np.histogram(queue_min, bins=queue_bins)
+        p50, p90, p95 = np.percentile(queue_min, [50, 90, 95])
+        queue = {
+            'count': int(len(queue_min)),
+            'mean_min': float(queue_min.mean()),
+            'p50_min': float(p50),
+            'p90_min': float(p90),
+            'p95_min': float(p95),
+            'max_min': float(queue_min.max()),
+            'zero_wait_fraction': float(np.mean(queue_min <= 0.0)),
+            'histogram': {'edges_min': edges.tolist(), 'counts': counts.tolist()}
+        }
+    else:
+        queue = {'count': 0}
+
+    loading_hours = float(hours[PHASE_LOAD].sum())
+    capacity_hours = max(int(num_excavators), 1) * horizon
+    return {
+        'events': int(len(phase)),
+        'per_truck': [
+            {
+                'truck_index': k,
+                'cycles': int(cycles[k]),
+                'utilization': float(utilization[k]),
+                'haul_hours': float(hours[PHASE_HAUL, k]),
+                'queue_hours': float(hours[PHASE_QUEUE, k]),
+                'load_hours': float(hours[PHASE_LOAD, k]),
+                'return_hours': float(hours[PHASE_RETURN, k]),
+                'dump_hours': float(hours[PHASE_DUMP, k]),
+                'tonase': float(tonase[k]),
+                'bbm_liter': float(bbm[k])
+            }
+            for k in range(n)
+        ],
+        'queue_time': queue,
+        'excavator': {
+            'loading_hours': loading_hours,
+            'busy_fraction': loading_hours / capacity_hours if capacity_hours > 0 else 0.0
+        }
+    }
@@ -0,0 +1,256 @@
+import json
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+# Nama fitur kanonik (sama dengan train_pipeline.run_daily_training)
+NUMERICAL_FEATURES = [
+    'truck_capacity',
+    'excavator_bucket_capacity',
+    'operator_rating',
+    'operator_experience_years',
+    'distance',
+    'road_gradient',
+    'truck_age_days',
+    'days_since_last_maintenance'
+]
+
+CATEGORICAL_FEATURES = [
+    'weatherCondition',
+    'roadCondition',
+    'shift',
+    'truck_brand',
+    'excavator_model'
+]
+
+# Nama lama (train_models.py / create_training_data.py) -> nama kanonik,
+# supaya model lama maupun baru bisa dilayani dari store yang sama
+FEATURE_ALIASES = {
+    'capacity': 'truck_capacity',
+    'bucketCapacity': 'excavator_bucket_capacity',
+    'rating': 'operator_rating',
+    'gradient': 'road_gradient',
+    'brand': 'truck_brand',
+    'model_excavator': 'excavator_model'
+}
+
+DEFAULT_DAYS_SINCE_MAINTENANCE = 365
+DEFAULT_TRUCK_AGE_DAYS = 365
+DEFAULT_OPERATOR_RATING = 5.0
+UNKNOWN_CATEGORY = 'UNKNOWN'
+
+DAY_NS = 86400 * 10**9
+
+
+def canonical_feature_name(name):
+    return FEATURE_ALIASES.get(name, name)
+
+
+def extract_operator_experience(competency_json):
+    """Ambil years_experience dari blob JSON competency operator (string atau dict)."""
+    if isinstance(competency_json, dict):
+        data = competency_json
+    else:
+        if pd.isna(competency_json) or competency_json == '':
+            return 0
+        try:
+            data = json.loads(competency_json)
+        except:
+            return 0
+    try:
+        return float(data.get('years_experience', 0) or 0)
+    except:
+        return 0
+
+
+def truck_age_days(purchase_ns, t_ns):
+    """Umur truk dalam hari penuh; purchase_ns None/NaT -> default."""
+    if purchase_ns is None:
+        return DEFAULT_TRUCK_AGE_DAYS
+    return max(0, (t_ns - purchase_ns) // DAY_NS)
+
+
+def days_since_last_maintenance(completion_ns, t_ns):
+    """
+    Hari sejak maintenance COMPLETED terakhir sebelum t_ns.
+    completion_ns: list timestamp (ns, UTC) yang sudah terurut naik.
+    """
+    if completion_ns is None:
+        return DEFAULT_DAYS_SINCE_MAINTENANCE
+    pos = bisect_left(completion_ns, t_ns)
+    if pos == 0:
+        return DEFAULT_DAYS_SINCE_MAINTENANCE
+    return max(0, (t_ns - completion_ns[pos - 1]) // DAY_NS)
+
+
+def to_utc_ns(ts):
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize('UTC')
+    return ts.value
+
+
+def _utc_ns_array(values):
+    dt = pd.to_datetime(pd.Series(values), errors='coerce', utc=True)
+    return dt.values.astype('datetime64[ns]').astype(np.int64), dt.isna().values
+
+
+def _numeric(frame, col, default=0.0):
+    if col not in frame.columns:
+        return np.full(len(frame), default, dtype=np.float64)
+    return pd.to_numeric(frame[col], errors='coerce').fillna(default).to_numpy(dtype=np.float64)
+
+
+def _category(frame, col):
+    if col not in frame.columns:
+        return [UNKNOWN_CATEGORY] * len(frame)
+    return frame[col].astype(object).fillna(UNKNOWN_CATEGORY).astype(str).tolist()
+
+
+class FeatureStore:
+    """
+    Fitur statis per truk/excavator/operator/jalan yang dihitung sekali per snapshot data.
+
+    Fitur yang bergantung waktu (umur truk, hari sejak maintenance) dihitung saat
+    lookup dari timestamp ns: purchaseDate per truk dan array completionDate per
+    truk yang terurut (bisect), tanpa scan DataFrame maintenance.
+    """
+
+    def __init__(self, data):
+        trucks = data['trucks']
+        excavators = data['excavators']
+        operators = data['operators']
+        roads = data['roads']
+
+        self.truck_index = {tid: i for i, tid in enumerate(trucks.index)}
+        self.truck_capacity = _numeric(trucks, 'capacity')
+        self.truck_brand = _category(trucks, 'brand')
+        purchase_ns, purchase_nat = _utc_ns_array(trucks['purchaseDate'] if 'purchaseDate' in trucks.columns else [None] * len(trucks))
+        self.truck_purchase_ns = [None if nat else int(ns) for ns, nat in zip(purchase_ns, purchase_nat)]
+
+        self.excavator_index = {eid: i for i, eid in enumerate(excavators.index)}
+        self.excavator_bucket_capacity = _numeric(excavators, 'bucketCapacity')
+        self.excavator_model = _category(excavators, 'model')
+
+        self.operator_index = {oid: i for i, oid in enumerate(operators.index)}
+        self.operator_rating = _numeric(operators, 'rating', DEFAULT_OPERATOR_RATING)
+        if 'competency' in operators.columns:
+            self.operator_experience = np.array(
+                [extract_operator_experience(c) for c in operators['competency']], dtype=np.float64
+            )
+        else:
+            self.operator_experience = np.zeros(len(operators), dtype=np.float64)
+
+        self.road_index = {rid: i for i, rid in enumerate(roads.index)}
+        self.road_distance = _numeric(roads, 'distance')
+        self.road_gradient = _numeric(roads, 'gradient')
+
+        self.maintenance_ns = build_maintenance_index(data.get('maintenance'))
+
+    def features(self, truck_id, operator_id, road_id, excavator_id, weather, road_cond, shift, sim_time):
+        """Dict fitur kanonik untuk satu siklus. KeyError jika entitas tidak ada."""
+        ti = self.truck_index[truck_id]
+        ei = self.excavator_index[excavator_id]
+        oi = self.operator_index[operator_id]
+        ri = self.road_index[road_id]
+        t_ns = sim_time if isinstance(sim_time, (int, np.integer)) else to_utc_ns(sim_time)
+
+        return {
+            'truck_capacity': float(self.truck_capacity[ti]),
+            'excavator_bucket_capacity': float(self.excavator_bucket_capacity[ei]),
+            'operator_rating': float(self.operator_rating[oi]),
+            'operator_experience_years': float(self.operator_experience[oi]),
+            'distance': float(self.road_distance[ri]),
+            'road_gradient': float(self.road_gradient[ri]),
+            'truck_age_days': float(truck_age_days(self.truck_purchase_ns[ti], t_ns)),
+            'days_since_last_maintenance': float(days_since_last_maintenance(self.maintenance_ns.get(truck_id), t_ns)),
+            'weatherCondition': weather,
+            'roadCondition': road_cond,
+            'shift': shift,
+            'truck_brand': self.truck_brand[ti],
+            'excavator_model': self.excavator_model[ei]
+        }
+
+    def feature_values(self, columns, *args):
+        """
+        Tuple nilai fitur dalam urutan `columns` (nama kanonik atau alias).
+        Dipakai langsung sebagai kunci PredictionCache. None jika entitas tidak ditemukan.
+        """
+        try:
+            f = self.features(*args)
+            return tuple(f[canonical_feature_name(c)] for c in columns)
+        except KeyError:
+            return None
+
+    def feature_rows(self, columns, truck_id, operator_id, road_id, excavator_id, weather, road_cond, shift, t_ns):
+        """
+        Versi batch feature_values untuk banyak siklus satu truk dalam satu skenario:
+        fitur statis dihitung sekali, fitur waktu dihitung vektor dari array t_ns (int64).
+        List tuple (sama persis dengan feature_values per baris) atau None jika entitas tidak ada.
+        """
+        t_ns = np.asarray(t_ns, dtype=np.int64)
+        try:
+            f = self.features(truck_id, operator_id, road_id, excavator_id, weather, road_cond, shift, int(t_ns[0]) if len(t_ns) else 0)
+        except KeyError:
+            return None
+        n = len(t_ns)
+        purchase = self.truck_purchase_ns[self.truck_index[truck_id]]
+        if purchase is None:
+            age = [float(DEFAULT_TRUCK_AGE_DAYS)] * n
+        else:
+            age = np.maximum(0, (t_ns - purchase) // DAY_NS).astype(np.float64).tolist()
+        completion = self.maintenance_ns.get(truck_id)
+        if completion is None:
+            since = [float(DEFAULT_DAYS_SINCE_MAINTENANCE)] * n
+        else:
+            completion = np.asarray(completion, dtype=np.int64)
+            pos = np.searchsorted(completion, t_ns, side='left')
+            last = completion[np.maximum(pos - 1, 0)]
+            since = np.where(pos == 0, DEFAULT_DAYS_SINCE_MAINTENANCE,
+                             np.maximum(0, (t_ns - last) // DAY_NS)).astype(np.float64).tolist()
+        time_features = {'truck_age_days': age, 'days_since_last_maintenance': since}
+        cols = []
+        try:
+            for c in columns:
+                name = canonical_feature_name(c)
+                cols.append(time_features[name] if name in time_features else [f[name]] * n)
+        except KeyError:
+            return None
+        return list(zip(*cols))
+
+    @staticmethod
+    def to_frame(rows, columns):
+        """Matriks fitur (list of tuple) -> DataFrame dengan kolom yang diharapkan pipeline model."""
+        return pd.DataFrame(list(rows), columns=list(columns))
+
+
+def build_maintenance_index(maintenance):
+    """truckId -> list completionDate (ns, UTC) terurut naik, hanya status COMPLETED."""
+    index = {}
+    if maintenance is None or not isinstance(maintenance, pd.DataFrame) or maintenance.empty:
+        return index
+    if 'truckId' not in maintenance.columns or 'completionDate' not in maintenance.columns:
+        return index
+    maint = maintenance
+    if 'status' in maint.columns:
+        maint = maint[maint['status'] == 'COMPLETED']
+    ns, nat = _utc_ns_array(maint['completionDate'].values)
+    df = pd.DataFrame({'truckId': maint['truckId'].values, 'ns': ns})[~nat & maint['truckId'].notna().values]
+    for truck_id, group in df.groupby("truckId", sort=False, observed=True):
+        index[truck_id] = sorted(group['ns'].astype(np.int64).tolist())
+    return index
+
+
+def get_feature_store(data):
+    """
+    FeatureStore untuk bundle data ini, dibangun sekali lalu disimpan di data['derived'].
+    Dibangun ulang otomatis jika salah satu tabel sumber diganti.
+    """
+    derived = data.setdefault('derived', {})
+    sources = tuple(data.get(k) for k in ('trucks', 'excavators', 'operators', 'roads', 'maintenance'))
+    cached = derived.get('feature_store')
+    if cached is not None and all(a is b for a, b in zip(cached[0], sources)):
+        return cached[1]
+    store = FeatureStore(data)
+    derived['feature_store'] = (sources, store)
+    return store
@@ -0,0 +1,300 @@
+import heapq
+from collections import deque
+import numpy as np
+from event_recorder import PHASE_HAUL, PHASE_QUEUE, PHASE_LOAD, PHASE_RETURN, PHASE_DUMP, PHASE_CYCLE
+
+# Fase event dalam satu siklus truk: haul -> antri -> loading -> return -> dumping
+HAUL_END = 0
+GRANT = 1       # excavator diberikan ke truk terdepan di antrian
+LOAD_END = 2
+RELEASE = 3     # excavator dilepas; truk berikutnya di antrian boleh masuk
+RETURN_END = 4
+DUMP_END = 5
+
+
+def run_haul_cycles(num_servers, haul_hours, load_hours, return_hours, dump_hours, maint_rate,
+                    until, cycle_start, metrics, recorder=None):
+    """
+    Event kernel khusus siklus haul (pengganti SimPy untuk truck_process_hybrid).
+
+    Satu binary heap berisi (waktu, seq, truk, fase). seq naik monoton sehingga
+    event pada waktu yang sama diproses sesuai urutan penjadwalan, sama seperti
+    antrian event SimPy. Excavator dimodelkan sebagai counter kapasitas + FIFO:
+    permintaan baru dan pelepasan excavator masing-masing memberi excavator ke
+    paling banyak satu truk terdepan, seperti simpy.Resource. Dengan urutan event
+    yang sama, urutan pemanggilan RNG dan akumulasi metrik identik dengan SimPy.
+
+    Args:
+        num_servers: jumlah excavator (kapasitas resource).
+        haul_hours, load_hours, return_hours, dump_hours, maint_rate: per truk (panjang N).
+        until: durasi simulasi (jam); event pada waktu >= until tidak diproses.
+        cycle_start: callable(k, t) -> (fuel, load, delay) dipanggil di awal tiap siklus truk k.
+        metrics: dict metrik (new_simulation_metrics) yang diakumulasi in-place.
+        recorder: EventRecorder opsional; fase tiap siklus dicatat saat fase selesai.
+
+    Returns:
+        (cycles_per_truck, events_processed) - cycles_per_truck array int64 (N,).
+    """
+    n = len(haul_hours)
+    haul = [float(x) for x in haul_hours]
+    load_t = [float(x) for x in load_hours]
+    ret = [float(x) for x in return_hours]
+    dump = [float(x) for x in dump_hours]
+    maint = [float(x) for x in maint_rate]
+
+    # State per truk dialokasikan sekali (list Python lebih cepat dari akses skalar NumPy di loop)
+    cycle_begin = [0.0] * n
+    phase_begin = [0.0] * n
+    queue_enter = [0.0] * n
+    cyc_fuel = [0.0] * n
+    cyc_load = [0.0] * n
+    cyc_delay = [0.0] * n
+    cycles = [0] * n
+
+    heap = []
+    push = heapq.heappush
+    pop = heapq.heappop
+    seq = 0
+    users = 0
+    waiting = deque()
+    events = n
+    record = recorder.record if recorder is not None else None
+
+    m_haul = metrics['total_hauling_time_hours']
+    m_queue = metrics['total_waktu_antri_jam']
+    m_load = metrics['total_loading_time_hours']
+    m_return = metrics['total_return_time_hours']
+    m_dump = metrics['total_dumping_time_hours']
+    m_cycle = metrics['total_cycle_time_hours']
+    m_tonase = metrics['total_tonase']
+    m_bbm = metrics['total_bbm_liter']
+    m_delay = metrics['total_probabilitas_delay']
+    m_siklus = metrics['jumlah_siklus_selesai']
+    m_maint = metrics['total_maintenance_cost']
+
+    for k in range(n):
+        cyc_fuel[k], cyc_load[k], cyc_delay[k] = cycle_start(k, 0.0)
+        push(heap, (haul[k], seq, k, HAUL_END))
+        seq += 1
+
+    while heap:
+        t, _, k, phase = pop(heap)
+        if t >= until:
+            break
+        events += 1
+
+        if phase == HAUL_END:
+            m_haul += t - phase_begin[k]
+            if record:
+                record(k, cycles[k], PHASE_HAUL, phase_begin[k], t)
+            queue_enter[k] = t
+            waiting.append(k)
+            if users < num_servers:
+                users += 1
+                push(heap, (t, seq, waiting.popleft(), GRANT))
+                seq += 1
+        elif phase == GRANT:
+            m_queue += t - queue_enter[k]
+            if record:
+                record(k, cycles[k], PHASE_QUEUE, queue_enter[k], t)
+            phase_begin[k] = t
+            push(heap, (t + load_t[k], seq, k, LOAD_END))
+            seq += 1
+        elif phase == LOAD_END:
+            m_load += t - phase_begin[k]
+            if record:
+                record(k, cycles[k], PHASE_LOAD, phase_begin[k], t)
+            users -= 1
+            push(heap, (t, seq, k, RELEASE))
+            phase_begin[k] = t
+            push(heap, (t + ret[k], seq + 1, k, RETURN_END))
+            seq += 2
+        elif phase == RELEASE:
+            if waiting and users < num_servers:
+                users += 1
+                push(heap, (t, seq, waiting.popleft(), GRANT))
+                seq += 1
+        elif phase == RETURN_END:
+            m_return += t - phase_begin[k]
+            if record:
+                record(k, cycles[k], PHASE_RETURN, phase_begin[k], t)
+            phase_begin[k] = t
+            push(heap, (t + dump[k], seq, k, DUMP_END))
+            seq += 1
+        else:
+            m_dump += t - phase_begin[k]
+            cycle_duration = t - cycle_begin[k]
+            m_cycle += cycle_duration
+            m_tonase += cyc_load[k]
+            m_bbm += cyc_fuel[k]
+            m_delay += cyc_delay[k]
+            m_siklus += 1
+            m_maint += cycle_duration * maint[k]
+            if record:
+                record(k, cycles[k], PHASE_DUMP, phase_begin[k], t)
+                record(k, cycles[k], PHASE_CYCLE, cycle_begin[k], t, cyc_load[k], cyc_fuel[k])
+            cycles[k] += 1
+
+            cycle_begin[k] = t
+            phase_begin[k] = t
+            cyc_fuel[k], cyc_load[k], cyc_delay[k] = cycle_start(k, t)
+            push(heap, (t + haul[k], seq, k, HAUL_END))
+            seq += 1
+
+    metrics['total_hauling_time_hours'] = m_haul
+    metrics['total_waktu_antri_jam'] = m_queue
+    metrics['total_loading_time_hours'] = m_load
+    metrics['total_return_time_hours'] = m_return
+    metrics['total_dumping_time_hours'] = m_dump
+    metrics['total_cycle_time_hours'] = m_cycle
+    metrics['total_tonase'] = m_tonase
+    metrics['total_bbm_liter'] = m_bbm
+    metrics['total_probabilitas_delay'] = m_delay
+    metrics['jumlah_siklus_selesai'] = m_siklus
+    metrics['total_maintenance_cost'] = m_maint
+    return np.array(cycles, dtype=np.int64), events
+
+
+def run_dispatched_cycles(dispatcher, haul_hours, excavator_load_hours, return_hours, dump_hours, maint_rate,
+                          until, cycle_start, metrics, recorder=None, completed=None):
+    """
+    Varian run_haul_cycles dengan resource per excavator (kapasitas 1, FIFO per excavator).
+
+    Saat hauling selesai, dispatcher (dispatch.ExcavatorDispatcher) memilih excavator e;
+    durasi loading = excavator_load_hours[e]. cycle_start(k, t_mulai_siklus, e) dipanggil
+    setelah pemilihan karena fitur ML bergantung pada excavator yang melayani. Urutan event
+    sama dengan SimPy (satu simpy.Resource per excavator), sehingga hasilnya identik.
+    Jika `completed` (list) diberikan, setiap siklus selesai ditambahkan sebagai
+    (truk, mulai, selesai, excavator) sesuai urutan selesainya.
+
+    Returns:
+        (cycles_per_truck, events_processed) seperti run_haul_cycles.
+    """
+    n = len(haul_hours)
+    haul = [float(x) for x in haul_hours]
+    load_e = [float(x) for x in excavator_load_hours]
+    ret = [float(x) for x in return_hours]
+    dump = [float(x) for x in dump_hours]
+    maint = [float(x) for x in maint_rate]
+    E = len(load_e)
+
+    cycle_begin = [0.0] * n
+    phase_begin = [0.0] * n
+    queue_enter = [0.0] * n
+    assigned = [0] * n
+    cyc_fuel = [0.0] * n
+    cyc_load = [0.0] * n
+    cyc_delay = [0.0] * n
+    cycles = [0] * n
+
+    heap = []
+    push = heapq.heappush
+    pop = heapq.heappop
+    seq = 0
+    users = [0] * E
+    waiting = [deque() for _ in range(E)]
+    events = n
+    record = recorder.record if recorder is not None else None
+    done = completed.append if completed is not None else None
+    choose = dispatcher.choose
+    release = dispatcher.release
+
+    m_haul = metrics['total_hauling_time_hours']
+    m_queue = metrics['total_waktu_antri_jam']
+    m_load = metrics['total_loading_time_hours']
+    m_return = metrics['total_return_time_hours']
+    m_dump = metrics['total_dumping_time_hours']
+    m_cycle = metrics['total_cycle_time_hours']
+    m_tonase = metrics['total_tonase']
+    m_bbm = metrics['total_bbm_liter']
+    m_delay = metrics['total_probabilitas_delay']
+    m_siklus = metrics['jumlah_siklus_selesai']
+    m_maint = metrics['total_maintenance_cost']
+
+    for k in range(n):
+        push(heap, (haul[k], seq, k, HAUL_END))
+        seq += 1
+
+    while heap:
+        t, _, k, phase = pop(heap)
+        if t >= until:
+            break
+        events += 1
+
+        if phase == HAUL_END:
+            m_haul += t - phase_begin[k]
+            if record:
+                record(k, cycles[k], PHASE_HAUL, phase_begin[k], t)
+            e = choose(k, t)
+            assigned[k] = e
+            cyc_fuel[k], cyc_load[k], cyc_delay[k] = cycle_start(k, cycle_begin[k], e)
+            queue_enter[k] = t
+            waiting[e].append(k)
+            if users[e] < 1:
+                users[e] += 1
+                push(heap, (t, seq, waiting[e].popleft(), GRANT))
+                seq += 1
+        elif phase == GRANT:
+            m_queue += t - queue_enter[k]
+            if record:
+                record(k, cycles[k], PHASE_QUEUE, queue_enter[k], t)
+            phase_begin[k] = t
+            push(heap, (t + load_e[assigned[k]], seq, k, LOAD_END))
+            seq += 1
+        elif phase == LOAD_END:
+            m_load += t - phase_begin[k]
+            if record:
+                record(k, cycles[k], PHASE_LOAD, phase_begin[k], t)
+            e = assigned[k]
+            users[e] -= 1
+            release(e)
+            push(heap, (t, seq, k, RELEASE))
+            phase_begin[k] = t
+            push(heap, (t + ret[k], seq + 1, k, RETURN_END))
+            seq += 2
+        elif phase == RELEASE:
+            e = assigned[k]
+            if waiting[e] and users[e] < 1:
+                users[e] += 1
+                push(heap, (t, seq, waiting[e].popleft(), GRANT))
+                seq += 1
+        elif phase == RETURN_END:
+            m_return += t - phase_begin[k]
+            if record:
+                record(k, cycles[k], PHASE_RETURN, phase_begin[k], t)
+            phase_begin[k] = t
+            push(heap, (t + dump[k], seq, k, DUMP_END))
+            seq += 1
+        else:
+            m_dump += t - phase_begin[k]
+            cycle_duration = t - cycle_begin[k]
+            m_cycle += cycle_duration
+            m_tonase += cyc_load[k]
+            m_bbm += cyc_fuel[k]
+            m_delay += cyc_delay[k]
+            m_siklus += 1
+            m_maint += cycle_duration * maint[k]
+            if record:
+                record(k, cycles[k], PHASE_DUMP, phase_begin[k], t)
+                record(k, cycles[k], PHASE_CYCLE, cycle_begin[k], t, cyc_load[k], cyc_fuel[k])
+            if done:
+                done((k, cycle_begin[k], t, assigned[k]))
+            cycles[k] += 1
+
+            cycle_begin[k] = t
+            phase_begin[k] = t
+            push(heap, (t + haul[k], seq, k, HAUL_END))
+            seq += 1
+
+    metrics['total_hauling_time_hours'] = m_haul
+    metrics['total_waktu_antri_jam'] = m_queue
+    metrics['total_loading_time_hours'] = m_load
+    metrics['total_return_time_hours'] = m_return
+    metrics['total_dumping_time_hours'] = m_dump
+    metrics['total_cycle_time_hours'] = m_cycle
+    metrics['total_tonase'] = m_tonase
+    metrics['total_bbm_liter'] = m_bbm
+    metrics['total_probabilitas_delay'] = m_delay
+    metrics['jumlah_siklus_selesai'] = m_siklus
+    metrics['total_maintenance_cost'] = m_maint
+    return np.array(cycles, dtype=np.int64), events
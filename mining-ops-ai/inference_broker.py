@@ -0,0 +1,76 @@
+import os
+
+# Maksimum baris fitur per batch predict (<= 1 = prediksi per baris seperti sebelumnya)
+INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", "512"))
+
+_MISSING = object()
+
+
+class InferenceBroker:
+    """
+    Micro-batching inferensi ML di dalam satu simulasi.
+
+    Truk mengirim baris fitur di awal siklus (submit -> handle) tanpa menunggu;
+    hasil baru dibutuhkan saat metrik siklus diakumulasi. Baris yang belum
+    diprediksi dikumpulkan dan diprediksi sekaligus (satu panggilan predict per
+    model) saat batch mencapai max_batch atau saat hasil diminta (get/flush).
+    Vektor fitur yang sama dalam satu batch hanya diprediksi sekali, dan
+    prediction_cache (jika ada) tetap dipakai lintas skenario.
+    """
+
+    def __init__(self, predict_batch, prediction_cache=None, max_batch=INFERENCE_BATCH_SIZE):
+        """
+        Args:
+            predict_batch: callable(list baris fitur) -> list hasil per baris (None jika gagal).
+            prediction_cache: PredictionCache opsional (kunci = tuple fitur).
+        """
+        self.predict_batch = predict_batch
+        self.prediction_cache = prediction_cache
+        self.max_batch = max(1, int(max_batch))
+        self._results = []
+        self._pending = {}
+        self.batches = 0
+        self.rows = 0
+        self.predicted_rows = 0
+
+    def submit(self, values):
+        handle = len(self._results)
+        self.rows += 1
+        cached = _MISSING
+        if self.prediction_cache is not None:
+            cached = self.prediction_cache.get(values, _MISSING)
+        if cached is not _MISSING:
+            self._results.append(cached)
+            return handle
+        self._results.append(_MISSING)
+        self._pending.setdefault(values, []).append(handle)
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        return handle
+
+    def get(self, handle):
+        if self._results[handle] is _MISSING:
+            self.flush()
+        return self._results[handle]
+
+    def flush(self):
+        if not self._pending:
+            return
+        rows = list(self._pending.keys())
+        outputs = self.predict_batch(rows)
+        for values, output in zip(rows, outputs):
+            for handle in self._pending[values]:
+                self._results[handle] = output
+            if self.prediction_cache is not None:
+                self.prediction_cache.put(values, output)
+        self._pending = {}
+        self.batches += 1
+        self.predicted_rows += len(rows)
+
+    def stats(self):
+        return {
+            'rows': self.rows,
+            'predicted_rows': self.predicted_rows,
+            'batches': self.batches,
+            'max_batch': self.max_batch
+        }
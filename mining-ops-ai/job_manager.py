@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from sweep_progress import SweepProgress, SweepCancelled
+
+# Jumlah job simulasi yang berjalan bersamaan (sweep sendiri bisa memakai pool proses)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Maksimum job yang menunggu di antrian; lebih dari ini ditolak (admission control)
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "8"))
+# Batas waktu default & maksimum per job (detik)
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "1800"))
+JOB_MAX_TIMEOUT_SECONDS = float(os.getenv("JOB_MAX_TIMEOUT_SECONDS", "7200"))
+# Lama hasil job disimpan setelah selesai (detik)
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+# File SQLite untuk status & hasil job ('' = hanya di memori)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join("cache", "jobs.sqlite3"))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMEOUT = 'timeout'
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED, TIMEOUT)
+
+_COLUMNS = ('id', 'kind', 'status', 'created_at', 'started_at', 'finished_at', 'expires_at',
+            'timeout_seconds', 'request', 'progress', 'result', 'error')
+
+
+class JobQueueFull(Exception):
+    """Antrian job penuh; pemanggil sebaiknya mencoba lagi nanti."""
+
+
+class JobManager:
+    """
+    Job simulasi asinkron untuk sweep yang bisa melebihi timeout reverse proxy.
+
+    submit() mengembalikan job id; fungsi job dijalankan di pool thread terbatas
+    (workers) dengan antrian maksimal queue_max (lebih dari itu -> JobQueueFull).
+    Fungsi job menerima SweepProgress: progress terakhir, top-3 sementara, dan
+    pembatalan (cancel() atau timeout per job) memakai mekanisme yang sama dengan
+    endpoint streaming.
+
+    Status dan hasil disimpan di SQLite (db_path) sampai TTL habis, sehingga hasil
+    tetap bisa diambil setelah server restart. Job yang masih queued/running saat
+    proses berhenti ditandai failed ketika manager dibuat ulang.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, queue_max=JOB_QUEUE_MAX, timeout_seconds=JOB_TIMEOUT_SECONDS,
+                 ttl_seconds=JOB_RESULT_TTL_SECONDS, db_path=JOB_DB_PATH):
+        self.workers = max(1, int(workers))
+        self.queue_max = max(0, int(queue_max))
+        self.timeout_seconds = float(timeout_seconds)
+        self.ttl_seconds = float(ttl_seconds)
+        self.db_path = db_path
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._executor = None
+        self._init_db()
+
+    # --- Persistensi SQLite ---
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _init_db(self):
+        if not self.db_path:
+            return
+        try:
+            folder = os.path.dirname(self.db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with self._db_lock, self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, status TEXT, "
+                    "created_at REAL, started_at REAL, finished_at REAL, expires_at REAL, timeout_seconds REAL, "
+                    "request TEXT, progress TEXT, result TEXT, error TEXT)"
+                )
+                # Job yang terputus oleh restart tidak bisa dilanjutkan
+                interrupted = conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ? WHERE status IN (?, ?)",
+                    (FAILED, "Job terputus karena server restart", time.time(), time.time() + self.ttl_seconds,
+                     QUEUED, RUNNING)
+                ).rowcount
+            if interrupted:
+                print(f"   ⚠️ {interrupted} job terputus oleh restart ditandai failed")
+            self.purge_expired()
+        except Exception as e:
+            print(f"   ⚠️ Gagal menyiapkan database job {self.db_path}: {e}")
+            self.db_path = ''
+
+    def _persist(self, job):
+        if not self.db_path:
+            return
+        row = {k: job.get(k) for k in _COLUMNS}
+        for k in ('request', 'progress', 'result'):
+            row[k] = json.dumps(row[k], default=str) if row[k] is not None else None
+        try:
+            with self._db_lock, self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    [row[k] for k in _COLUMNS]
+                )
+        except Exception as e:
+            print(f"   ⚠️ Gagal menyimpan job {job['id']}: {e}")
+
+    def _load(self, job_id):
+        if not self.db_path:
+            return None
+        try:
+            with self._db_lock, self._connect() as conn:
+                row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        except Exception as e:
+            print(f"   ⚠️ Gagal membaca job {job_id}: {e}")
+            return None
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        for k in ('request', 'progress', 'result'):
+            job[k] = json.loads(job[k]) if job[k] else None
+        return job
+
+    def purge_expired(self):
+        """Hapus job selesai yang TTL-nya sudah habis (memori dan SQLite)."""
+        now = time.time()
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items() if job['expires_at'] and job['expires_at'] <= now]:
+                del self._jobs[job_id]
+        if self.db_path:
+            try:
+                with self._db_lock, self._connect() as conn:
+                    conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            except Exception as e:
+                print(f"   ⚠️ Gagal menghapus job kedaluwarsa: {e}")
+
+    # --- Siklus hidup job ---
+
+    def _get_executor(self):
+        # Dengan lock: submit() konkuren tidak boleh membuat dua executor
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            return self._executor
+
+    def submit(self, kind, func, request=None, timeout_seconds=None):
+        """
+        Args:
+            func: callable(progress: SweepProgress) -> hasil JSON-serializable.
+            request: payload request (disimpan untuk audit/debug).
+            timeout_seconds: batas waktu job (default timeout manager, maks JOB_MAX_TIMEOUT_SECONDS).
+
+        Returns:
+            dict status job (lihat get).
+
+        Raises:
+            JobQueueFull: jika job aktif sudah mencapai workers + queue_max.
+        """
+        self.purge_expired()
+        timeout = min(float(timeout_seconds or self.timeout_seconds), JOB_MAX_TIMEOUT_SECONDS)
+        job = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': QUEUED,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'expires_at': None,
+            'timeout_seconds': timeout,
+            'request': request,
+            'progress': None,
+            'result': None,
+            'error': None,
+            'future': None
+        }
+        job['tracker'] = SweepProgress(lambda event: self._on_event(job, event))
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j['status'] in (QUEUED, RUNNING))
+            if active >= self.workers + self.queue_max:
+                raise JobQueueFull(f"Antrian job penuh ({active} job aktif)")
+            self._jobs[job['id']] = job
+        self._persist(job)
+        job['future'] = self._get_executor().submit(self._run, job, func)
+        print(f"   📥 Job {job['id']} ({kind}) masuk antrian")
+        return self.get(job['id'])
+
+    def _on_event(self, job, event):
+        progress = job['progress'] or {}
+        if event['type'] == 'progress':
+            progress.update({k: event[k] for k in ('done', 'total', 'elapsed_seconds', 'eta_seconds', 'best')})
+        elif event['type'] == 'provisional':
+            progress['provisional_top_3'] = event['top_3']
+        elif event['type'] == 'step':
+            progress['step'] = event['message']
+        job['progress'] = progress
+
+    def _run(self, job, func):
+        tracker = job['tracker']
+        if tracker.cancelled:
+            # Dibatalkan tepat saat worker mengambil job dari antrian
+            self._finish(job, CANCELLED, error="Job dibatalkan sebelum dijalankan")
+            return
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            tracker.cancel()
+
+        timer = threading.Timer(job['timeout_seconds'], on_timeout)
+        timer.daemon = True
+        job['status'] = RUNNING
+        job['started_at'] = time.time()
+        self._persist(job)
+        timer.start()
+        try:
+            result = func(tracker)
+            status, error = SUCCEEDED, None
+        except SweepCancelled:
+            if timed_out.is_set():
+                status, error = TIMEOUT, f"Job melebihi batas waktu {job['timeout_seconds']:.0f}s"
+            else:
+                status, error = CANCELLED, "Job dibatalkan"
+            result = None
+        except Exception as e:
+            print(f"❌ Job {job['id']} gagal: {e}")
+            status, error, result = FAILED, str(e), None
+        finally:
+            timer.cancel()
+        self._finish(job, status, result, error)
+
+    def _finish(self, job, status, result=None, error=None):
+        job['status'] = status
+        job['result'] = result
+        job['error'] = error
+        job['finished_at'] = time.time()
+        job['expires_at'] = job['finished_at'] + self.ttl_seconds
+        self._persist(job)
+        seconds = job['finished_at'] - (job['started_at'] or job['created_at'])
+        print(f"   📤 Job {job['id']} {status} ({seconds:.1f}s)")
+
+    def cancel(self, job_id):
+        """Batalkan job queued/running. Returns status job, atau None jika tidak ditemukan."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self.get(job_id)
+        if job['status'] in FINISHED_STATES:
+            return self.get(job_id)
+        job['tracker'].cancel()
+        if job['future'] is not None and job['future'].cancel():
+            # Belum sempat mulai: langsung selesai tanpa menunggu worker
+            self._finish(job, CANCELLED, error="Job dibatalkan sebelum dijalankan")
+        return self.get(job_id)
+
+    def _queue_position(self, job_id):
+        queued = sorted((j for j in self._jobs.values() if j['status'] == QUEUED), key=lambda j: j['created_at'])
+        for i, job in enumerate(queued):
+            if job['id'] == job_id:
+                return i + 1
+        return None
+
+    def get(self, job_id):
+        """Status, progress, dan hasil job (None jika tidak ada atau sudah kedaluwarsa)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            queue_position = self._queue_position(job_id) if job is not None and job['status'] == QUEUED else None
+        if job is None:
+            job = self._load(job_id)
+            if job is None:
+                return None
+        if job['expires_at'] and job['expires_at'] <= time.time():
+            return None
+        view = {k: job.get(k) for k in _COLUMNS if k != 'request'}
+        for k in ('created_at', 'started_at', 'finished_at', 'expires_at'):
+            view[k] = datetime.fromtimestamp(view[k]).isoformat() if view[k] else None
+        if queue_position is not None:
+            view['queue_position'] = queue_position
+        if job.get('tracker') is not None and job['tracker'].cancelled and job['status'] not in FINISHED_STATES:
+            view['cancel_requested'] = True
+        return view
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'workers': self.workers,
+            'queue_max': self.queue_max,
+            'timeout_seconds': self.timeout_seconds,
+            'ttl_seconds': self.ttl_seconds,
+            'persistent': bool(self.db_path),
+            'jobs': counts
+        }
+
+    def shutdown(self):
+        """Batalkan semua job aktif (dipanggil saat server berhenti)."""
+        with self._lock:
+            active = [j for j in self._jobs.values() if j['status'] in (QUEUED, RUNNING)]
+        for job in active:
+            job['tracker'].cancel()
+            if job['future'] is not None and job['future'].cancel():
+                self._finish(job, CANCELLED, error="Server berhenti")
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,221 @@
+import numpy as np
+from haul_kernel import HAUL_END, GRANT, LOAD_END, RELEASE, RETURN_END, DUMP_END
+
+_NO_TICKET = np.iinfo(np.int64).max
+# Per fase event truk yang selesai (indeks = fase): fase berikutnya, offset seq event
+# berikutnya, dan jumlah seq yang dipakai (LOAD_END: RELEASE = seq, RETURN_END = seq + 1)
+_NEXT_PHASE = np.array([GRANT, LOAD_END, RETURN_END, RELEASE, DUMP_END, HAUL_END], dtype=np.int64)
+_SEQ_OFFSET = np.array([0, 0, 1, 0, 0, 0], dtype=np.int64)
+_SEQ_USED = np.array([0, 1, 2, 0, 1, 1], dtype=np.int64)
+
+
+def run_lockstep_cycles(num_servers, num_trucks, haul_hours, load_hours, return_hours, dump_hours, maint_rate, until):
+    """
+    Event kernel siklus haul untuk banyak skenario sekaligus (lockstep).
+
+    State semua skenario disimpan sebagai array 2-D (slot event x skenario): baris
+    k = event fase truk k, baris K+k = event RELEASE excavator oleh truk k. Setiap
+    langkah memproses tepat satu event per skenario yang masih berjalan, yaitu event
+    dengan (waktu, seq) terkecil -> urutan event per skenario sama persis dengan
+    haul_kernel.run_haul_cycles (dan SimPy). Antrian excavator per skenario adalah
+    FIFO berbasis nomor tiket. Semua update dilakukan vektor untuk seluruh skenario
+    yang sedang berada di fase yang sama, sehingga overhead interpreter per event
+    dibagi oleh banyak skenario. Skenario yang sudah mencapai `until` dibuang dari
+    state (pemadatan kolom) agar langkah berikutnya hanya memproses yang masih berjalan.
+
+    Waktu event tidak bergantung pada hasil ML, jadi BBM/muatan/delay siklus tidak
+    dihitung di sini: siklus yang selesai dicatat (skenario, truk, siklus ke-j, jam
+    mulai) dan diakumulasi pemanggil dengan urutan yang sama.
+
+    Args:
+        num_servers: jumlah excavator per skenario, shape (S,).
+        num_trucks: jumlah truk aktif per skenario (slot >= num_trucks tidak dipakai), shape (S,).
+        haul_hours, load_hours, return_hours, dump_hours, maint_rate: shape (S, K).
+        until: durasi simulasi (jam); event pada waktu >= until tidak diproses.
+
+    Returns:
+        dict berisi array metrik waktu per skenario (kunci sama dengan new_simulation_metrics)
+        dan 'completed' = (s, k, j, start, end) siklus selesai, berurutan per skenario sesuai
+        urutan selesainya.
+    """
+    servers = np.asarray(num_servers, dtype=np.int64)
+    n = np.asarray(num_trucks, dtype=np.int64)
+    # Layout (slot, skenario): reduksi per skenario = reduksi axis 0 yang kontigu
+    haul = np.asarray(haul_hours, dtype=np.float64).T.copy()
+    load_t = np.asarray(load_hours, dtype=np.float64).T
+    ret = np.asarray(return_hours, dtype=np.float64).T
+    dump = np.asarray(dump_hours, dtype=np.float64).T
+    maint = np.asarray(maint_rate, dtype=np.float64).T.copy()
+    K, S = haul.shape
+    E = 2 * K
+
+    # Hasil per skenario (indeks asli)
+    res_phase_time = np.zeros((6, S))
+    res_cycle = np.zeros(S)
+    res_maint = np.zeros(S)
+    res_siklus = np.zeros(S, dtype=np.int64)
+    res_cycles = np.zeros((K, S), dtype=np.int64)
+    log = []
+
+    ids = np.flatnonzero(n > 0)
+    W = len(ids)
+    slot = np.arange(K)[:, None]
+    ev_time = np.where(slot < n[ids], haul[:, ids], np.inf)
+    ev_time = np.concatenate([ev_time, np.full((K, W), np.inf)])
+    # Kunci urutan event pada waktu sama: seq * E + kolom (seq unik per skenario)
+    ev_key = np.concatenate([np.repeat(slot * E + slot, W, axis=1), np.zeros((K, W), dtype=np.int64)])
+    seq = n[ids].copy()
+    srv = servers[ids]
+    phase = np.full((K, W), HAUL_END, dtype=np.int64)
+    # Durasi fase berikutnya per fase event yang selesai; HAUL_END -> antri (tanpa event)
+    next_duration = np.stack([
+        np.full((K, W), np.inf), load_t[:, ids], ret[:, ids], np.full((K, W), np.inf), dump[:, ids], haul[:, ids]
+    ])
+    rate = np.ascontiguousarray(maint[:, ids])
+    # mark = awal fase berjalan (untuk truk yang antri: waktu masuk antrian)
+    mark = np.zeros((K, W))
+    cycle_begin = np.zeros((K, W))
+    cycles = np.zeros((K, W), dtype=np.int64)
+    # Antrian FIFO: kunci tiket * K + truk, _NO_TICKET jika tidak antri
+    queue_key = np.full((K, W), _NO_TICKET, dtype=np.int64)
+    next_ticket = np.zeros(W, dtype=np.int64)
+    users = np.zeros(W, dtype=np.int64)
+    # Baris = fase yang selesai: haul, antri, loading, (release), return, dumping
+    phase_time = np.zeros((6, W))
+    m_cycle = np.zeros(W)
+    m_maint = np.zeros(W)
+    m_siklus = np.zeros(W, dtype=np.int64)
+
+    def grant(gs, gt, W, views):
+        # Excavator ke truk terdepan (tiket terkecil) di antrian skenario gs
+        ev_time_f, ev_key_f, phase_f, _, queue_f = views[:5]
+        users[gs] += 1
+        gk = queue_key[:, gs].min(0) % K
+        gf = gk * W + gs
+        queue_f[gf] = _NO_TICKET
+        ev_time_f[gf] = gt
+        ev_key_f[gf] = seq[gs] * E + gk
+        seq[gs] += 1
+        phase_f[gf] = GRANT
+
+    def save(cols):
+        # Salin state skenario (kolom) ke hasil per indeks asli
+        orig = ids[cols]
+        res_phase_time[:, orig] = phase_time[:, cols]
+        res_cycle[orig] = m_cycle[cols]
+        res_maint[orig] = m_maint[cols]
+        res_siklus[orig] = m_siklus[cols]
+        res_cycles[:, orig] = cycles[:, cols]
+
+    views = None
+    while W:
+        # Skenario dengan event berikutnya >= until berhenti permanen (tidak ada event baru)
+        t_all = ev_time.min(0)
+        s = np.flatnonzero(t_all < until)
+        if not s.size:
+            break
+        if 2 * s.size < W:
+            # Sebagian besar skenario sudah selesai: ringkas state ke kolom yang masih berjalan
+            # (kontigu: update lewat view reshape(-1))
+            save(np.arange(W))
+            ids = ids[s]
+            ev_time, ev_key, seq, srv, phase, next_duration, rate, mark, cycle_begin, cycles, queue_key, \
+                next_ticket, users, phase_time, m_cycle, m_maint, m_siklus = (
+                    np.ascontiguousarray(a[..., s]) for a in (ev_time, ev_key, seq, srv, phase, next_duration, rate, mark, cycle_begin,
+                                        cycles, queue_key, next_ticket, users, phase_time, m_cycle, m_maint, m_siklus))
+            t_all = t_all[s]
+            W = len(ids)
+            s = np.arange(W)
+            views = None
+        if views is None:
+            # View datar (indeks slot * W + skenario) dibuat ulang hanya setelah pemadatan
+            views = tuple(a.reshape(-1) for a in (ev_time, ev_key, phase, mark, queue_key, next_duration,
+                                                  phase_time, cycle_begin, cycles, rate))
+            ev_time_f, ev_key_f, phase_f, mark_f, queue_f, duration_f, phase_time_f, begin_f, cycles_f, rate_f = views
+        if s.size == W:
+            t = t_all
+            col = np.where(ev_time == t, ev_key, _NO_TICKET).min(0) % E
+        else:
+            t = t_all[s]
+            col = np.where(ev_time[:, s] == t, ev_key[:, s], _NO_TICKET).min(0) % E
+
+        is_release = col >= K
+        if is_release.any():
+            rs = s[is_release]
+            ev_time_f[col[is_release] * W + rs] = np.inf
+            free = (queue_key[:, rs].min(0) != _NO_TICKET) & (users[rs] < srv[rs])
+            if free.any():
+                grant(rs[free], t[is_release][free], W, views)
+            truck_event = ~is_release
+            s = s[truck_event]
+            col = col[truck_event]
+            t = t[truck_event]
+            if not s.size:
+                continue
+
+        # Bagian yang sama untuk semua fase truk: akumulasi durasi fase, jadwalkan fase berikutnya
+        k = col
+        f = k * W + s
+        ph = phase_f[f]
+        phase_time_f[ph * W + s] += t - mark_f[f]
+        mark_f[f] = t
+        ev_time_f[f] = t + duration_f[ph * (K * W) + f]
+        seq_s = seq[s]
+        ev_key_f[f] = (seq_s + _SEQ_OFFSET[ph]) * E + k
+        seq[s] = seq_s + _SEQ_USED[ph]
+        phase_f[f] = _NEXT_PHASE[ph]
+
+        count = np.bincount(ph, minlength=6)
+        if count[LOAD_END]:
+            sel = ph == LOAD_END
+            sl, kl = s[sel], k[sel]
+            users[sl] -= 1
+            fr = (K + kl) * W + sl
+            ev_time_f[fr] = t[sel]
+            ev_key_f[fr] = (seq_s[sel]) * E + K + kl
+
+        if count[HAUL_END]:
+            sel = ph == HAUL_END
+            sh, kh = s[sel], k[sel]
+            queue_f[kh * W + sh] = next_ticket[sh] * K + kh
+            next_ticket[sh] += 1
+            free = users[sh] < srv[sh]
+            if free.any():
+                grant(sh[free], t[sel][free], W, views)
+
+        if count[DUMP_END]:
+            sel = ph == DUMP_END
+            sd, fd, td = s[sel], f[sel], t[sel]
+            begin = begin_f[fd]
+            cycle_duration = td - begin
+            m_cycle[sd] += cycle_duration
+            m_siklus[sd] += 1
+            m_maint[sd] += cycle_duration * rate_f[fd]
+            log.append((ids[sd], k[sel], cycles_f[fd], begin, td))
+            cycles_f[fd] += 1
+            begin_f[fd] = td
+
+    if W:
+        save(np.arange(W))
+
+    if log:
+        done_s, done_k, done_j, done_start, done_end = (np.concatenate(parts) for parts in zip(*log))
+        # Urutan log = urutan langkah; stable sort per skenario mempertahankan urutan selesai
+        order = np.argsort(done_s, kind='stable')
+        completed = (done_s[order], done_k[order], done_j[order], done_start[order], done_end[order])
+    else:
+        completed = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                     np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0))
+
+    return {
+        'total_hauling_time_hours': res_phase_time[HAUL_END],
+        'total_waktu_antri_jam': res_phase_time[GRANT],
+        'total_loading_time_hours': res_phase_time[LOAD_END],
+        'total_return_time_hours': res_phase_time[RETURN_END],
+        'total_dumping_time_hours': res_phase_time[DUMP_END],
+        'total_cycle_time_hours': res_cycle,
+        'total_maintenance_cost': res_maint,
+        'jumlah_siklus_selesai': res_siklus,
+        'cycles': res_cycles.T,
+        'completed': completed
+    }
@@ -0,0 +1,219 @@
+import os
+import json
+import threading
+from datetime import datetime
+from itertools import product
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score, mean_absolute_error
+
+MODEL_FOLDER = 'models'
+METAMODEL_PATH = os.path.join(MODEL_FOLDER, 'metamodel.joblib')
+METAMODEL_META_PATH = os.path.join(MODEL_FOLDER, 'metamodel_meta.json')
+
+# Ukuran design of experiments malam hari (jumlah simulasi 8 jam)
+METAMODEL_DOE_SIZE = int(os.getenv("METAMODEL_DOE_SIZE", "2000"))
+METAMODEL_MAX_TRUCKS = int(os.getenv("METAMODEL_MAX_TRUCKS", "30"))
+METAMODEL_MAX_EXCAVATORS = int(os.getenv("METAMODEL_MAX_EXCAVATORS", "5"))
+METAMODEL_DISTANCE_BUCKETS = int(os.getenv("METAMODEL_DISTANCE_BUCKETS", "6"))
+
+# Level faktor DOE (sama dengan nilai yang dibedakan simulator.get_speed_factors)
+WEATHER_LEVELS = ('Cerah', 'Hujan Ringan', 'Hujan Lebat')
+ROAD_LEVELS = ('GOOD', 'FAIR', 'POOR')
+SHIFT_LEVELS = ('SHIFT_1', 'SHIFT_2', 'SHIFT_3')
+
+# Metrik fisik yang diprediksi (cukup untuk compute_profit_components dan cycle time)
+METAMODEL_TARGETS = (
+    'total_tonase', 'total_bbm_liter', 'total_waktu_antri_jam', 'jumlah_siklus_selesai',
+    'total_maintenance_cost', 'total_probabilitas_delay'
+)
+FEATURE_NAMES = (
+    [f'weather_{w}' for w in WEATHER_LEVELS] + [f'road_{r}' for r in ROAD_LEVELS] +
+    ['shift', 'trucks', 'excavators', 'trucks_per_excavator', 'distance_km']
+)
+
+_CACHE = {'bundle': None, 'mtime': None}
+_LOCK = threading.Lock()
+
+
+def encode_design(weather, road_condition, shift, trucks, excavators, distance_km):
+    """
+    Matriks fitur metamodel. Semua argumen array/list panjang S; kategori di luar
+    level DOE di-encode nol (metamodel mengekstrapolasi dari fitur numerik).
+    """
+    trucks = np.asarray(trucks, dtype=np.float64)
+    excavators = np.asarray(excavators, dtype=np.float64)
+    X = np.zeros((len(trucks), len(FEATURE_NAMES)), dtype=np.float64)
+    for j, level in enumerate(WEATHER_LEVELS):
+        X[:, j] = [w == level for w in weather]
+    for j, level in enumerate(ROAD_LEVELS):
+        X[:, len(WEATHER_LEVELS) + j] = [r == level for r in road_condition]
+    base = len(WEATHER_LEVELS) + len(ROAD_LEVELS)
+    X[:, base] = [SHIFT_LEVELS.index(s) + 1 if s in SHIFT_LEVELS else 0 for s in shift]
+    X[:, base + 1] = trucks
+    X[:, base + 2] = excavators
+    X[:, base + 3] = trucks / np.maximum(excavators, 1)
+    X[:, base + 4] = np.asarray(distance_km, dtype=np.float64)
+    return X
+
+
+def distance_buckets(roads, n_buckets=METAMODEL_DISTANCE_BUCKETS):
+    """
+    Bucket jarak rute berdasarkan kuantil; tiap bucket diwakili rute aktif yang
+    jaraknya paling dekat dengan median bucket. Returns list (road_id, distance_km).
+    """
+    if 'isActive' in roads.columns:
+        roads = roads[roads['isActive'].fillna(True).astype(bool)]
+    distance = roads['distance'].astype(float).dropna()
+    if distance.empty:
+        return []
+    edges = np.unique(np.quantile(distance.values, np.linspace(0, 1, n_buckets + 1)))
+    buckets = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        members = distance[(distance >= lo) & (distance <= hi)]
+        if members.empty:
+            continue
+        road_id = (members - members.median()).abs().idxmin()
+        if road_id not in [b[0] for b in buckets]:
+            buckets.append((road_id, float(distance.loc[road_id])))
+    return buckets
+
+
+def build_design(buckets, size=METAMODEL_DOE_SIZE, max_trucks=METAMODEL_MAX_TRUCKS,
+                 max_excavators=METAMODEL_MAX_EXCAVATORS, rng=None):
+    """
+    Design of experiments: sampel acak tanpa pengembalian dari faktorial penuh
+    cuaca x kondisi jalan x shift x jumlah truk x jumlah excavator x bucket jarak.
+    """
+    rng = rng or np.random.default_rng()
+    levels = list(product(WEATHER_LEVELS, ROAD_LEVELS, SHIFT_LEVELS, range(1, max_trucks + 1),
+                          range(1, max_excavators + 1), range(len(buckets))))
+    picks = rng.choice(len(levels), min(size, len(levels)), replace=False)
+    design = []
+    for i in sorted(picks.tolist()):
+        weather, road_cond, shift, trucks, excavators, b = levels[i]
+        design.append({
+            'weatherCondition': weather, 'roadCondition': road_cond, 'shift': shift,
+            'alokasi_truk': trucks, 'jumlah_excavator': excavators,
+            'target_road_id': buckets[b][0], 'distance_km': buckets[b][1]
+        })
+    return design
+
+
+def _design_matrix(design):
+    return encode_design(
+        [d['weatherCondition'] for d in design], [d['roadCondition'] for d in design],
+        [d['shift'] for d in design], [d['alokasi_truk'] for d in design],
+        [d['jumlah_excavator'] for d in design], [d['distance_km'] for d in design]
+    )
+
+
+def train_metamodel(design, metrics, test_size=0.2, seed=42):
+    """Fit random forest multi-output pada hasil DOE; skor holdout per metrik."""
+    X = _design_matrix(design)
+    Y = np.array([[m[t] for t in METAMODEL_TARGETS] for m in metrics], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(X))
+    n_test = max(1, int(len(X) * test_size)) if len(X) > 5 else 0
+    test, train = order[:n_test], order[n_test:]
+
+    model = RandomForestRegressor(n_estimators=200, min_samples_leaf=2, random_state=seed, n_jobs=-1)
+    model.fit(X[train], Y[train])
+    scores = {}
+    if n_test:
+        pred = model.predict(X[test])
+        for j, target in enumerate(METAMODEL_TARGETS):
+            scores[target] = {
+                'r2': float(r2_score(Y[test, j], pred[:, j])),
+                'mae': float(mean_absolute_error(Y[test, j], pred[:, j]))
+            }
+    # Model akhir memakai semua titik DOE
+    model.fit(X, Y)
+    return model, scores
+
+
+def save_metamodel(model, meta, folder=MODEL_FOLDER):
+    os.makedirs(folder, exist_ok=True)
+    joblib.dump({'model': model, 'targets': METAMODEL_TARGETS, 'features': FEATURE_NAMES, 'meta': meta},
+                os.path.join(folder, os.path.basename(METAMODEL_PATH)))
+    with open(os.path.join(folder, os.path.basename(METAMODEL_META_PATH)), 'w') as f:
+        json.dump(meta, f, indent=2, default=str)
+
+
+def load_metamodel(path=METAMODEL_PATH):
+    """Metamodel terakhir (di-cache, dimuat ulang jika file berubah) atau None jika belum ada."""
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    with _LOCK:
+        if _CACHE['bundle'] is None or _CACHE['mtime'] != mtime:
+            try:
+                _CACHE['bundle'] = joblib.load(path)
+                _CACHE['mtime'] = mtime
+            except Exception as e:
+                print(f"   ⚠️ Gagal memuat metamodel: {e}")
+                return None
+        return _CACHE['bundle']
+
+
+def predict_metrics(bundle, weather, road_condition, shift, trucks, excavators, distance_km):
+    """Prediksi metrik fisik 8 jam. Returns dict metrik -> array (S,), non-negatif."""
+    X = encode_design(weather, road_condition, shift, trucks, excavators, distance_km)
+    Y = np.maximum(np.asarray(bundle['model'].predict(X)).reshape(len(X), -1), 0.0)
+    return {target: Y[:, j] for j, target in enumerate(bundle['targets'])}
+
+
+def run_nightly_metamodel(size=METAMODEL_DOE_SIZE, workers=None):
+    """
+    Job malam (setelah train_pipeline.run_daily_training): simulasikan DOE dengan
+    model ML terbaru, lalu latih dan simpan metamodel.
+    """
+    import simulator
+    from sweep_executor import SWEEP_WORKERS
+
+    print(f"[{datetime.now()}] 🧪 Membangun metamodel simulasi ({size} skenario DOE)...")
+    simulator.load_ml_models()
+    data = simulator.get_data_snapshot(force_refresh=True)
+    calibrated_params = simulator.calibrate_simulation_parameters(data)
+
+    buckets = distance_buckets(data['roads'])
+    if not buckets:
+        print("❌ Tidak ada rute aktif untuk DOE metamodel.")
+        return None
+    design = build_design(buckets, size, rng=np.random.default_rng(int(datetime.now().strftime('%Y%m%d'))))
+    scenarios = [
+        {k: d[k] for k in ('weatherCondition', 'roadCondition', 'shift', 'alokasi_truk', 'jumlah_excavator', 'target_road_id')}
+        for d in design
+    ]
+
+    start = datetime.now()
+    physics, _, _ = simulator.simulate_physics_batch(
+        scenarios, data, calibrated_params, workers=workers or SWEEP_WORKERS, duration_hours=8
+    )
+    rows = [(d, p['metrics']) for d, p in zip(design, physics) if p is not None]
+    if len(rows) < 10:
+        print("❌ Hasil DOE terlalu sedikit untuk melatih metamodel.")
+        return None
+    sim_seconds = (datetime.now() - start).total_seconds()
+    print(f"   ✅ {len(rows)} simulasi DOE selesai ({sim_seconds:.1f}s)")
+
+    model, scores = train_metamodel([r[0] for r in rows], [r[1] for r in rows])
+    meta = {
+        'created_at': datetime.now().isoformat(),
+        'doe_size': len(rows),
+        'doe_seconds': sim_seconds,
+        'distance_buckets': [{'road_id': r, 'distance_km': d} for r, d in buckets],
+        'data_version': simulator.get_data_version(data),
+        'model_version': simulator.MODEL_VERSION,
+        'holdout_scores': scores
+    }
+    save_metamodel(model, meta)
+    for target, score in scores.items():
+        print(f"   📈 {target}: R²={score['r2']:.4f}, MAE={score['mae']:.2f}")
+    print(f"   ✅ Metamodel disimpan: {METAMODEL_PATH}")
+    return meta
+
+
+if __name__ == "__main__":
+    run_nightly_metamodel()
@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Folder penyimpanan hasil fisik sweep ('' = hanya di memori)
+PHYSICAL_RESULTS_DIR = os.getenv("PHYSICAL_RESULTS_DIR", os.path.join("cache", "physical"))
+PHYSICAL_STORE_MAX_ENTRIES = int(os.getenv("PHYSICAL_STORE_MAX_ENTRIES", "64"))
+
+
+def condition_key(fixed, decision_vars):
+    """Kunci stabil dari kondisi lapangan + variabel keputusan sebuah sweep."""
+    payload = json.dumps({'fixed': fixed or {}, 'vars': decision_vars or {}}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20]
+
+
+def watermark_fingerprint(data):
+    """Sidik jari data snapshot (watermark tabel); sama selama data sumber tidak berubah."""
+    watermarks = (data or {}).get('snapshot', {}).get('watermarks')
+    if watermarks is None:
+        return None
+    payload = json.dumps(watermarks, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20]
+
+
+class PhysicalResultStore:
+    """
+    Menyimpan hasil fisik sweep terakhir per condition_key (kolom per metrik,
+    bukan list dict) supaya hasil bisa dihitung ulang secara finansial tanpa
+    menjalankan simulasi lagi.
+
+    Record disimpan di memori (LRU, max_entries) dan, jika folder diset,
+    sebagai file JSON per kunci sehingga tetap ada setelah server restart.
+    """
+
+    def __init__(self, folder=PHYSICAL_RESULTS_DIR, max_entries=PHYSICAL_STORE_MAX_ENTRIES):
+        self.folder = folder
+        self.max_entries = max(1, int(max_entries))
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.json")
+
+    def put(self, key, record):
+        with self._lock:
+            self._records[key] = record
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+        if self.folder:
+            try:
+                os.makedirs(self.folder, exist_ok=True)
+                tmp = self._path(key) + '.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump(record, f)
+                os.replace(tmp, self._path(key))
+            except Exception as e:
+                print(f"   ⚠️ Gagal menyimpan hasil fisik sweep {key}: {e}")
+
+    def get(self, key):
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                self._records.move_to_end(key)
+                return record
+        if not self.folder or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with open(self._path(key)) as f:
+                record = json.load(f)
+        except Exception as e:
+            print(f"   ⚠️ Gagal membaca hasil fisik sweep {key}: {e}")
+            return None
+        with self._lock:
+            self._records[key] = record
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+        return record
+
+    def __contains__(self, key):
+        return self.get(key) is not None
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+
+# Ukuran default cache prediksi per sweep. Satu entri = satu vektor fitur unik
+# (truk, operator, rute, excavator, kondisi, umur & jarak hari maintenance).
+DEFAULT_MAXSIZE = 50000
+
+
+class PredictionCache:
+    """
+    Cache LRU untuk hasil prediksi 6 model ML di simulator.
+
+    Kunci cache adalah tuple fitur lengkap (urutan MODEL_COLUMNS), sehingga
+    satu vektor fitur hanya diprediksi sekali meskipun muncul di banyak siklus
+    dan banyak skenario dalam satu sweep `get_strategic_recommendations`.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = max(1, int(maxsize))
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, key):
+        return key in self._store
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return self._store[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._store[key] = value
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return self._store[key]
+            self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._store),
+            'maxsize': self.maxsize,
+            'hit_rate': (self.hits / total) if total > 0 else 0.0
+        }
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+from scipy.stats import t as student_t
+
+# Default replikasi Monte Carlo per skenario
+REPLICATION_MIN = int(os.getenv("REPLICATION_MIN", "3"))
+REPLICATION_MAX = int(os.getenv("REPLICATION_MAX", "10"))
+# Lebar setengah interval relatif terhadap |mean| yang dianggap cukup presisi
+REPLICATION_PRECISION = float(os.getenv("REPLICATION_PRECISION", "0.02"))
+REPLICATION_CONFIDENCE = float(os.getenv("REPLICATION_CONFIDENCE", "0.95"))
+
+
+def mean_ci(values, confidence=REPLICATION_CONFIDENCE):
+    """Rata-rata dan setengah lebar interval kepercayaan (distribusi t). Half width inf jika n < 2."""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return 0.0, float('inf')
+    mean = float(values.mean())
+    if n < 2:
+        return mean, float('inf')
+    sem = values.std(ddof=1) / np.sqrt(n)
+    return mean, float(student_t.ppf(0.5 + confidence / 2, n - 1) * sem)
+
+
+def summarize(values, confidence=REPLICATION_CONFIDENCE):
+    mean, half = mean_ci(values, confidence)
+    return {
+        'mean': mean,
+        'ci_low': mean - half,
+        'ci_high': mean + half,
+        'half_width': half,
+        'n': len(values)
+    }
+
+
+class ReplicationManager:
+    """
+    Replikasi Monte Carlo sekuensial untuk sekumpulan skenario.
+
+    Setiap ronde menambah satu replikasi (seed independen) untuk skenario yang
+    masih aktif. Setelah min_reps, skenario berhenti direplikasi jika untuk
+    setiap objektif (semua dimaksimalkan) intervalnya sudah cukup sempit
+    (half width <= precision * |mean|) atau skenario jelas tidak bisa masuk
+    top_k objektif itu (batas atas CI < batas bawah CI skenario ke-k terbaik). Komputasi
+    hanya dihabiskan pada skenario yang posisinya di ranking masih belum pasti.
+    """
+
+    def __init__(self, simulate, objectives, min_reps=REPLICATION_MIN, max_reps=REPLICATION_MAX,
+                 precision=REPLICATION_PRECISION, confidence=REPLICATION_CONFIDENCE, top_k=5, scales=None):
+        """
+        Args:
+            simulate: callable(indices, replication) -> list dict sampel per skenario
+                (nama metrik -> nilai), atau None jika simulasi gagal.
+            objectives: nama metrik dalam sampel yang dipakai untuk ranking (lebih besar lebih baik).
+            scales: skala minimum per objektif untuk kriteria presisi (untuk objektif yang
+                mean-nya bisa mendekati nol, mis. selisih terhadap target).
+        """
+        self.simulate = simulate
+        self.objectives = list(objectives)
+        self.max_reps = max(1, int(max_reps))
+        self.min_reps = max(1, min(int(min_reps), self.max_reps))
+        self.precision = precision
+        self.confidence = confidence
+        self.top_k = max(1, int(top_k))
+        self.scales = scales or {}
+
+    def _threshold(self, stats, objective):
+        # Batas bawah CI dari skenario ke-k terbaik (berdasarkan mean)
+        ranked = sorted((s for s in stats if s is not None), key=lambda s: s[objective]['mean'], reverse=True)
+        if len(ranked) <= self.top_k:
+            return -np.inf, set()
+        top = ranked[:self.top_k]
+        return top[-1][objective]['ci_low'], {id(s) for s in top}
+
+    def run(self, n):
+        """
+        Returns:
+            (samples, stats, report) - samples[i] list dict sampel per replikasi,
+            stats[i] ringkasan mean/CI per metrik (None jika semua replikasi gagal).
+        """
+        samples = [[] for _ in range(n)]
+        stats = [None] * n
+        status = ['active'] * n
+        active = list(range(n))
+        rounds = []
+        rep = 0
+        while active and rep < self.max_reps:
+            for i, sample in zip(active, self.simulate(active, rep)):
+                if sample is None:
+                    status[i] = 'failed'
+                else:
+                    samples[i].append(sample)
+            rep += 1
+            rounds.append({'replication': rep, 'simulated': len(active)})
+            active = [i for i in active if status[i] == 'active']
+            for i in range(n):
+                if samples[i]:
+                    keys = samples[i][0].keys()
+                    stats[i] = {k: summarize([s[k] for s in samples[i]], self.confidence) for k in keys}
+            if rep < self.min_reps:
+                continue
+
+            thresholds = {obj: self._threshold(stats, obj) for obj in self.objectives}
+            still_active = []
+            for i in active:
+                precise, eliminated = [], []
+                for obj in self.objectives:
+                    st = stats[i][obj]
+                    threshold, top_ids = thresholds[obj]
+                    precise.append(st['half_width'] <= self.precision * max(abs(st['mean']), self.scales.get(obj, 1e-9)))
+                    eliminated.append(id(stats[i]) not in top_ids and st['ci_high'] < threshold)
+                # Objektif selesai jika presisi atau jelas di luar top_k
+                if all(eliminated):
+                    status[i] = 'eliminated'
+                elif all(p or e for p, e in zip(precise, eliminated)):
+                    status[i] = 'precise'
+                else:
+                    still_active.append(i)
+            active = still_active
+
+        for i in active:
+            status[i] = 'max_replications'
+        counts = [len(s) for s in samples]
+        report = {
+            'min_replications': self.min_reps,
+            'max_replications': self.max_reps,
+            'precision': self.precision,
+            'confidence': self.confidence,
+            'top_k': self.top_k,
+            'scenarios': n,
+            'total_replications': int(sum(counts)),
+            'full_budget_replications': n * self.max_reps,
+            'mean_replications': float(np.mean(counts)) if counts else 0.0,
+            'stopped': {reason: status.count(reason) for reason in ('precise', 'eliminated', 'max_replications', 'failed')},
+            'rounds': rounds
+        }
+        return samples, stats, report
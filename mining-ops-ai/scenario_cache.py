@@ -0,0 +1,164 @@
+import os
+import copy
+import json
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Jumlah hasil simulasi skenario yang disimpan di memori (0 = cache nonaktif)
+SCENARIO_CACHE_SIZE = int(os.getenv("SCENARIO_CACHE_SIZE", "5000"))
+# Folder persistensi cache ('' = hanya di memori)
+SCENARIO_CACHE_DIR = os.getenv("SCENARIO_CACHE_DIR", "")
+
+# Field skenario yang menentukan hasil fisik simulasi
+SCENARIO_KEY_FIELDS = (
+    'weatherCondition', 'roadCondition', 'shift', 'alokasi_truk', 'jumlah_excavator',
+    'target_road_id', 'target_excavator_id', 'target_schedule_id', 'simulation_start_date'
+)
+
+
+def _digest(obj):
+    payload = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def scenario_hash(scenario, duration_hours=8):
+    """Hash kanonik isi skenario (tanpa versi data/model)."""
+    fields = [scenario.get(f) for f in SCENARIO_KEY_FIELDS]
+    if scenario.get('dispatch_policy') not in (None, 'pooled'):
+        # Field opsional: skenario pooled (default) tetap memakai hash yang sama seperti sebelumnya
+        fields.append(scenario['dispatch_policy'])
+    return _digest(fields + [float(duration_hours)])[:24]
+
+
+def versions_digest(*parts):
+    """Versi gabungan (data snapshot, kalibrasi, model) untuk kunci cache."""
+    return _digest(list(parts))[:16]
+
+
+def scenario_cache_key(scenario_digest, versions):
+    return f"{scenario_digest}-{versions}"
+
+
+class ScenarioResultCache:
+    """
+    Cache LRU hasil fisik simulasi per skenario (metrik SimPy sebelum perhitungan
+    finansial), dengan kunci = hash skenario + versi data/kalibrasi/model.
+
+    Nilai disalin (deepcopy) saat put/get karena hasil simulasi dimodifikasi
+    oleh tahap finalisasi. Jika folder diset, setiap entri juga disimpan sebagai
+    file pickle dan dibaca kembali saat cache memori miss (mis. setelah restart);
+    jumlah file dibatasi maxsize (file tertua dihapus).
+    """
+
+    def __init__(self, maxsize=SCENARIO_CACHE_SIZE, folder=SCENARIO_CACHE_DIR):
+        self.maxsize = max(0, int(maxsize))
+        self.folder = folder
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.pkl")
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            if key in self._store:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._store[key])
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._insert(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._insert(key, value)
+        self._write_disk(key, value)
+
+    def _insert(self, key, value):
+        self._store[key] = value
+        self._store.move_to_end(key)
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key):
+        if not self.folder or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.folder:
+            return
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp = self._path(key) + '.tmp'
+            with open(tmp, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= 100:
+                self._puts_since_prune = 0
+                self._prune_disk()
+        except Exception as e:
+            print(f"   ⚠️ Gagal menyimpan cache skenario: {e}")
+
+    def _prune_disk(self):
+        files = [os.path.join(self.folder, f) for f in os.listdir(self.folder) if f.endswith('.pkl')]
+        if len(files) <= self.maxsize:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.maxsize]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._store),
+            'maxsize': self.maxsize,
+            'hit_rate': (self.hits / total) if total > 0 else 0.0,
+            'persistent': bool(self.folder)
+        }
@@ -2,6 +2,7 @@ import schedule
 import time
 from datetime import datetime
 from train_pipeline import run_daily_training
+from metamodel import run_nightly_metamodel
 import sys
 
 def job():
@@ -12,6 +13,11 @@ def job():
         run_daily_training()
     except Exception as e:
         print(f"❌ Scheduled training failed: {e}")
+    try:
+        # DOE + metamodel memakai model yang baru dilatih
+        run_nightly_metamodel()
+    except Exception as e:
+        print(f"❌ Scheduled metamodel build failed: {e}")
     print(f"\n{'='*70}")
     print(f"⏸️  Next training scheduled for 02:00 AM tomorrow")
     print(f"{'='*70}\n")
@@ -5,7 +5,11 @@ import warnings
 import numpy as np
 import ollama
 import os
+import random
+import time
 import simpy
+import threading
+import copy
 from itertools import product
 
 # --- 0. KONFIGURASI & PATH ---
@@ -101,7 +105,23 @@ def _json_safe(obj):
         return [_json_safe(v) for v in obj]
     return obj
 
-from data_loader import load_data
+from data_loader import load_data, load_tables, memory_report
+from prediction_cache import PredictionCache
+from feature_store import FeatureStore, get_feature_store, to_utc_ns
+from tree_runtime import CompiledForest, load_model as load_tree_model
+from data_snapshot import DataSnapshotManager
+from analytic_engine import simulate_shift_batch
+from sweep_executor import SWEEP_WORKERS, run_parallel_sweep, data_fingerprint
+from physical_store import PhysicalResultStore, condition_key, watermark_fingerprint
+from haul_kernel import run_haul_cycles, run_dispatched_cycles
+from dispatch import ExcavatorDispatcher, dispatch_policy, DISPATCH_POLICIES
+from lockstep_engine import run_lockstep_cycles
+from event_recorder import EventRecorder, summarize_events, PHASE_HAUL, PHASE_QUEUE, PHASE_LOAD, PHASE_RETURN, PHASE_DUMP, PHASE_CYCLE
+from scenario_cache import ScenarioResultCache, scenario_hash, versions_digest, scenario_cache_key
+from surrogate_optimizer import encode_candidates, run_surrogate_search
+from metamodel import load_metamodel, predict_metrics
+from inference_broker import InferenceBroker, INFERENCE_BATCH_SIZE
+from replication import ReplicationManager, REPLICATION_MIN, REPLICATION_PRECISION, REPLICATION_CONFIDENCE
 
 CONFIG = load_config()
 MODEL_FUEL = None
@@ -111,53 +131,132 @@ MODEL_TONASE = None
 MODEL_DELAY = None
 MODEL_RISIKO = None
 MODEL_COLUMNS = []
+MODEL_LOAD_ERROR = None
+MODEL_VERSION = None
 LLM_PROVIDER = None
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "50000"))
+# Mesin simulasi siklus haul: 'simpy', 'kernel' (haul_kernel, heap event khusus) atau
+# 'lockstep' (lockstep_engine, banyak skenario sekaligus sebagai array)
+SIM_ENGINE = os.getenv("SIM_ENGINE", "simpy")
+# Jumlah skenario maksimum per batch engine lockstep
+LOCKSTEP_BATCH_SIZE = int(os.getenv("LOCKSTEP_BATCH_SIZE", "512"))
+# Seed default stream acak per truk (common random numbers antar skenario dalam satu sweep)
+CRN_SEED = int(os.getenv("CRN_SEED", "0"))
+# Jumlah siklus noise (BBM, muatan) yang diambil sekaligus dari stream truk
+NOISE_BLOCK = 64
+# Kalender shift mode horizon (simulate_production_horizon): shift berurutan SHIFT_HOURS jam
+# mulai dari shift skenario; hanya HORIZON_OPERATING_SHIFTS yang berproduksi (default 2 shift = 16 jam/hari)
+SHIFT_ORDER = ('SHIFT_1', 'SHIFT_2', 'SHIFT_3')
+SHIFT_HOURS = float(os.getenv("SHIFT_HOURS", "8"))
+HORIZON_OPERATING_SHIFTS = tuple(x.strip() for x in os.getenv("HORIZON_OPERATING_SHIFTS", "SHIFT_1,SHIFT_2").split(",") if x.strip())
+HORIZON_MAX_HOURS = float(os.getenv("HORIZON_MAX_HOURS", str(24 * 60)))
+# Kesiapan kapal: 'until_ets' = simulasi shift berurutan sampai etsLoading, 'extrapolate' = laju 8 jam x 16 jam/hari
+SHIPMENT_HORIZON_MODE = os.getenv("SHIPMENT_HORIZON_MODE", "until_ets")
+# 'compiled' = pakai artefak tree_runtime jika tersedia, 'sklearn' = selalu pipeline joblib
+MODEL_RUNTIME = os.getenv("MODEL_RUNTIME", "compiled")
 
 from llm_config import get_model
 OLLAMA_MODEL = get_model("simulation")
 
-def load_models():
-    global MODEL_FUEL, MODEL_FUEL_REAL, MODEL_LOAD, MODEL_TONASE, MODEL_DELAY, MODEL_RISIKO, MODEL_COLUMNS, LLM_PROVIDER, OLLAMA_MODEL
-    if MODEL_FUEL is None:
+_MODEL_LOCK = threading.Lock()
+
+def _model_files_version():
+    """Versi model dari nama, ukuran & mtime artefak di MODEL_FOLDER."""
+    parts = []
+    for name in sorted(os.listdir(MODEL_FOLDER)):
+        if name.startswith('model_') or name.endswith('_columns.json'):
+            st = os.stat(os.path.join(MODEL_FOLDER, name))
+            parts.append((name, st.st_size, int(st.st_mtime)))
+    return versions_digest(parts)
+
+def load_ml_models():
+    """
+    Muat 6 model ML sekali per proses (thread-safe). Dipanggil lazy oleh simulasi
+    atau lebih awal oleh warmup server. Exception diteruskan ke pemanggil.
+    """
+    global MODEL_FUEL, MODEL_FUEL_REAL, MODEL_LOAD, MODEL_TONASE, MODEL_DELAY, MODEL_RISIKO, MODEL_COLUMNS, MODEL_LOAD_ERROR, MODEL_VERSION
+    if MODEL_FUEL is not None:
+        return
+    with _MODEL_LOCK:
+        if MODEL_FUEL is not None:
+            return
+        print(f"Loading ML models from '{MODEL_FOLDER}'...")
+        # Artefak .npz (tree_runtime) dipakai jika ada, fallback ke pipeline joblib
+        prefer_compiled = MODEL_RUNTIME != 'sklearn'
+        models = [load_tree_model(MODEL_FOLDER, name, prefer_compiled) for name in (
+            'model_fuel', 'model_fuel_real', 'model_load_weight', 'model_tonase',
+            'model_delay_probability', 'model_risiko'
+        )]
+        
+        with open(os.path.join(MODEL_FOLDER, 'numerical_columns.json')) as f: 
+            NUM_COLS = json.load(f)
+        with open(os.path.join(MODEL_FOLDER, 'categorical_columns.json')) as f: 
+            CAT_COLS = json.load(f)
+        MODEL_COLUMNS = NUM_COLS + CAT_COLS
+        # MODEL_FUEL di-set terakhir: penanda semua model sudah lengkap
+        MODEL_FUEL_REAL, MODEL_LOAD, MODEL_TONASE, MODEL_DELAY, MODEL_RISIKO = models[1:]
+        MODEL_FUEL = models[0]
+        MODEL_LOAD_ERROR = None
+        MODEL_VERSION = _model_files_version()
+        
+        n_compiled = sum(isinstance(m, CompiledForest) for m in models)
+        print(f"✅ Loaded 6 ML models: fuel, fuel_real, load_weight, tonase, delay_probability, risiko ({n_compiled} compiled)")
+
+def ensure_ml_models():
+    """
+    Versi lazy load_ml_models untuk jalur simulasi: kegagalan dicatat sekali di
+    MODEL_LOAD_ERROR (tidak dicoba ulang tiap skenario) dan simulasi jalan tanpa ML.
+    """
+    global MODEL_LOAD_ERROR
+    if MODEL_FUEL is None and MODEL_LOAD_ERROR is None:
         try:
-            print(f"Loading ML models from '{MODEL_FOLDER}'...")
-            MODEL_FUEL = joblib.load(os.path.join(MODEL_FOLDER, 'model_fuel.joblib'))
-            MODEL_FUEL_REAL = joblib.load(os.path.join(MODEL_FOLDER, 'model_fuel_real.joblib'))
-            MODEL_LOAD = joblib.load(os.path.join(MODEL_FOLDER, 'model_load_weight.joblib'))
-            MODEL_TONASE = joblib.load(os.path.join(MODEL_FOLDER, 'model_tonase.joblib'))
-            MODEL_DELAY = joblib.load(os.path.join(MODEL_FOLDER, 'model_delay_probability.joblib'))
-            MODEL_RISIKO = joblib.load(os.path.join(MODEL_FOLDER, 'model_risiko.joblib'))
-            
-            with open(os.path.join(MODEL_FOLDER, 'numerical_columns.json')) as f: 
-                NUM_COLS = json.load(f)
-            with open(os.path.join(MODEL_FOLDER, 'categorical_columns.json')) as f: 
-                CAT_COLS = json.load(f)
-            MODEL_COLUMNS = NUM_COLS + CAT_COLS
-            
-            print(f"✅ Loaded 6 ML models: fuel, fuel_real, load_weight, tonase, delay_probability, risiko")
-            
-            print(f"Checking Ollama connection...")
-            try:
-                ollama.list()
-                LLM_PROVIDER = "ollama"
-                print(f"✅ SISTEM SIAP. Menggunakan model: {OLLAMA_MODEL}")
-            except:
-                print("⚠️ OLLAMA TIDAK TERHUBUNG.")
-                LLM_PROVIDER = None
+            load_ml_models()
         except Exception as e:
+            MODEL_LOAD_ERROR = str(e)
             print(f"❌ GAGAL MEMUAT MODEL: {e}")
-            LLM_PROVIDER = None
+    return MODEL_FUEL is not None
+
+def check_llm_provider():
+    """Cek koneksi Ollama dan set LLM_PROVIDER ('ollama' atau None)."""
+    global LLM_PROVIDER
+    print(f"Checking Ollama connection...")
+    try:
+        ollama.list()
+        LLM_PROVIDER = "ollama"
+        print(f"✅ SISTEM SIAP. Menggunakan model: {OLLAMA_MODEL}")
+    except:
+        print("⚠️ OLLAMA TIDAK TERHUBUNG.")
+        LLM_PROVIDER = None
+    return LLM_PROVIDER
+
+def load_models():
+    """Muat model ML lalu cek Ollama (untuk script/CLI; server memakai warmup)."""
+    if ensure_ml_models():
+        check_llm_provider()
 
 def load_fresh_data():
     print(f"🔄 Loading fresh data from database...")
     
-    DB_TRUCKS = load_data('trucks', 'trucks.csv').set_index('id')
-    DB_EXCAVATORS = load_data('excavators', 'excavators.csv').set_index('id')
-    DB_OPERATORS = load_data('operators', 'operators.csv').set_index('id')
-    DB_ROADS = load_data('road_segments', 'road_segments.csv').set_index('id')
+    # Semua tabel dimuat paralel; fallback Database -> CSV tetap per tabel
+    frames, load_timings = load_tables([
+        ('trucks', 'trucks.csv'),
+        ('excavators', 'excavators.csv'),
+        ('operators', 'operators.csv'),
+        ('road_segments', 'road_segments.csv'),
+        ('sailing_schedules', 'sailing_schedules.csv'),
+        ('vessels', 'vessels.csv'),
+        ('maintenance_logs', 'maintenance_logs.csv'),
+        ('hauling_activities', 'hauling_activities.csv'),
+        ('system_configs', 'system_configs.csv')
+    ])
+    
+    DB_TRUCKS = frames['trucks'].set_index('id')
+    DB_EXCAVATORS = frames['excavators'].set_index('id')
+    DB_OPERATORS = frames['operators'].set_index('id')
+    DB_ROADS = frames['road_segments'].set_index('id')
     
     try:
-        DB_SCHEDULES = load_data('sailing_schedules', 'sailing_schedules.csv').set_index('id')
+        DB_SCHEDULES = frames['sailing_schedules'].set_index('id')
         DB_SCHEDULES['etsLoading'] = pd.to_datetime(
             DB_SCHEDULES['etsLoading'], 
             errors='coerce', 
@@ -192,7 +291,7 @@ def load_fresh_data():
         print(f"   > Schedules: {len(DB_SCHEDULES)} jadwal valid dimuat.")
         
         try:
-            DB_VESSELS = load_data('vessels', 'vessels.csv').set_index('id')
+            DB_VESSELS = frames['vessels'].set_index('id')
         except:
             DB_VESSELS = pd.DataFrame()
     except Exception as e:
@@ -200,19 +299,14 @@ def load_fresh_data():
         DB_SCHEDULES = pd.DataFrame()
         DB_VESSELS = pd.DataFrame()
 
-    maint = load_data('maintenance_logs', 'maintenance_logs.csv')
+    maint = frames['maintenance_logs']
     maint = maint[maint['status'] == 'COMPLETED']
     maint['completionDate'] = pd.to_datetime(maint['completionDate'])
     DB_MAINTENANCE_SORTED = maint.sort_values('completionDate')
     
-    try:
-        DB_CONFIGS = load_data('system_configs', 'system_configs.csv')
-    except:
-        DB_CONFIGS = pd.DataFrame()
+    DB_CONFIGS = frames['system_configs']
 
-    print(f"✅ Fresh data loaded successfully!")
-    
-    return {
+    bundle = {
         'trucks': DB_TRUCKS,
         'excavators': DB_EXCAVATORS,
         'operators': DB_OPERATORS,
@@ -220,9 +314,27 @@ def load_fresh_data():
         'schedules': DB_SCHEDULES,
         'vessels': DB_VESSELS,
         'maintenance': DB_MAINTENANCE_SORTED,
-        'hauling_activities': load_data('hauling_activities', 'hauling_activities.csv'),
-        'system_configs': DB_CONFIGS
+        'hauling_activities': frames['hauling_activities'],
+        'system_configs': DB_CONFIGS,
+        'load_timings': load_timings
     }
+    mem = memory_report(bundle)
+    print(f"✅ Fresh data loaded successfully! ({sum(mem.values()):.2f} MB resident)")
+    return bundle
+
+def _prepare_snapshot(bundle):
+    # Bangun struktur turunan sekali per snapshot, bukan per request
+    get_feature_store(bundle)
+
+DATA_SNAPSHOT = DataSnapshotManager(load_fresh_data, prepare=_prepare_snapshot)
+# Hasil fisik per skenario (lintas request), kunci = isi skenario + versi data/kalibrasi/model
+SCENARIO_CACHE = ScenarioResultCache()
+# Hasil fisik sweep terakhir per kondisi, untuk re-pricing finansial tanpa simulasi ulang
+PHYSICAL_STORE = PhysicalResultStore()
+
+def get_data_snapshot(force_refresh=False):
+    """Bundle data bersama (read-only) yang hanya dimuat ulang jika data berubah atau TTL habis."""
+    return DATA_SNAPSHOT.get(force_refresh)
 
 def calibrate_simulation_parameters(data):
     """
@@ -306,76 +418,138 @@ def calibrate_simulation_parameters(data):
         print(f"   ❌ Calibration failed: {e}. Using defaults.")
         return defaults
 
-print("\n--- INITIALIZING SYSTEM (v3.1 - Dynamic Data) ---")
-load_models()
+# Model dan data TIDAK dimuat saat import: dimuat lazy (load_ml_models /
+# get_data_snapshot) atau oleh warmup background di api.py
 
 # --- 2. LOGIKA SIMULASI ---
 
 def get_features_for_prediction(truck_id, operator_id, road_id, excavator_id, weather, road_cond, shift, sim_time, data):
-    try:
-        truck = data['trucks'].loc[truck_id]
-        excavator = data['excavators'].loc[excavator_id]
-        operator = data['operators'].loc[operator_id]
-        road = data['roads'].loc[road_id]
-        
-        # Fix timezone handling for truck age
-        purchase_date = pd.to_datetime(truck['purchaseDate'])
-        if purchase_date.tzinfo is None:
-            purchase_date = purchase_date.tz_localize('UTC')
-        
-        if sim_time.tzinfo is None:
-            sim_time = sim_time.tz_localize('UTC')
-            
-        truck_age_days = (sim_time - purchase_date.tz_convert(sim_time.tz)).days
-        
-        try: op_exp = json.loads(operator['competency']).get('years_experience', 0)
-        except: op_exp = 0
-            
-        last_maint = data['maintenance'].loc[
-            (data['maintenance']['truckId'] == truck_id) &
-            (data['maintenance']['completionDate'] < sim_time)
-        ]
-        days_since_maint = 365 
-        if not last_maint.empty:
-            last_date = pd.to_datetime(last_maint.iloc[-1]['completionDate'])
-            if last_date.tzinfo is None:
-                last_date = last_date.tz_localize('UTC')
-            days_since_maint = (sim_time - last_date.tz_convert(sim_time.tz)).days
-
-        feature_dict = {
-            'capacity': float(truck['capacity']), 
-            'bucketCapacity': float(excavator['bucketCapacity']),
-            'rating': float(operator['rating']), 
-            'operator_experience_years': float(op_exp),
-            'distance': float(road['distance']),
-            'gradient': float(road['gradient']),
-            'truck_age_days': float(truck_age_days), 
-            'days_since_last_maintenance': float(days_since_maint),
-            'weatherCondition': weather, 
-            'roadCondition': road_cond,
-            'shift': shift, 
-            'brand': truck['brand'], 
-            'model_excavator': excavator['model']
-        }
-        return pd.DataFrame([feature_dict])[MODEL_COLUMNS]
-    except Exception as e:
-        # print(f"Feature extraction error: {e}") # Debug only
+    values = get_feature_store(data).feature_values(MODEL_COLUMNS, truck_id, operator_id, road_id, excavator_id, weather, road_cond, shift, sim_time)
+    if values is None:
         return pd.DataFrame(columns=MODEL_COLUMNS)
+    return FeatureStore.to_frame([values], MODEL_COLUMNS)
 
-def truck_process_hybrid(env, truck_id, operator_id, resources, global_metrics, skenario, sim_start_time, data, calibrated_params):
+def get_speed_factors(weather, road_cond):
+    """Faktor kecepatan (cuaca x kondisi jalan) dan faktor pengali waktu loading."""
+    weather_speed_factor = 1.0
+    if "Hujan Ringan" in str(weather): weather_speed_factor = 0.85
+    elif "Hujan Lebat" in str(weather): weather_speed_factor = 0.60
+    
+    road_cond_factor = 1.0
+    if road_cond == "FAIR": road_cond_factor = 0.9
+    elif road_cond == "POOR": road_cond_factor = 0.7
+    
+    loading_factor = 1.1 if "Hujan" in str(weather) else 1.0
+    return weather_speed_factor * road_cond_factor, loading_factor
+
+def predict_cycle_outputs(values, prediction_cache=None):
+    """
+    Menjalankan 6 model ML untuk satu baris fitur (tuple urutan MODEL_COLUMNS).
+    Jika prediction_cache diberikan, hasil disimpan per tuple fitur sehingga
+    vektor fitur yang sama tidak diprediksi ulang. Return None jika model gagal.
+    """
+    frame = []
+    def _input(model):
+        # CompiledForest menerima baris tuple langsung, pipeline sklearn butuh DataFrame
+        if isinstance(model, CompiledForest) and model.columns == MODEL_COLUMNS:
+            return [values]
+        if not frame:
+            frame.append(FeatureStore.to_frame([values], MODEL_COLUMNS))
+        return frame[0]
+
+    def _predict():
+        try:
+            return {
+                'fuel': float(MODEL_FUEL.predict(_input(MODEL_FUEL))[0]),
+                'fuel_real': float(MODEL_FUEL_REAL.predict(_input(MODEL_FUEL_REAL))[0]),
+                'load': float(MODEL_LOAD.predict(_input(MODEL_LOAD))[0]),
+                'tonase': float(MODEL_TONASE.predict(_input(MODEL_TONASE))[0]),
+                'delay': float(MODEL_DELAY.predict_proba(_input(MODEL_DELAY))[0][1]),
+                'risiko': float(MODEL_RISIKO.predict(_input(MODEL_RISIKO))[0])
+            }
+        except Exception:
+            return None
+
+    if prediction_cache is None:
+        return _predict()
+    return prediction_cache.get_or_compute(values, _predict)
+
+def predict_cycle_outputs_batch(rows):
+    """
+    Versi batch predict_cycle_outputs untuk InferenceBroker: satu panggilan predict
+    per model untuk semua baris (hasil per baris sama dengan prediksi satu per satu).
+    Jika batch gagal, baris diprediksi satu per satu agar hanya baris bermasalah yang None.
+    """
+    frame = []
+    def _input(model):
+        if isinstance(model, CompiledForest) and model.columns == MODEL_COLUMNS:
+            return rows
+        if not frame:
+            frame.append(FeatureStore.to_frame(rows, MODEL_COLUMNS))
+        return frame[0]
+
+    try:
+        fuel = MODEL_FUEL.predict(_input(MODEL_FUEL))
+        fuel_real = MODEL_FUEL_REAL.predict(_input(MODEL_FUEL_REAL))
+        load = MODEL_LOAD.predict(_input(MODEL_LOAD))
+        tonase = MODEL_TONASE.predict(_input(MODEL_TONASE))
+        delay = MODEL_DELAY.predict_proba(_input(MODEL_DELAY))[:, 1]
+        risiko = MODEL_RISIKO.predict(_input(MODEL_RISIKO))
+    except Exception:
+        return [predict_cycle_outputs(values) for values in rows]
+    return [
+        {'fuel': float(fuel[i]), 'fuel_real': float(fuel_real[i]), 'load': float(load[i]),
+         'tonase': float(tonase[i]), 'delay': float(delay[i]), 'risiko': float(risiko[i])}
+        for i in range(len(rows))
+    ]
+
+def truck_streams(stream_seed, num_trucks):
+    """
+    Stream acak independen per slot truk dari SeedSequence(stream_seed), stream_seed =
+    (seed, replication). Slot ke-k mendapat stream yang sama di semua skenario dengan
+    stream_seed sama, sehingga skenario yang dibandingkan dalam satu sweep memakai
+    common random numbers (noise muatan & BBM siklus ke-j truk ke-k identik).
+    """
+    children = np.random.SeedSequence([int(x) for x in stream_seed]).spawn(num_trucks)
+    return [np.random.default_rng(child) for child in children]
+
+def scenario_cycle_context(skenario, data, sim_start_time, calibrated_params):
+    """Bagian truck_cycle_context yang sama untuk semua truk dalam satu skenario (jalan, excavator, durasi fase)."""
     weather = skenario['weatherCondition']
     road_cond = skenario['roadCondition']
-    shift = skenario['shift']
     
     excavator_id = skenario.get('target_excavator_id')
     if excavator_id not in data['excavators'].index: excavator_id = data['excavators'].index[0]
     road_id = skenario.get('target_road_id')
     if road_id not in data['roads'].index: road_id = data['roads'].index[0]
 
-    excavator_resource = resources['excavator']
-    
+    # Weather Impact Factors
+    total_speed_factor, loading_factor = get_speed_factors(weather, road_cond)
+
+    # Get Road Distance
+    try: road_distance_km = data['roads'].loc[road_id]['distance']
+    except: road_distance_km = 5.0 # Default
+
+    avg_hauling_speed = calibrated_params['avg_hauling_speed_kmh'] * total_speed_factor
+    avg_return_speed = calibrated_params['avg_return_speed_kmh'] * total_speed_factor
+    return {
+        'road_id': road_id,
+        'excavator_id': excavator_id,
+        'weather': weather,
+        'road_cond': road_cond,
+        'shift': skenario['shift'],
+        'road_distance_km': road_distance_km,
+        'hauling_time_hours': road_distance_km / avg_hauling_speed,
+        'loading_time_hours': (calibrated_params['avg_loading_time_min'] * loading_factor) / 60.0,
+        'return_time_hours': road_distance_km / avg_return_speed,
+        'dumping_time_hours': calibrated_params['avg_dumping_time_min'] / 60.0,
+        'sim_start_ns': to_utc_ns(sim_start_time)
+    }
+
+def truck_rates(truck_id, data):
+    """(kapasitas_ton, fuel_rate L/km, maint_rate IDR/jam) satu truk; None jika truk tidak ditemukan."""
     try: kapasitas_ton = data['trucks'].loc[truck_id]['capacity']
-    except: return 
+    except: return None
 
     # Get Truck Specifics
     try: 
@@ -385,59 +559,126 @@ def truck_process_hybrid(env, truck_id, operator_id, resources, global_metrics,
     except: 
         fuel_rate = 1.0
         maint_rate = 0.0
+    return kapasitas_ton, fuel_rate, maint_rate
 
-    # Weather Impact Factors
-    weather_speed_factor = 1.0
-    if "Hujan Ringan" in str(weather): weather_speed_factor = 0.85
-    elif "Hujan Lebat" in str(weather): weather_speed_factor = 0.60
+def truck_cycle_context(truck_id, operator_id, skenario, data, sim_start_time, calibrated_params, rng=None):
+    """
+    Parameter konstan satu truk dalam skenario (kapasitas, rate, durasi fase).
+    rng: stream acak truk (truck_streams); None = stream (CRN_SEED, 0) slot pertama.
+    None jika truk tidak ditemukan (truk tidak ikut simulasi).
+    """
+    ctx = scenario_cycle_context(skenario, data, sim_start_time, calibrated_params)
+    rates = truck_rates(truck_id, data)
+    if rates is None:
+        return None
+    ctx.update({
+        'truck_id': truck_id,
+        'operator_id': operator_id,
+        'kapasitas_ton': rates[0],
+        'fuel_rate': rates[1],
+        'maint_rate': rates[2],
+        'rng': rng if rng is not None else truck_streams((CRN_SEED, 0), 1)[0],
+        'noise': None,
+        'noise_pos': 0
+    })
+    return ctx
+
+def _cycle_noise(ctx):
+    """Faktor noise (BBM, muatan) siklus berikutnya dari stream truk, diambil per blok."""
+    if ctx['noise'] is None or ctx['noise_pos'] >= len(ctx['noise']):
+        ctx['noise'] = ctx['rng'].uniform(0.95, 1.05, size=(NOISE_BLOCK, 2)).tolist()
+        ctx['noise_pos'] = 0
+    fuel_factor, load_factor = ctx['noise'][ctx['noise_pos']]
+    ctx['noise_pos'] += 1
+    return fuel_factor, load_factor
+
+def cycle_inputs(ctx, t_hours, feature_store):
+    """
+    Bagian awal siklus yang dimulai pada jam simulasi t_hours: vektor fitur ML (None jika
+    tidak ada / model belum dimuat) serta BBM & muatan baseline dengan noise siklus.
+    """
+    current_sim_ns = ctx['sim_start_ns'] + int(round(t_hours * 3600 * 1e9))
     
-    road_cond_factor = 1.0
-    if road_cond == "FAIR": road_cond_factor = 0.9
-    elif road_cond == "POOR": road_cond_factor = 0.7
+    feats = feature_store.feature_values(MODEL_COLUMNS, ctx['truck_id'], ctx['operator_id'], ctx['road_id'], ctx['excavator_id'],
+                                         ctx['weather'], ctx['road_cond'], ctx['shift'], current_sim_ns)
     
-    total_speed_factor = weather_speed_factor * road_cond_factor
-
-    # Get Road Distance
-    try: road_distance_km = data['roads'].loc[road_id]['distance']
-    except: road_distance_km = 5.0 # Default
+    fuel_factor, load_factor = _cycle_noise(ctx)
+    fuel_baseline = (ctx['road_distance_km'] * 2) * ctx['fuel_rate']
+    fuel = fuel_baseline * fuel_factor
+    
+    load = ctx['kapasitas_ton'] * 0.87 * load_factor
+    if MODEL_FUEL is None:
+        feats = None
+    return feats, fuel, load
+
+def cycle_outputs(fuel, load, ml):
+    """BBM, muatan, dan probabilitas delay siklus dari baseline + prediksi ML (None = baseline saja)."""
+    tonase = load
+    delay = 0.05
+    risiko = 0.1
+    
+    if ml is not None:
+        fuel = (fuel * 0.7) + (ml['fuel'] * 0.3)
+        
+        fuel_real = ml['fuel_real']
+        load = ml['load'] * 0.87
+        tonase = ml['tonase']
+        delay = ml['delay']
+        risiko = ml['risiko']
+        
+        load = max(load, tonase * 0.87)
+    return fuel, load, delay
+
+def sample_cycle(ctx, t_hours, feature_store, prediction_cache=None):
+    """BBM, muatan, dan probabilitas delay satu siklus yang dimulai pada jam simulasi t_hours."""
+    feats, fuel, load = cycle_inputs(ctx, t_hours, feature_store)
+    ml = predict_cycle_outputs(feats, prediction_cache) if feats is not None else None
+    return cycle_outputs(fuel, load, ml)
+
+def truck_process_hybrid(env, truck_id, operator_id, resources, global_metrics, skenario, sim_start_time, data, calibrated_params, prediction_cache=None, rng=None, broker=None, ledger=None, recorder=None, truck_index=0):
+    """
+    Proses SimPy satu truk. Dengan broker (InferenceBroker), baris fitur siklus dikirim
+    ke broker tanpa menunggu dan (handle, BBM, muatan) dicatat ke ledger saat siklus
+    selesai; metrik BBM/tonase/delay diakumulasi oleh settle_deferred_cycles setelah
+    simulasi, dengan urutan yang sama seperti akumulasi langsung.
+    recorder: EventRecorder opsional; setiap fase dicatat dengan indeks slot truck_index.
+    Jika resources berisi 'dispatcher' (resource per excavator), excavator dipilih saat
+    hauling selesai dan fitur siklus memakai excavator tersebut.
+    """
+    ctx = truck_cycle_context(truck_id, operator_id, skenario, data, sim_start_time, calibrated_params, rng)
+    if ctx is None:
+        return
+    dispatcher = resources.get('dispatcher')
+    excavator_resource = resources.get('excavator')
+    loading_time_hours = ctx['loading_time_hours']
+    feature_store = get_feature_store(data)
+    cycle_no = 0
+
+    def start_cycle(t):
+        if broker is None:
+            return sample_cycle(ctx, t, feature_store, prediction_cache)
+        feats, fuel, load = cycle_inputs(ctx, t, feature_store)
+        return (broker.submit(feats) if feats is not None else None), fuel, load
 
     while True:
         start_cycle_time = env.now
-        current_sim_time = sim_start_time + pd.Timedelta(seconds=env.now*3600)
-        
-        feats = get_features_for_prediction(truck_id, operator_id, road_id, excavator_id, weather, road_cond, shift, current_sim_time, data)
-        
-        fuel_baseline = (road_distance_km * 2) * fuel_rate
-        fuel = fuel_baseline * np.random.uniform(0.95, 1.05)
-        
-        load = kapasitas_ton * 0.87 * np.random.uniform(0.95, 1.05)
-        tonase = load
-        delay = 0.05
-        risiko = 0.1
-        
-        if not feats.empty:
-            try:
-                ml_fuel = MODEL_FUEL.predict(feats)[0]
-                fuel = (fuel * 0.7) + (ml_fuel * 0.3)
-                
-                fuel_real = MODEL_FUEL_REAL.predict(feats)[0]
-                raw_load = MODEL_LOAD.predict(feats)[0]
-                load = raw_load * 0.87
-                tonase = MODEL_TONASE.predict(feats)[0]
-                delay = MODEL_DELAY.predict_proba(feats)[0][1]
-                risiko = MODEL_RISIKO.predict(feats)[0]
-                
-                load = max(load, tonase * 0.87)
-                
-            except Exception as e:
-                pass
+        if dispatcher is None:
+            cycle = start_cycle(start_cycle_time)
 
-        avg_hauling_speed = calibrated_params['avg_hauling_speed_kmh'] * total_speed_factor
-        hauling_time_hours = road_distance_km / avg_hauling_speed
+        hauling_time_hours = ctx['hauling_time_hours']
         haul_start = env.now
         yield env.timeout(hauling_time_hours)
         haul_end = env.now
         global_metrics['total_hauling_time_hours'] += (haul_end - haul_start)
+        if recorder is not None:
+            recorder.record(truck_index, cycle_no, PHASE_HAUL, haul_start, haul_end)
+        
+        if dispatcher is not None:
+            e = dispatcher.choose(truck_index, env.now)
+            ctx['excavator_id'] = resources['excavator_ids'][e]
+            excavator_resource = resources['excavators'][e]
+            loading_time_hours = resources['loading_hours'][e]
+            cycle = start_cycle(start_cycle_time)
         
         waktu_masuk_antrian = env.now
         
@@ -448,39 +689,72 @@ def truck_process_hybrid(env, truck_id, operator_id, resources, global_metrics,
             
             durasi_antri = waktu_keluar_antrian - waktu_masuk_antrian
             global_metrics['total_waktu_antri_jam'] += durasi_antri
+            if recorder is not None:
+                recorder.record(truck_index, cycle_no, PHASE_QUEUE, waktu_masuk_antrian, waktu_keluar_antrian)
             
-            avg_loading_min = calibrated_params['avg_loading_time_min']
-            loading_factor = 1.1 if "Hujan" in str(weather) else 1.0
-            loading_time_hours = (avg_loading_min * loading_factor) / 60.0
             loading_start = env.now
             yield env.timeout(loading_time_hours)
             loading_end = env.now
             global_metrics['total_loading_time_hours'] += (loading_end - loading_start)
+            if recorder is not None:
+                recorder.record(truck_index, cycle_no, PHASE_LOAD, loading_start, loading_end)
+        if dispatcher is not None:
+            dispatcher.release(e)
             
-        avg_return_speed = calibrated_params['avg_return_speed_kmh'] * total_speed_factor
-        return_time_hours = road_distance_km / avg_return_speed
+        return_time_hours = ctx['return_time_hours']
         return_start = env.now
         yield env.timeout(return_time_hours)
         return_end = env.now
         global_metrics['total_return_time_hours'] += (return_end - return_start)
+        if recorder is not None:
+            recorder.record(truck_index, cycle_no, PHASE_RETURN, return_start, return_end)
         
-        avg_dump_min = calibrated_params['avg_dumping_time_min']
-        dumping_time_hours = avg_dump_min / 60.0
+        dumping_time_hours = ctx['dumping_time_hours']
         dump_start = env.now
         yield env.timeout(dumping_time_hours)
         dump_end = env.now
         global_metrics['total_dumping_time_hours'] += (dump_end - dump_start)
+        if recorder is not None:
+            recorder.record(truck_index, cycle_no, PHASE_DUMP, dump_start, dump_end)
         
         cycle_duration_hours = env.now - start_cycle_time
         global_metrics['total_cycle_time_hours'] += cycle_duration_hours
         
+        if broker is None:
+            fuel, load, delay = cycle
+            global_metrics['total_tonase'] += load
+            global_metrics['total_bbm_liter'] += fuel
+            global_metrics['total_probabilitas_delay'] += delay
+            if recorder is not None:
+                recorder.record(truck_index, cycle_no, PHASE_CYCLE, start_cycle_time, dump_end, load, fuel)
+        elif recorder is None:
+            ledger.append(cycle + (None,))
+        else:
+            handle, fuel, load = cycle
+            # Baris siklus (muatan/BBM final) dicatat saat settle, setelah prediksi tersedia
+            ledger.append((handle, fuel, load, (truck_index, cycle_no, start_cycle_time, dump_end)))
+        global_metrics['jumlah_siklus_selesai'] += 1
+        global_metrics['total_maintenance_cost'] += (cycle_duration_hours * ctx['maint_rate'])
+        cycle_no += 1
+
+def settle_deferred_cycles(ledger, broker, global_metrics, recorder=None):
+    """Akumulasi metrik siklus yang prediksinya ditunda (urutan ledger = urutan siklus selesai)."""
+    for handle, fuel, load, cycle in ledger:
+        ml = broker.get(handle) if handle is not None else None
+        fuel, load, delay = cycle_outputs(fuel, load, ml)
         global_metrics['total_tonase'] += load
         global_metrics['total_bbm_liter'] += fuel
         global_metrics['total_probabilitas_delay'] += delay
-        global_metrics['jumlah_siklus_selesai'] += 1
-        global_metrics['total_maintenance_cost'] += (cycle_duration_hours * maint_rate)
+        if recorder is not None:
+            recorder.record(cycle[0], cycle[1], PHASE_CYCLE, cycle[2], cycle[3], load, fuel)
 
-def calculate_shipment_risk(simulated_tonnage_8h, schedule_id, financial_params, sim_start_time, data):
+def calculate_shipment_risk(simulated_tonnage_8h, schedule_id, financial_params, sim_start_time, data, production=None):
+    """
+    Status kesiapan muatan kapal untuk jadwal schedule_id.
+    production: callable(horizon_hours) -> simulate_production_horizon; jika diberikan, jam yang
+    dibutuhkan diambil dari simulasi shift berurutan sampai etsLoading (maks HORIZON_MAX_HOURS),
+    bukan ekstrapolasi laju 8 jam x 16 jam/hari.
+    """
     if data['schedules'].empty or schedule_id not in data['schedules'].index:
         return {"status": "NO_SHIP", "demurrage_cost": 0, "info": "Tidak ada jadwal", "days_to_complete": 0, "vessel_name": "N/A", "hours_needed": 0, "delay_risk_level": "NONE"}
 
@@ -530,6 +804,7 @@ def calculate_shipment_risk(simulated_tonnage_8h, schedule_id, financial_params,
         return {
             "status": "LATE",
             "demurrage_cost": late_penalty + additional_demurrage,
+            "hours_late": hours_late,
             "info": f"Kapal {vessel_name} telat {hours_late:.1f} jam!",
             "vessel_name": vessel_name,
             "days_to_complete": days_needed,
@@ -537,16 +812,23 @@ def calculate_shipment_risk(simulated_tonnage_8h, schedule_id, financial_params,
             "delay_risk_level": "CRITICAL"
         }
 
-    prod_per_hour_8h = simulated_tonnage_8h / 8.0
-    
-    daily_production_rate = prod_per_hour_8h * 16
-    
-    if daily_production_rate <= 0:
-        hours_needed = 9999
-        days_needed = 9999
-    else:
-        hours_needed = (remaining_target / daily_production_rate) * 24
+    horizon_mode = 'extrapolate'
+    horizon = production(min(time_remaining_hours, HORIZON_MAX_HOURS)) if production is not None else None
+    if horizon is not None:
+        horizon_mode = 'until_ets'
+        hours_needed = horizon_hours_needed(horizon, remaining_target)
         days_needed = hours_needed / 24.0
+    else:
+        prod_per_hour_8h = simulated_tonnage_8h / 8.0
+        
+        daily_production_rate = prod_per_hour_8h * 16
+        
+        if daily_production_rate <= 0:
+            hours_needed = 9999
+            days_needed = 9999
+        else:
+            hours_needed = (remaining_target / daily_production_rate) * 24
+            days_needed = hours_needed / 24.0
    
     variance_hours = time_remaining_hours - hours_needed
     demurrage = 0
@@ -561,38 +843,39 @@ def calculate_shipment_risk(simulated_tonnage_8h, schedule_id, financial_params,
         status = "TIGHT_SCHEDULE"
         delay_risk_level = "MEDIUM"
 
-    return {
+    result = {
         "status": status,
         "demurrage_cost": demurrage,
         "info": f"Kapal {vessel_name} status: {status}",
         "vessel_name": vessel_name,
         "days_to_complete": days_needed,
         "hours_needed": hours_needed,
-        "delay_risk_level": delay_risk_level
+        "delay_risk_level": delay_risk_level,
+        "horizon_mode": horizon_mode
     }
-def run_hybrid_simulation(skenario, financial_params, data, duration_hours=8, calibrated_params=None):
+    if horizon is not None:
+        result["tonnage_at_ets"] = horizon['total_tonase']
+        result["horizon_hours"] = horizon['horizon_hours']
+        result["horizon_shifts"] = len(horizon['shifts'])
+    return result
+DEFAULT_CALIBRATED_PARAMS = {
+    'avg_hauling_speed_kmh': 25.0,
+    'avg_return_speed_kmh': 30.0,
+    'avg_loading_time_min': 3.0,
+    'avg_dumping_time_min': 2.0,
+    'avg_queue_time_min': 5.0
+}
+
+def parse_sim_start_time(skenario):
     sim_start_str = skenario.get('simulation_start_date', pd.Timestamp.now(tz='UTC').isoformat())
     try:
         sim_start_time = pd.to_datetime(sim_start_str)
         if sim_start_time.tzinfo is None: sim_start_time = sim_start_time.tz_localize('UTC')
     except:
         sim_start_time = pd.Timestamp.now(tz='UTC')
+    return sim_start_time
 
-    env = simpy.Environment()
-    res = {'excavator': simpy.Resource(env, capacity=skenario.get('jumlah_excavator', 1))}
-    metrics = {
-        'total_tonase': 0, 'total_bbm_liter': 0, 
-        'jumlah_siklus_selesai': 0, 'total_waktu_antri_jam': 0.0,
-        'total_probabilitas_delay': 0.0,
-        'total_cycle_time_hours': 0.0,
-        'total_maintenance_cost': 0.0,
-        'total_operator_cost': 0.0,
-        'total_loading_time_hours': 0.0,
-        'total_dumping_time_hours': 0.0,
-        'total_hauling_time_hours': 0.0,
-        'total_return_time_hours': 0.0
-    }
-    
+def get_available_truck_ids(data, verbose=True):
     ALLOWED_TRUCK_STATUSES = ['STANDBY', 'IDLE']
     
     truck_pool = data['trucks']
@@ -603,39 +886,16 @@ def run_hybrid_simulation(skenario, financial_params, data, duration_hours=8, ca
         available_trucks = truck_pool[truck_pool['status'].isin(ALLOWED_TRUCK_STATUSES)]
         
         if available_trucks.empty:
-            print(f"   ⚠️ Warning: No trucks with STANDBY/IDLE status. Using fallback filter.")
+            if verbose: print(f"   ⚠️ Warning: No trucks with STANDBY/IDLE status. Using fallback filter.")
             available_trucks = truck_pool[~truck_pool['status'].isin(['MAINTENANCE', 'BREAKDOWN', 'OUT_OF_SERVICE'])]
         
         trucks = available_trucks.index.tolist()
-        print(f"   > Available trucks (active, STANDBY/IDLE): {len(trucks)} dari {len(data['trucks'])} total")
+        if verbose: print(f"   > Available trucks (active, STANDBY/IDLE): {len(trucks)} dari {len(data['trucks'])} total")
     else:
         trucks = truck_pool.index.tolist()
+    return trucks
 
-    ops = data['operators'].index.tolist()
-    
-    if not trucks: 
-        print("⚠️ No active trucks available for simulation!")
-        return skenario 
-
-    if calibrated_params is None:
-        calibrated_params = {
-            'avg_hauling_speed_kmh': 25.0,
-            'avg_return_speed_kmh': 30.0,
-            'avg_loading_time_min': 3.0,
-            'avg_dumping_time_min': 2.0,
-            'avg_queue_time_min': 5.0
-        }
-
-    used_truck_ids = []
-    for i in range(skenario['alokasi_truk']):
-        t_id = trucks[i % len(trucks)]
-        used_truck_ids.append(t_id)
-        o_id = ops[i % len(ops)]
-
-        env.process(truck_process_hybrid(env, t_id, o_id, res, metrics, skenario, sim_start_time, data, calibrated_params))
-        
-    used_excavator_ids = []
-    
+def get_available_excavator_ids(data, verbose=True):
     ALLOWED_EXCAVATOR_STATUSES = ['STANDBY', 'IDLE', 'ACTIVE']
     
     excavator_pool = data['excavators']
@@ -646,14 +906,17 @@ def run_hybrid_simulation(skenario, financial_params, data, duration_hours=8, ca
         available_excavators = excavator_pool[excavator_pool['status'].isin(ALLOWED_EXCAVATOR_STATUSES)]
         
         if available_excavators.empty:
-            print(f"   ⚠️ Warning: No excavators with available status. Using fallback filter.")
+            if verbose: print(f"   ⚠️ Warning: No excavators with available status. Using fallback filter.")
             available_excavators = excavator_pool[~excavator_pool['status'].isin(['MAINTENANCE', 'BREAKDOWN', 'OUT_OF_SERVICE'])]
         
         excavators_list = available_excavators.index.tolist()
-        print(f"   > Available excavators (active, STANDBY/IDLE/ACTIVE): {len(excavators_list)} dari {len(data['excavators'])} total")
+        if verbose: print(f"   > Available excavators (active, STANDBY/IDLE/ACTIVE): {len(excavators_list)} dari {len(data['excavators'])} total")
     else:
         excavators_list = excavator_pool.index.tolist()
+    return excavators_list
 
+def select_scenario_excavators(excavators_list, skenario):
+    used_excavator_ids = []
     target_exc_id = skenario.get('target_excavator_id')
     
     if excavators_list:
@@ -664,47 +927,78 @@ def run_hybrid_simulation(skenario, financial_params, data, duration_hours=8, ca
         for i in range(skenario['jumlah_excavator']):
             e_id = excavators_list[(start_idx + i) % len(excavators_list)]
             used_excavator_ids.append(e_id)
+    return used_excavator_ids
 
-    env.run(until=duration_hours)
-    
-    p = financial_params
-    rev = metrics['total_tonase'] * p['HargaJualBatuBara']
-    
-    num_trucks = skenario['alokasi_truk']
-    num_excavators = skenario['jumlah_excavator']
-    num_hauling_operators = num_trucks
-    num_loading_operators = num_excavators
-    num_dumping_operators = num_excavators
-    total_operators_needed = num_hauling_operators + num_loading_operators + num_dumping_operators
-    
-    avg_operator_salary = p.get('GajiOperatorRataRata', 5000000)
+def get_data_operator_salary(data):
+    """Rata-rata gaji operator dari data, atau None jika tidak tersedia."""
     if 'operators' in data and not data['operators'].empty and 'salary' in data['operators'].columns:
         salaries = data['operators']['salary'].dropna()
         if len(salaries) > 0:
-            avg_operator_salary = salaries.mean()
-    
-    duration_hours_actual = env.now
+            return salaries.mean()
+    return None
+
+def get_avg_operator_salary(data, p):
+    avg_operator_salary = get_data_operator_salary(data)
+    if avg_operator_salary is None:
+        avg_operator_salary = p.get('GajiOperatorRataRata', 5000000)
+    return avg_operator_salary
+
+def compute_profit_components(total_tonase, total_bbm_liter, total_maintenance_cost, total_waktu_antri_jam,
+                              total_probabilitas_delay, num_trucks, num_excavators, duration_hours,
+                              avg_operator_salary, demurrage_cost, p):
+    """
+    Rumus finansial simulasi (revenue, biaya, risiko, profit).
+    Bekerja untuk skalar maupun array NumPy sehingga bisa dipakai untuk
+    satu skenario (run_hybrid_simulation) atau ribuan skenario sekaligus.
+    """
+    total_operators_needed = num_trucks + num_excavators + num_excavators
     salary_per_hour_per_operator = avg_operator_salary / 30 / 24
-    metrics['total_operator_cost'] = salary_per_hour_per_operator * total_operators_needed * duration_hours_actual
-    metrics['num_hauling_operators'] = num_hauling_operators
-    metrics['num_loading_operators'] = num_loading_operators
-    metrics['num_dumping_operators'] = num_dumping_operators
-    metrics['total_operators_needed'] = total_operators_needed
-    metrics['avg_operator_salary_monthly'] = avg_operator_salary
-    metrics['operator_salary_per_hour'] = salary_per_hour_per_operator
-    
-    cost = metrics['total_bbm_liter'] * p['HargaSolar']
-    cost += metrics['total_maintenance_cost']
-    cost += metrics['total_operator_cost']
+    operator_cost = salary_per_hour_per_operator * total_operators_needed * duration_hours
+    
+    rev = total_tonase * p['HargaJualBatuBara']
+    fuel_cost = total_bbm_liter * p['HargaSolar']
+    cost = fuel_cost + total_maintenance_cost + operator_cost
+    risk_antri = total_waktu_antri_jam * p.get('BiayaAntrianPerJam', 100000)
+    risk_insiden = total_probabilitas_delay * p.get('BiayaRataRataInsiden', 500000)
+    profit = rev - cost - risk_antri - risk_insiden - demurrage_cost
+    return {
+        'revenue': rev,
+        'fuel_cost': fuel_cost,
+        'operator_cost': operator_cost,
+        'operator_salary_per_hour': salary_per_hour_per_operator,
+        'total_operators_needed': total_operators_needed,
+        'total_cost': cost,
+        'queue_cost': risk_antri,
+        'incident_risk_cost': risk_insiden,
+        'demurrage_cost': demurrage_cost,
+        'net_profit': profit
+    }
+
+def finalize_simulation_result(skenario, metrics, financial_params, data, sim_start_time, duration_hours_actual, used_truck_ids, used_excavator_ids, production=None):
+    """Post-processing finansial & logistik dari metrik fisik hasil simulasi (production: lihat calculate_shipment_risk)."""
+    p = financial_params
     
-    risk_antri = metrics['total_waktu_antri_jam'] * p.get('BiayaAntrianPerJam', 100000)
-    risk_insiden = metrics['total_probabilitas_delay'] * p.get('BiayaRataRataInsiden', 500000) 
+    num_trucks = skenario['alokasi_truk']
+    num_excavators = skenario['jumlah_excavator']
+    avg_operator_salary = get_avg_operator_salary(data, p)
     
     schedule_id = skenario.get('target_schedule_id')
-    ship_res = calculate_shipment_risk(metrics['total_tonase'], schedule_id, p, sim_start_time, data)
+    ship_res = calculate_shipment_risk(metrics['total_tonase'], schedule_id, p, sim_start_time, data, production)
     biaya_demurrage = ship_res['demurrage_cost']
     
-    profit = rev - cost - risk_antri - risk_insiden - biaya_demurrage
+    fin = compute_profit_components(
+        metrics['total_tonase'], metrics['total_bbm_liter'], metrics['total_maintenance_cost'],
+        metrics['total_waktu_antri_jam'], metrics['total_probabilitas_delay'],
+        num_trucks, num_excavators, duration_hours_actual, avg_operator_salary, biaya_demurrage, p
+    )
+    
+    metrics['total_operator_cost'] = fin['operator_cost']
+    metrics['num_hauling_operators'] = num_trucks
+    metrics['num_loading_operators'] = num_excavators
+    metrics['num_dumping_operators'] = num_excavators
+    metrics['total_operators_needed'] = fin['total_operators_needed']
+    metrics['avg_operator_salary_monthly'] = avg_operator_salary
+    metrics['operator_salary_per_hour'] = fin['operator_salary_per_hour']
     
     road_id = skenario.get('target_road_id')
     try: road_dist = data['roads'].loc[road_id]['distance']
@@ -714,28 +1008,889 @@ def run_hybrid_simulation(skenario, financial_params, data, duration_hours=8, ca
     result = skenario.copy()
     result.update(metrics)
     result.update({
-        'Z_SCORE_PROFIT': profit,
-        'total_biaya_risiko_antrian': risk_antri,
-        'total_biaya_risiko_insiden': risk_insiden,
+        'Z_SCORE_PROFIT': fin['net_profit'],
+        'total_biaya_risiko_antrian': fin['queue_cost'],
+        'total_biaya_risiko_insiden': fin['incident_risk_cost'],
         'shipment_analysis': ship_res,
         'used_truck_ids': used_truck_ids,
         'used_excavator_ids': used_excavator_ids,
         'total_distance_km': total_distance_km,
         'financial_params': p,
         'financial_breakdown': {
-            'revenue': rev,
-            'fuel_cost': metrics['total_bbm_liter'] * p['HargaSolar'],
+            'revenue': fin['revenue'],
+            'fuel_cost': fin['fuel_cost'],
             'maintenance_cost': metrics['total_maintenance_cost'],
-            'operator_cost': metrics['total_operator_cost'],
-            'queue_cost': risk_antri,
-            'incident_risk_cost': risk_insiden,
+            'operator_cost': fin['operator_cost'],
+            'queue_cost': fin['queue_cost'],
+            'incident_risk_cost': fin['incident_risk_cost'],
             'demurrage_cost': biaya_demurrage,
-            'total_cost': cost,
-            'net_profit': profit
+            'total_cost': fin['total_cost'],
+            'net_profit': fin['net_profit']
         }
     })
     return result
 
+def new_simulation_metrics():
+    return {
+        'total_tonase': 0, 'total_bbm_liter': 0, 
+        'jumlah_siklus_selesai': 0, 'total_waktu_antri_jam': 0.0,
+        'total_probabilitas_delay': 0.0,
+        'total_cycle_time_hours': 0.0,
+        'total_maintenance_cost': 0.0,
+        'total_operator_cost': 0.0,
+        'total_loading_time_hours': 0.0,
+        'total_dumping_time_hours': 0.0,
+        'total_hauling_time_hours': 0.0,
+        'total_return_time_hours': 0.0
+    }
+
+def simulate_scenario_physics(skenario, data, duration_hours=8, calibrated_params=None, prediction_cache=None, engine=None, stream_seed=None, recorder=None):
+    """
+    Bagian simulasi dari run_hybrid_simulation: metrik fisik tanpa perhitungan finansial.
+    engine: 'simpy' (default SIM_ENGINE), 'kernel' (haul_kernel, hasil identik, lebih cepat) atau
+    'lockstep' (simulate_physics_lockstep, efisien untuk banyak skenario sekaligus).
+    stream_seed: (seed, replication) untuk truck_streams; default (CRN_SEED, 0).
+    recorder: EventRecorder opsional untuk log event per fase (lockstep memakai 'kernel'
+    yang hasilnya identik, karena engine lockstep tidak menyimpan event per fase).
+    Mengembalikan None jika tidak ada truk aktif.
+    """
+    ensure_ml_models()
+    engine = engine or SIM_ENGINE
+    policy = dispatch_policy(skenario)
+    if engine == 'lockstep' and (recorder is not None or policy != 'pooled'):
+        engine = 'kernel'
+    if engine == 'lockstep':
+        return simulate_physics_lockstep([skenario], data, duration_hours, calibrated_params, prediction_cache, stream_seed)[0]
+    sim_start_time = parse_sim_start_time(skenario)
+
+    metrics = new_simulation_metrics()
+    
+    trucks = get_available_truck_ids(data)
+    ops = data['operators'].index.tolist()
+    
+    if not trucks: 
+        print("⚠️ No active trucks available for simulation!")
+        return None
+
+    if calibrated_params is None:
+        calibrated_params = dict(DEFAULT_CALIBRATED_PARAMS)
+
+    used_truck_ids = []
+    slots = []
+    for i in range(skenario['alokasi_truk']):
+        t_id = trucks[i % len(trucks)]
+        used_truck_ids.append(t_id)
+        slots.append((t_id, ops[i % len(ops)]))
+
+    excavators_list = get_available_excavator_ids(data)
+    used_excavator_ids = select_scenario_excavators(excavators_list, skenario)
+    dispatcher = None
+    if policy != 'pooled' and used_excavator_ids:
+        # Resource per excavator (used_excavator_ids), durasi loading dari bucketCapacity masing-masing
+        base_loading = scenario_cycle_context(skenario, data, sim_start_time, calibrated_params)['loading_time_hours']
+        excavator_loading = excavator_loading_hours(used_excavator_ids, data, base_loading)
+        dispatcher = ExcavatorDispatcher(policy, excavator_loading)
+
+    streams = truck_streams(stream_seed or (CRN_SEED, 0), len(slots))
+    if engine == 'kernel':
+        contexts = [truck_cycle_context(t_id, o_id, skenario, data, sim_start_time, calibrated_params, rng)
+                    for (t_id, o_id), rng in zip(slots, streams)]
+        contexts = [ctx for ctx in contexts if ctx is not None]
+        feature_store = get_feature_store(data)
+
+        def dispatched_cycle(k, t, e):
+            contexts[k]['excavator_id'] = used_excavator_ids[e]
+            return sample_cycle(contexts[k], t, feature_store, prediction_cache)
+
+        if dispatcher is not None:
+            run_dispatched_cycles(
+                dispatcher,
+                [c['hauling_time_hours'] for c in contexts],
+                excavator_loading,
+                [c['return_time_hours'] for c in contexts],
+                [c['dumping_time_hours'] for c in contexts],
+                [c['maint_rate'] for c in contexts],
+                duration_hours,
+                dispatched_cycle,
+                metrics,
+                recorder
+            )
+        else:
+            run_haul_cycles(
+                skenario.get('jumlah_excavator', 1),
+                [c['hauling_time_hours'] for c in contexts],
+                [c['loading_time_hours'] for c in contexts],
+                [c['return_time_hours'] for c in contexts],
+                [c['dumping_time_hours'] for c in contexts],
+                [c['maint_rate'] for c in contexts],
+                duration_hours,
+                lambda k, t: sample_cycle(contexts[k], t, feature_store, prediction_cache),
+                metrics,
+                recorder
+            )
+        sim_end = duration_hours
+    else:
+        env = simpy.Environment()
+        if dispatcher is not None:
+            res = {
+                'excavators': [simpy.Resource(env, capacity=1) for _ in used_excavator_ids],
+                'excavator_ids': used_excavator_ids,
+                'loading_hours': excavator_loading,
+                'dispatcher': dispatcher
+            }
+        else:
+            res = {'excavator': simpy.Resource(env, capacity=skenario.get('jumlah_excavator', 1))}
+        # Prediksi ML semua truk di-batch (satu predict per model per batch, bukan per siklus)
+        broker = InferenceBroker(predict_cycle_outputs_batch, prediction_cache, INFERENCE_BATCH_SIZE) if INFERENCE_BATCH_SIZE > 1 else None
+        ledger = []
+        for i, ((t_id, o_id), rng) in enumerate(zip(slots, streams)):
+            env.process(truck_process_hybrid(env, t_id, o_id, res, metrics, skenario, sim_start_time, data, calibrated_params,
+                                             prediction_cache, rng, broker, ledger, recorder, i))
+        env.run(until=duration_hours)
+        sim_end = env.now
+        if broker is not None:
+            settle_deferred_cycles(ledger, broker, metrics, recorder)
+    
+    physics = {
+        'metrics': metrics,
+        'sim_start_time': sim_start_time,
+        'duration_hours_actual': sim_end,
+        'used_truck_ids': used_truck_ids,
+        'used_excavator_ids': used_excavator_ids
+    }
+    if dispatcher is not None:
+        physics['dispatch'] = {
+            'policy': policy,
+            'loading_hours': excavator_loading,
+            'trucks_served': list(dispatcher.served)
+        }
+    return physics
+
+def excavator_loading_hours(excavator_ids, data, base_loading_hours):
+    """
+    Durasi loading (jam) per excavator: durasi rata-rata kalibrasi diskalakan dengan
+    bucketCapacity relatif terhadap rata-rata armada (bucket lebih besar -> lebih sedikit pass).
+    Excavator tanpa bucketCapacity memakai durasi rata-rata.
+    """
+    store = get_feature_store(data)
+    buckets = store.excavator_bucket_capacity
+    valid = buckets[buckets > 0]
+    reference = float(valid.mean()) if len(valid) else 0.0
+    hours = []
+    for e_id in excavator_ids:
+        i = store.excavator_index.get(e_id)
+        bucket = float(buckets[i]) if i is not None else 0.0
+        hours.append(base_loading_hours * reference / bucket if bucket > 0 and reference > 0 else base_loading_hours)
+    return hours
+
+def _noise_table(rng, num_cycles):
+    """Faktor noise (BBM, muatan) siklus 0..num_cycles-1 satu stream truk, diambil per blok seperti _cycle_noise."""
+    blocks = [rng.uniform(0.95, 1.05, size=(NOISE_BLOCK, 2)) for _ in range(-(-num_cycles // NOISE_BLOCK))]
+    return np.concatenate(blocks) if blocks else np.zeros((0, 2))
+
+def predict_unique_rows(feats, prediction_cache=None):
+    """Prediksi ML untuk setiap vektor fitur unik di feats (None dilewati) -> dict fitur -> hasil."""
+    unique = dict.fromkeys(f for f in feats if f is not None)
+    if INFERENCE_BATCH_SIZE > 1:
+        broker = InferenceBroker(predict_cycle_outputs_batch, prediction_cache, INFERENCE_BATCH_SIZE)
+        handles = [broker.submit(f) for f in unique]
+        return dict(zip(unique, [broker.get(h) for h in handles]))
+    return {f: predict_cycle_outputs(f, prediction_cache) for f in unique}
+
+def simulate_physics_lockstep(scenarios, data, duration_hours=8, calibrated_params=None, prediction_cache=None, stream_seed=None):
+    """
+    simulate_scenario_physics untuk banyak skenario sekaligus (engine 'lockstep').
+
+    Event semua skenario dimajukan bersama oleh lockstep_engine (state array skenario x truk,
+    antrian excavator per skenario). Setelah itu fitur, noise CRN, dan prediksi ML semua
+    siklus yang selesai dihitung batch (satu InferenceBroker lintas skenario), lalu metrik
+    diakumulasi per skenario dengan urutan selesai siklus yang sama -> hasil identik
+    dengan engine 'simpy'/'kernel'.
+
+    Returns:
+        list physics (urutan sama seperti scenarios); None jika tidak ada truk aktif.
+    """
+    ensure_ml_models()
+    if not scenarios:
+        return []
+    dispatched = [i for i, sk in enumerate(scenarios) if dispatch_policy(sk) != 'pooled']
+    if dispatched:
+        # Resource per excavator tidak dimodelkan lockstep: skenario tersebut memakai engine 'kernel'
+        results = [None] * len(scenarios)
+        for i in dispatched:
+            results[i] = simulate_scenario_physics(scenarios[i], data, duration_hours, calibrated_params, prediction_cache,
+                                                   engine='kernel', stream_seed=stream_seed)
+        pooled = [i for i, sk in enumerate(scenarios) if dispatch_policy(sk) == 'pooled']
+        for i, physics in zip(pooled, simulate_physics_lockstep([scenarios[i] for i in pooled], data, duration_hours,
+                                                                calibrated_params, prediction_cache, stream_seed)):
+            results[i] = physics
+        return results
+    trucks = get_available_truck_ids(data)
+    ops = data['operators'].index.tolist()
+    if not trucks:
+        print("⚠️ No active trucks available for simulation!")
+        return [None] * len(scenarios)
+    if calibrated_params is None:
+        calibrated_params = dict(DEFAULT_CALIBRATED_PARAMS)
+    excavators_list = get_available_excavator_ids(data)
+    feature_store = get_feature_store(data)
+
+    # Konteks skenario dan tarif truk dihitung sekali (lookup pandas), bukan per slot truk
+    rates, start_times = {}, {}
+    contexts, slots, starts = [], [], []
+    for skenario in scenarios:
+        start_key = skenario.get('simulation_start_date')
+        if start_key is None or start_key not in start_times:
+            sim_start_time = parse_sim_start_time(skenario)
+            if start_key is not None:
+                start_times[start_key] = sim_start_time
+        sim_start_time = start_times.get(start_key, sim_start_time)
+        starts.append(sim_start_time)
+        contexts.append(scenario_cycle_context(skenario, data, sim_start_time, calibrated_params))
+        active = []
+        for i in range(skenario['alokasi_truk']):
+            t_id = trucks[i % len(trucks)]
+            if t_id not in rates:
+                rates[t_id] = truck_rates(t_id, data)
+            if rates[t_id] is not None:
+                active.append((i, t_id, ops[i % len(ops)]))
+        slots.append(active)
+
+    S = len(scenarios)
+    K = max(1, max(len(a) for a in slots))
+    haul, load_t, ret, dump, maint = (np.zeros((S, K)) for _ in range(5))
+    capacity, fuel_rate = np.zeros((S, K)), np.zeros((S, K))
+    stream_index = np.zeros((S, K), dtype=np.int64)
+    for s, (ctx, active) in enumerate(zip(contexts, slots)):
+        n = len(active)
+        haul[s, :n] = float(ctx['hauling_time_hours'])
+        load_t[s, :n] = float(ctx['loading_time_hours'])
+        ret[s, :n] = float(ctx['return_time_hours'])
+        dump[s, :n] = float(ctx['dumping_time_hours'])
+        for k, (i, t_id, _) in enumerate(active):
+            capacity[s, k], fuel_rate[s, k], maint[s, k] = rates[t_id]
+            stream_index[s, k] = i
+
+    out = run_lockstep_cycles(
+        [sk.get('jumlah_excavator', 1) for sk in scenarios], [len(a) for a in slots],
+        haul, load_t, ret, dump, maint, duration_hours
+    )
+    cs, ck, cj, cstart, _ = out['completed']
+
+    # Noise CRN: tabel per slot stream, cukup sampai siklus selesai terbanyak di semua skenario
+    num_streams = int(stream_index.max()) + 1 if len(cs) else 0
+    need = np.zeros(num_streams, dtype=np.int64)
+    if num_streams:
+        np.maximum.at(need, stream_index.ravel(), out['cycles'].ravel())
+    tables = [_noise_table(rng, int(c)) for rng, c in zip(truck_streams(stream_seed or (CRN_SEED, 0), num_streams), need)]
+    offsets = np.concatenate([[0], np.cumsum([len(tb) for tb in tables])]).astype(np.int64)
+    noise = np.concatenate(tables) if tables else np.zeros((0, 2))
+    slot_stream = stream_index[cs, ck]
+    factors = noise[offsets[slot_stream] + cj] if len(cs) else np.zeros((0, 2))
+
+    distance = np.array([float(ctx['road_distance_km']) for ctx in contexts])
+    fuel = ((distance[cs] * 2) * fuel_rate[cs, ck] * factors[:, 0]).tolist()
+    load = (capacity[cs, ck] * 0.87 * factors[:, 1]).tolist()
+
+    # Fitur ML per (skenario, truk): fitur statis sekali, fitur waktu vektor
+    feats = [None] * len(cs)
+    if MODEL_FUEL is not None and len(cs):
+        start_ns = np.array([ctx['sim_start_ns'] for ctx in contexts], dtype=np.int64)
+        t_ns = start_ns[cs] + np.round(cstart * 3600 * 1e9).astype(np.int64)
+        order = np.lexsort((ck, cs))
+        bounds = np.flatnonzero(np.diff(cs[order] * K + ck[order])) + 1
+        for group in np.split(order, bounds):
+            s, k = int(cs[group[0]]), int(ck[group[0]])
+            ctx = contexts[s]
+            _, t_id, o_id = slots[s][k]
+            rows = feature_store.feature_rows(MODEL_COLUMNS, t_id, o_id, ctx['road_id'], ctx['excavator_id'],
+                                              ctx['weather'], ctx['road_cond'], ctx['shift'], t_ns[group])
+            if rows is not None:
+                for pos, row in zip(group.tolist(), rows):
+                    feats[pos] = row
+
+    # Vektor fitur unik lintas skenario diprediksi sekali
+    predictions = predict_unique_rows(feats, prediction_cache)
+
+    all_metrics = [new_simulation_metrics() for _ in scenarios]
+    for r, s in enumerate(cs.tolist()):
+        ml = predictions[feats[r]] if feats[r] is not None else None
+        cycle_fuel, cycle_load, delay = cycle_outputs(fuel[r], load[r], ml)
+        metrics = all_metrics[s]
+        metrics['total_tonase'] += cycle_load
+        metrics['total_bbm_liter'] += cycle_fuel
+        metrics['total_probabilitas_delay'] += delay
+
+    results = []
+    for s, skenario in enumerate(scenarios):
+        metrics = all_metrics[s]
+        for key in ('total_hauling_time_hours', 'total_waktu_antri_jam', 'total_loading_time_hours',
+                    'total_return_time_hours', 'total_dumping_time_hours', 'total_cycle_time_hours',
+                    'total_maintenance_cost'):
+            metrics[key] = float(out[key][s])
+        metrics['jumlah_siklus_selesai'] = int(out['jumlah_siklus_selesai'][s])
+        results.append({
+            'metrics': metrics,
+            'sim_start_time': starts[s],
+            'duration_hours_actual': duration_hours,
+            'used_truck_ids': [trucks[i % len(trucks)] for i in range(skenario['alokasi_truk'])],
+            'used_excavator_ids': select_scenario_excavators(excavators_list, skenario)
+        })
+    return results
+
+def horizon_shifts(start_shift, horizon_hours, shift_hours=SHIFT_HOURS):
+    """
+    Kalender shift produksi dalam horizon: list (nama_shift, jam_mulai, durasi_jam) untuk
+    shift di HORIZON_OPERATING_SHIFTS, berurutan mulai dari start_shift. Shift terakhir
+    dipotong di akhir horizon.
+    """
+    first = SHIFT_ORDER.index(start_shift) if start_shift in SHIFT_ORDER else 0
+    shifts = []
+    n = 0
+    while n * shift_hours < horizon_hours:
+        name = SHIFT_ORDER[(first + n) % len(SHIFT_ORDER)]
+        if name in HORIZON_OPERATING_SHIFTS:
+            start = n * shift_hours
+            shifts.append((name, start, min(shift_hours, horizon_hours - start)))
+        n += 1
+    return shifts
+
+def _operators_by_shift(data):
+    """Nama shift -> daftar ID operator shift tersebut (semua operator jika shift tidak punya operator)."""
+    ops = data['operators']
+    all_ops = ops.index.tolist()
+    if 'shift' not in ops.columns:
+        return {name: all_ops for name in SHIFT_ORDER}
+    return {name: ops.index[ops['shift'] == name].tolist() or all_ops for name in SHIFT_ORDER}
+
+def simulate_production_horizon(skenario, data, horizon_hours, calibrated_params=None, prediction_cache=None, stream_seed=None):
+    """
+    Mode horizon panjang (multi-hari / sampai ETS kapal): shift produksi berurutan sesuai
+    kalender horizon_shifts. Setiap shift dimulai dari keadaan awal (truk keluar dari pit,
+    antrian kosong) dan siklus yang belum selesai di akhir shift tidak dihitung, sama seperti
+    satu run 8 jam. Operator berganti per shift (operator dengan kolom shift yang sama, slot
+    i -> operator i), fitur umur truk & hari sejak maintenance bergulir per hari.
+
+    Durasi fase tidak bergantung pada waktu, sehingga jadwal siklus satu shift penuh cukup
+    disimulasikan sekali (engine lockstep) lalu digeser ke setiap shift; shift terpotong
+    memakai siklus yang selesai sebelum akhir horizon. Waktu disimpan sebagai jam/epoch ns
+    numerik (tanpa pd.Timestamp per siklus); fitur, noise CRN (lanjut antar shift per truk),
+    dan prediksi ML dihitung vektor untuk semua siklus.
+
+    Returns:
+        dict: horizon_hours, cycle_end_hours (terurut), cumulative_tonase, shifts (ringkasan per
+        shift), total_tonase, total_bbm_liter, jumlah_siklus_selesai. None jika tidak ada truk aktif.
+    """
+    ensure_ml_models()
+    trucks = get_available_truck_ids(data, verbose=False)
+    if not trucks:
+        return None
+    if calibrated_params is None:
+        calibrated_params = dict(DEFAULT_CALIBRATED_PARAMS)
+    sim_start_time = parse_sim_start_time(skenario)
+    ctx = scenario_cycle_context(skenario, data, sim_start_time, calibrated_params)
+
+    active = []
+    for i in range(skenario['alokasi_truk']):
+        t_id = trucks[i % len(trucks)]
+        rates = truck_rates(t_id, data)
+        if rates is not None:
+            active.append((i, t_id, rates))
+    K = len(active)
+    shifts = horizon_shifts(skenario.get('shift'), max(0.0, float(horizon_hours)))
+    if not K or not shifts:
+        return {'horizon_hours': float(horizon_hours), 'cycle_end_hours': np.zeros(0), 'cumulative_tonase': np.zeros(0),
+                'shifts': [], 'total_tonase': 0.0, 'total_bbm_liter': 0.0, 'jumlah_siklus_selesai': 0}
+
+    # Jadwal siklus satu shift penuh (deterministik, sama untuk semua shift)
+    ck, cstart, cend, cexc = _shift_cycle_schedule(skenario, data, ctx, K, max(length for _, _, length in shifts))
+
+    # Siklus semua shift: (shift, truk, excavator, mulai, selesai) dalam jam sejak awal horizon
+    parts = []
+    for n, (_, start, length) in enumerate(shifts):
+        done = cend < length
+        parts.append((np.full(int(done.sum()), n), ck[done], cexc[done], start + cstart[done], start + cend[done]))
+    sh, k, exc, t_start, t_end = (np.concatenate(x) for x in zip(*parts))
+    order = np.argsort(t_end, kind='stable')
+    sh, k, exc, t_start, t_end = sh[order], k[order], exc[order], t_start[order], t_end[order]
+
+    # Indeks siklus per truk sepanjang horizon (urutan mulai) -> posisi di stream noise CRN truk
+    by_truck = np.lexsort((t_start, k))
+    counts = np.bincount(k, minlength=K)
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    j = np.empty(len(k), dtype=np.int64)
+    j[by_truck] = np.arange(len(k)) - np.repeat(first, counts)
+    streams = truck_streams(stream_seed or (CRN_SEED, 0), max(i for i, _, _ in active) + 1)
+    noise = np.zeros((len(k), 2))
+    for slot, (i, _, _) in enumerate(active):
+        sel = k == slot
+        noise[sel] = _noise_table(streams[i], int(counts[slot]))[j[sel]]
+
+    capacity = np.array([float(r[0]) for _, _, r in active])
+    fuel_rate = np.array([float(r[1]) for _, _, r in active])
+    fuel = (float(ctx['road_distance_km']) * 2) * fuel_rate[k] * noise[:, 0]
+    load = capacity[k] * 0.87 * noise[:, 1]
+    delay = np.full(len(k), 0.05)
+
+    if MODEL_FUEL is not None and len(k):
+        # Operator per (slot, nama shift) tetap, sehingga satu grup fitur = satu slot x nama shift x excavator
+        feature_store = get_feature_store(data)
+        ops = _operators_by_shift(data)
+        excavator_ids = select_scenario_excavators(get_available_excavator_ids(data, verbose=False), skenario) or [ctx['excavator_id']]
+        names = np.array([SHIFT_ORDER.index(name) if name in SHIFT_ORDER else 0 for name, _, _ in shifts])[sh]
+        t_ns = ctx['sim_start_ns'] + np.round(t_start * 3600 * 1e9).astype(np.int64)
+        feats = [None] * len(k)
+        group_key = (k * len(SHIFT_ORDER) + names) * (len(excavator_ids) + 1) + (exc + 1)
+        grouped = np.argsort(group_key, kind='stable')
+        bounds = np.flatnonzero(np.diff(group_key[grouped])) + 1
+        for group in np.split(grouped, bounds):
+            slot, name, e = int(k[group[0]]), SHIFT_ORDER[int(names[group[0]])], int(exc[group[0]])
+            i, t_id, _ = active[slot]
+            pool = ops[name]
+            excavator_id = ctx['excavator_id'] if e < 0 else excavator_ids[e]
+            rows = feature_store.feature_rows(MODEL_COLUMNS, t_id, pool[i % len(pool)], ctx['road_id'], excavator_id,
+                                              ctx['weather'], ctx['road_cond'], name, t_ns[group])
+            if rows is not None:
+                for pos, row in zip(group.tolist(), rows):
+                    feats[pos] = row
+        predictions = predict_unique_rows(feats, prediction_cache)
+        has_ml = np.array([f is not None and predictions[f] is not None for f in feats])
+        if has_ml.any():
+            ml = [predictions[f] for f, ok in zip(feats, has_ml) if ok]
+            ml_fuel, ml_load, ml_tonase, ml_delay = (np.array([m[key] for m in ml]) for key in ('fuel', 'load', 'tonase', 'delay'))
+            # Sama dengan cycle_outputs, vektor
+            fuel[has_ml] = fuel[has_ml] * 0.7 + ml_fuel * 0.3
+            load[has_ml] = np.maximum(ml_load * 0.87, ml_tonase * 0.87)
+            delay[has_ml] = ml_delay
+
+    cumulative = np.cumsum(load)
+    shift_cycles = np.bincount(sh, minlength=len(shifts))
+    shift_tonase = np.bincount(sh, weights=load, minlength=len(shifts))
+    return {
+        'horizon_hours': float(horizon_hours),
+        'cycle_end_hours': t_end,
+        'cumulative_tonase': cumulative,
+        'shifts': [
+            {'shift': name, 'start_hours': start, 'hours': length, 'cycles': int(shift_cycles[n]), 'tonase': float(shift_tonase[n])}
+            for n, (name, start, length) in enumerate(shifts)
+        ],
+        'total_tonase': float(cumulative[-1]) if len(cumulative) else 0.0,
+        'total_bbm_liter': float(fuel.sum()),
+        'total_probabilitas_delay': float(delay.sum()),
+        'jumlah_siklus_selesai': int(len(k))
+    }
+
+def _shift_cycle_schedule(skenario, data, ctx, num_trucks, until):
+    """
+    Siklus selesai satu shift (waktu deterministik): array (truk, mulai, selesai, excavator).
+    Excavator = indeks used_excavator_ids pada mode dispatch, -1 pada model pooled.
+    """
+    policy = dispatch_policy(skenario)
+    excavator_ids = select_scenario_excavators(get_available_excavator_ids(data, verbose=False), skenario)
+    if policy == 'pooled' or not excavator_ids:
+        out = run_lockstep_cycles(
+            [skenario.get('jumlah_excavator', 1)], [num_trucks],
+            np.full((1, num_trucks), float(ctx['hauling_time_hours'])), np.full((1, num_trucks), float(ctx['loading_time_hours'])),
+            np.full((1, num_trucks), float(ctx['return_time_hours'])), np.full((1, num_trucks), float(ctx['dumping_time_hours'])),
+            np.zeros((1, num_trucks)), until
+        )
+        _, ck, _, cstart, cend = out['completed']
+        return ck, cstart, cend, np.full(len(ck), -1, dtype=np.int64)
+
+    # Waktu deterministik: ML tidak dipakai di sini, fitur dihitung per siklus oleh pemanggil
+    loading = excavator_loading_hours(excavator_ids, data, ctx['loading_time_hours'])
+    completed = []
+    run_dispatched_cycles(
+        ExcavatorDispatcher(policy, loading),
+        [ctx['hauling_time_hours']] * num_trucks, loading,
+        [ctx['return_time_hours']] * num_trucks, [ctx['dumping_time_hours']] * num_trucks, [0.0] * num_trucks,
+        until, lambda k, t, e: (0.0, 0.0, 0.0), new_simulation_metrics(), completed=completed
+    )
+    if not completed:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+    ck, cstart, cend, cexc = (np.array(col) for col in zip(*completed))
+    return ck.astype(np.int64), cstart.astype(np.float64), cend.astype(np.float64), cexc.astype(np.int64)
+
+def horizon_hours_needed(production, target_tonnage):
+    """
+    Jam sejak awal horizon sampai tonase kumulatif mencapai target. Jika target tidak
+    tercapai dalam horizon, sisa target diekstrapolasi dengan laju rata-rata horizon.
+    """
+    if target_tonnage <= 0:
+        return 0.0
+    cumulative = production['cumulative_tonase']
+    pos = int(np.searchsorted(cumulative, target_tonnage, side='left'))
+    if pos < len(cumulative):
+        return float(production['cycle_end_hours'][pos])
+    horizon = production['horizon_hours']
+    produced = production['total_tonase']
+    if produced <= 0 or horizon <= 0:
+        return 9999
+    return horizon + (target_tonnage - produced) / (produced / horizon)
+
+def finalize_physics(skenario, physics, financial_params, data, production=None):
+    if physics is None:
+        return skenario
+    return finalize_simulation_result(
+        skenario, physics['metrics'], financial_params, data, physics['sim_start_time'],
+        physics['duration_hours_actual'], physics['used_truck_ids'], physics['used_excavator_ids'], production
+    )
+
+def shipment_horizon(skenario, data, calibrated_params=None, prediction_cache=None, stream_seed=None):
+    """Callable production untuk calculate_shipment_risk (None jika SHIPMENT_HORIZON_MODE bukan 'until_ets')."""
+    if SHIPMENT_HORIZON_MODE != 'until_ets':
+        return None
+    return lambda hours: simulate_production_horizon(skenario, data, hours, calibrated_params, prediction_cache, stream_seed)
+
+def run_hybrid_simulation(skenario, financial_params, data, duration_hours=8, calibrated_params=None, prediction_cache=None):
+    physics = simulate_scenario_physics(skenario, data, duration_hours, calibrated_params, prediction_cache)
+    production = shipment_horizon(skenario, data, calibrated_params, prediction_cache)
+    return finalize_physics(skenario, physics, financial_params, data, production)
+
+def _get_truck_slot_arrays(data, trucks, num_slots):
+    """Atribut truk per slot alokasi (slot i = trucks[i % len(trucks)]), sama seperti run_hybrid_simulation."""
+    unique_count = min(num_slots, len(trucks))
+    cap, fuel, maint = [], [], []
+    for t_id in trucks[:unique_count]:
+        t_data = data['trucks'].loc[t_id]
+        cap.append(_to_float(t_data.get('capacity', 0.0), 0.0))
+        fuel.append(_to_float(t_data.get('fuelConsumption', 1.0), 1.0))
+        maint.append(_to_float(t_data.get('maintenanceCost', 0.0), 0.0))
+    idx = np.arange(num_slots) % max(unique_count, 1)
+    return np.array(cap)[idx], np.array(fuel)[idx], np.array(maint)[idx]
+
+def screen_scenarios_analytic(fixed, truck_configs, excavator_configs, sample_roads, sample_excavators, sample_schedules,
+                              enforce_schedule, target_schedule, target_production, params, data, calibrated_params,
+                              top_k=30, max_candidates=20000, max_scenarios=300, duration_hours=8, rng=None):
+    """
+    Screening cepat ribuan kombinasi (jumlah truk, jumlah excavator, rute, excavator)
+    dengan mesin analitik, lalu memilih kandidat teratas per objektif
+    (target/profit, cycle time, jarak) untuk diverifikasi dengan SimPy.
+    
+    Returns:
+        (scenarios, report) - daftar skenario untuk run_hybrid_simulation dan ringkasan screening.
+    """
+    rng = rng or random
+    t0 = time.perf_counter()
+    
+    truck_range = list(range(min(truck_configs), max(truck_configs) + 1))
+    grid = list(product(truck_range, excavator_configs, sample_roads, sample_excavators))
+    if len(grid) > max_candidates:
+        grid = rng.sample(grid, max_candidates)
+    
+    report = {'mode': 'analytic', 'candidates_screened': len(grid), 'selected_for_simulation': 0}
+    trucks = get_available_truck_ids(data, verbose=False)
+    if not grid or not trucks:
+        return [], report
+    
+    if enforce_schedule and target_schedule:
+        schedules = [target_schedule] * len(grid)
+    else:
+        schedules = [rng.choice(sample_schedules) for _ in grid]
+    
+    road_distance = {}
+    for r_id in sample_roads:
+        try: road_distance[r_id] = float(data['roads'].loc[r_id]['distance'])
+        except: road_distance[r_id] = 5.0
+    
+    num_trucks = np.array([g[0] for g in grid])
+    num_excavators = np.array([g[1] for g in grid])
+    distance = np.array([road_distance[g[2]] for g in grid])
+    
+    cap, fuel_rate, maint_rate = _get_truck_slot_arrays(data, trucks, int(num_trucks.max()))
+    speed_factor, loading_factor = get_speed_factors(fixed.get('weatherCondition', 'Cerah'), fixed.get('roadCondition', 'GOOD'))
+    batch = simulate_shift_batch(
+        num_trucks, num_excavators, distance, cap, fuel_rate, maint_rate, calibrated_params,
+        speed_factor=speed_factor, loading_factor=loading_factor, duration_hours=duration_hours
+    )
+    
+    # Demurrage hanya bergantung pada keterlambatan jadwal, bukan tonase
+    sim_start_time = parse_sim_start_time(fixed)
+    demurrage_by_schedule = {
+        sch_id: calculate_shipment_risk(0, sch_id, params, sim_start_time, data)['demurrage_cost']
+        for sch_id in set(schedules)
+    }
+    demurrage = np.array([demurrage_by_schedule[sch_id] for sch_id in schedules], dtype=np.float64)
+    
+    fin = compute_profit_components(
+        batch['total_tonase'], batch['total_bbm_liter'], batch['total_maintenance_cost'],
+        batch['total_waktu_antri_jam'], batch['total_probabilitas_delay'],
+        num_trucks, num_excavators, duration_hours, get_avg_operator_salary(data, params), demurrage, params
+    )
+    profit = fin['net_profit']
+    cycles = batch['jumlah_siklus_selesai']
+    cycle_time = np.where(cycles > 0, duration_hours / np.maximum(cycles, 1e-9), 999.0)
+    
+    if target_production > 0:
+        primary_order = np.lexsort((-profit, np.abs(batch['total_tonase'] - target_production)))
+    else:
+        primary_order = np.argsort(-profit, kind='stable')
+    speed_order = np.argsort(cycle_time, kind='stable')
+    distance_order = np.argsort(distance, kind='stable')
+    
+    # Excavator ID tidak mempengaruhi model analitik, jadi kandidat dengan
+    # (truk, jumlah excavator, rute) sama dianggap setara.
+    selected = []
+    seen = set()
+    for order in (primary_order, speed_order, distance_order):
+        taken = 0
+        for idx in order:
+            if taken >= top_k or len(selected) >= max_scenarios:
+                break
+            key = (grid[idx][0], grid[idx][1], grid[idx][2])
+            if key in seen:
+                continue
+            seen.add(key)
+            selected.append(int(idx))
+            taken += 1
+    
+    scenarios = [
+        _build_sweep_scenario(fixed, int(grid[i][0]), int(grid[i][1]), grid[i][2], grid[i][3], schedules[i])
+        for i in selected
+    ]
+    report.update({
+        'selected_for_simulation': len(scenarios),
+        'screening_time_sec': time.perf_counter() - t0,
+        'best_screened_profit': float(profit.max()) if profit.size else 0.0
+    })
+    print(f"   ⚡ Analytic screening: {len(grid)} kandidat dalam {report['screening_time_sec']:.2f}s, "
+          f"{len(scenarios)} diteruskan ke SimPy")
+    return scenarios, report
+
+def surrogate_search_sweep(fixed, truck_range, excavator_configs, sample_roads, sample_excavators, sample_schedules,
+                           enforce_schedule, target_schedule, target_production, params, data, calibrated_params,
+                           workers=1, budget=40, n_init=12, batch_size=4, max_candidates=20000,
+                           target_tolerance=0.02, engine=None, rng=None, seed=None, progress=None):
+    """
+    Pencarian strategi berbasis surrogate: random forest di-fit ke skenario yang sudah
+    disimulasikan, skenario berikutnya dipilih dengan expected improvement, sampai
+    `budget` simulasi. Objektif: kedekatan tonase ke target (jika ada target) atau
+    profit. Dengan target, pencarian berhenti begitu selisih <= target_tolerance * target.
+
+    Returns:
+        (results, prediction_cache_stats, scenario_cache_stats, search_report)
+    """
+    rng = rng or random
+    t0 = time.perf_counter()
+    grid = list(product(truck_range, excavator_configs, sample_roads, sample_excavators))
+    if len(grid) > max_candidates:
+        grid = rng.sample(grid, max_candidates)
+    if enforce_schedule and target_schedule:
+        schedules = [target_schedule] * len(grid)
+    else:
+        schedules = [rng.choice(sample_schedules) for _ in grid]
+    
+    road_features = {}
+    for r_id in sample_roads:
+        try:
+            road = data['roads'].loc[r_id]
+            road_features[r_id] = (_to_float(road.get('distance'), 5.0), _to_float(road.get('gradient'), 0.0))
+        except: road_features[r_id] = (5.0, 0.0)
+    X = encode_candidates(grid, road_features, sample_roads, sample_excavators)
+    
+    results = {}
+    cache_totals = {'hits': 0, 'misses': 0}
+    scenario_totals = {'hits': 0, 'duplicates': 0, 'simulated': 0}
+    
+    def objective(res):
+        if res is None or 'total_tonase' not in res:
+            return None
+        if target_production > 0:
+            return -abs(_to_float(res.get('total_tonase'), 0.0) - target_production)
+        return _to_float(res.get('Z_SCORE_PROFIT'), None)
+    
+    def evaluate(indices):
+        batch = [_build_sweep_scenario(fixed, int(grid[i][0]), int(grid[i][1]), grid[i][2], grid[i][3], schedules[i])
+                 for i in indices]
+        physics, cache_stats, sc_stats = simulate_physics_batch(batch, data, calibrated_params, workers, 8, engine,
+                                                                seed=seed, progress=progress)
+        _merge_cache_stats(cache_totals, cache_stats)
+        for key in scenario_totals:
+            scenario_totals[key] += sc_stats[key]
+        values = []
+        for i, sc, ph in zip(indices, batch, physics):
+            results[i] = finalize_physics(dict(sc), ph, params, data)
+            values.append(objective(results[i]))
+        return values
+    
+    # Rute terpendek selalu dievaluasi (objektif strategi 3)
+    shortest = int(np.argmin(X[:, 3])) if len(grid) else None
+    stop = None
+    if target_production > 0:
+        stop = lambda best: best >= -target_tolerance * target_production
+    
+    evaluated, values, history = run_surrogate_search(
+        X, evaluate, budget, n_init=n_init, batch_size=batch_size,
+        rng=np.random.default_rng(rng.getrandbits(32)),
+        initial=[shortest] if shortest is not None else (), stop=stop
+    )
+    
+    search_report = {
+        'mode': 'surrogate',
+        'candidates': len(grid),
+        'budget': budget,
+        'evaluations': len(evaluated),
+        'objective': 'target_gap' if target_production > 0 else 'profit',
+        'best_objective': float(max(values)) if values else None,
+        'target_reached': bool(stop(max(values))) if (stop and values) else None,
+        'history': history,
+        'search_time_sec': time.perf_counter() - t0
+    }
+    total = scenario_totals['hits'] + scenario_totals['duplicates'] + scenario_totals['simulated']
+    scenario_totals['hit_rate'] = ((scenario_totals['hits'] + scenario_totals['duplicates']) / total) if total > 0 else 0.0
+    scenario_totals['cache'] = SCENARIO_CACHE.stats()
+    return [results[i] for i in evaluated], cache_totals, scenario_totals, search_report
+
+# Metrik yang dilaporkan pada verifikasi metamodel
+METAMODEL_ERROR_FIELDS = ('total_tonase', 'total_bbm_liter', 'total_waktu_antri_jam', 'cycle_time_hours')
+
+def metamodel_sweep(fixed, truck_range, excavator_configs, sample_roads, sample_excavators, sample_schedules,
+                    enforce_schedule, target_schedule, target_production, params, data, calibrated_params,
+                    workers=1, top_k=20, verify_top=3, engine=None, rng=None, seed=None, progress=None):
+    """
+    Ranking strategi dengan metamodel offline (metamodel.py) tanpa simulasi: semua
+    kombinasi (jumlah truk, jumlah excavator, rute) diprediksi sekaligus, kandidat
+    teratas per objektif difinalisasi. verify_top kandidat teratas per objektif
+    disimulasikan ulang dengan simulator asli dan hanya hasil simulasi itu yang
+    diranking akhir; selisih prediksi vs simulasi dilaporkan sebagai error metamodel.
+
+    Returns:
+        (results, prediction_cache_stats, scenario_cache_stats, search_report)
+    """
+    rng = rng or random
+    t0 = time.perf_counter()
+    bundle = load_metamodel()
+    grid = list(product(truck_range, excavator_configs, sample_roads))
+    trucks = get_available_truck_ids(data, verbose=False)
+    excavators_list = get_available_excavator_ids(data, verbose=False)
+    
+    if enforce_schedule and target_schedule:
+        schedules = [target_schedule] * len(grid)
+    else:
+        schedules = [rng.choice(sample_schedules) for _ in grid]
+    
+    road_distance = {}
+    for r_id in sample_roads:
+        try: road_distance[r_id] = float(data['roads'].loc[r_id]['distance'])
+        except: road_distance[r_id] = 5.0
+    
+    num_trucks = np.array([g[0] for g in grid])
+    num_excavators = np.array([g[1] for g in grid])
+    distance = np.array([road_distance[g[2]] for g in grid])
+    n = len(grid)
+    pred = predict_metrics(
+        bundle, [fixed.get('weatherCondition', 'Cerah')] * n, [fixed.get('roadCondition', 'GOOD')] * n,
+        [fixed.get('shift', 'SHIFT_1')] * n, num_trucks, num_excavators, distance
+    )
+    
+    sim_start_time = parse_sim_start_time(fixed)
+    demurrage_by_schedule = {
+        sch_id: calculate_shipment_risk(0, sch_id, params, sim_start_time, data)['demurrage_cost']
+        for sch_id in set(schedules)
+    }
+    demurrage = np.array([demurrage_by_schedule[sch_id] for sch_id in schedules], dtype=np.float64)
+    fin = compute_profit_components(
+        pred['total_tonase'], pred['total_bbm_liter'], pred['total_maintenance_cost'],
+        pred['total_waktu_antri_jam'], pred['total_probabilitas_delay'],
+        num_trucks, num_excavators, 8, get_avg_operator_salary(data, params), demurrage, params
+    )
+    profit = fin['net_profit']
+    cycles = pred['jumlah_siklus_selesai']
+    cycle_time = np.where(cycles > 0, 8 / np.maximum(cycles, 1e-9), 999.0)
+    
+    if target_production > 0:
+        primary_order = np.lexsort((-profit, np.abs(pred['total_tonase'] - target_production)))
+    else:
+        primary_order = np.argsort(-profit, kind='stable')
+    orders = (primary_order, np.argsort(cycle_time, kind='stable'), np.argsort(distance, kind='stable'))
+    rank_seconds = time.perf_counter() - t0
+    
+    selected, verify = [], []
+    for order in orders:
+        for rank, idx in enumerate(order[:top_k].tolist()):
+            if idx not in selected:
+                selected.append(idx)
+            if rank < verify_top and idx not in verify:
+                verify.append(idx)
+    
+    scenarios = {
+        i: _build_sweep_scenario(fixed, int(grid[i][0]), int(grid[i][1]), grid[i][2],
+                                 sample_excavators[i % len(sample_excavators)] if sample_excavators else None, schedules[i])
+        for i in selected
+    }
+    results = {}
+    for i in selected:
+        metrics = new_simulation_metrics()
+        metrics.update({key: float(values[i]) for key, values in pred.items()})
+        physics = {
+            'metrics': metrics,
+            'sim_start_time': parse_sim_start_time(scenarios[i]),
+            'duration_hours_actual': 8,
+            'used_truck_ids': [trucks[k % len(trucks)] for k in range(int(grid[i][0]))] if trucks else [],
+            'used_excavator_ids': select_scenario_excavators(excavators_list, scenarios[i])
+        }
+        results[i] = finalize_physics(dict(scenarios[i]), physics, params, data)
+        results[i]['engine'] = 'metamodel'
+    
+    cache_stats = {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'workers': workers}
+    scenario_cache_stats = {'hits': 0, 'duplicates': 0, 'simulated': 0, 'hit_rate': 0.0, 'cache': SCENARIO_CACHE.stats()}
+    verification = []
+    if verify:
+        physics, cache_stats, scenario_cache_stats = simulate_physics_batch(
+            [scenarios[i] for i in verify], data, calibrated_params, workers, 8, engine, seed=seed, progress=progress
+        )
+        for i, ph in zip(verify, physics):
+            if ph is None:
+                continue
+            simulated = finalize_physics(dict(scenarios[i]), ph, params, data)
+            predicted = results[i]
+            row = {'alokasi_truk': simulated['alokasi_truk'], 'jumlah_excavator': simulated['jumlah_excavator'],
+                   'target_road_id': simulated['target_road_id'], 'predicted': {}, 'simulated': {}}
+            for field in METAMODEL_ERROR_FIELDS:
+                if field == 'cycle_time_hours':
+                    p_val = 8 / predicted['jumlah_siklus_selesai'] if predicted['jumlah_siklus_selesai'] > 0 else 999
+                    s_val = 8 / simulated['jumlah_siklus_selesai'] if simulated['jumlah_siklus_selesai'] > 0 else 999
+                else:
+                    p_val, s_val = predicted[field], simulated[field]
+                row['predicted'][field] = float(p_val)
+                row['simulated'][field] = float(s_val)
+            verification.append(row)
+            results[i] = simulated
+            results[i]['engine'] = 'simulated'
+    
+    errors = {}
+    for field in METAMODEL_ERROR_FIELDS:
+        if not verification:
+            break
+        p_vals = np.array([v['predicted'][field] for v in verification])
+        s_vals = np.array([v['simulated'][field] for v in verification])
+        abs_err = np.abs(p_vals - s_vals)
+        errors[field] = {
+            'mae': float(abs_err.mean()),
+            'mape_pct': float(np.mean(abs_err / np.maximum(np.abs(s_vals), 1e-9)) * 100)
+        }
+    
+    meta = bundle.get('meta', {})
+    search_report = {
+        'mode': 'metamodel',
+        'candidates': n,
+        'ranking_time_ms': rank_seconds * 1000,
+        'selected': len(selected),
+        'verified': len(verification),
+        'metamodel_error': errors,
+        'verification': verification,
+        'metamodel': {
+            'created_at': meta.get('created_at'),
+            'doe_size': meta.get('doe_size'),
+            'holdout_scores': meta.get('holdout_scores'),
+            'stale': meta.get('data_version') != get_data_version(data) or meta.get('model_version') != MODEL_VERSION
+        },
+        'search_time_sec': time.perf_counter() - t0
+    }
+    # Dengan verifikasi, ranking akhir hanya memakai hasil simulasi asli
+    ranked = [i for i in selected if results[i].get('engine') == 'simulated'] or selected
+    return [results[i] for i in ranked], cache_stats, scenario_cache_stats, search_report
+
 def get_operational_guidelines(weather, road_cond, trucks, excavators):
     guidelines = []
     
@@ -1193,10 +2348,632 @@ def format_konteks_for_llm(simulation_results, data):
         })
     return json.dumps(formatted_data, indent=2)
 
-def get_strategic_recommendations(fixed, vars, params):
+def _build_sweep_scenario(fixed, truck_count, exc_count, road_id, excavator_id, schedule_id):
+    scenario = {
+        'weatherCondition': fixed.get('weatherCondition', 'Cerah'),
+        'roadCondition': fixed.get('roadCondition', 'GOOD'),
+        'shift': fixed.get('shift', 'SHIFT_1'),
+        'target_road_id': road_id,
+        'target_excavator_id': excavator_id,
+        'target_schedule_id': schedule_id,
+        'simulation_start_date': fixed.get('simulation_start_date'),
+        'alokasi_truk': truck_count,
+        'jumlah_excavator': exc_count,
+        'miningSiteId': fixed.get('miningSiteId'),
+    }
+    if dispatch_policy(fixed) != 'pooled':
+        scenario['dispatch_policy'] = dispatch_policy(fixed)
+    return scenario
+
+def attach_cycle_breakdown(strategies, data, calibrated_params, seed=None, engine=None, duration_hours=8):
+    """
+    Simulasi ulang strategi terpilih dengan EventRecorder (stream acak sama dengan sweep,
+    replikasi 0) dan lampirkan ringkasan event sebagai strat['cycle_breakdown'].
+    Hanya dipakai untuk beberapa strategi final, jadi sweep sendiri tetap tanpa log event.
+    """
+    stream_seed = (CRN_SEED if seed is None else int(seed), 0)
+    for strat in strategies:
+        skenario = _build_sweep_scenario(strat, strat['alokasi_truk'], strat['jumlah_excavator'], strat.get('target_road_id'),
+                                         strat.get('target_excavator_id'), strat.get('target_schedule_id'))
+        recorder = EventRecorder()
+        try:
+            physics = simulate_scenario_physics(skenario, data, duration_hours, calibrated_params, engine=engine,
+                                                stream_seed=stream_seed, recorder=recorder)
+            if physics is None:
+                continue
+            summary = summarize_events(recorder.arrays(), duration_hours, skenario['alokasi_truk'], skenario['jumlah_excavator'])
+            strat['cycle_breakdown'] = _json_safe(summary)
+        finally:
+            recorder.close()
+
+def refresh_shipment_analysis(strategies, params, data, calibrated_params, seed=None):
+    """shipment_analysis strategi final dengan mode horizon (SHIPMENT_HORIZON_MODE='until_ets')."""
+    if SHIPMENT_HORIZON_MODE != 'until_ets':
+        return
+    stream_seed = (CRN_SEED if seed is None else int(seed), 0)
+    prediction_cache = PredictionCache(maxsize=PREDICTION_CACHE_SIZE)
+    for strat in strategies:
+        if strat.get('target_schedule_id') is None:
+            continue
+        skenario = _build_sweep_scenario(strat, strat['alokasi_truk'], strat['jumlah_excavator'], strat.get('target_road_id'),
+                                         strat.get('target_excavator_id'), strat.get('target_schedule_id'))
+        production = shipment_horizon(skenario, data, calibrated_params, prediction_cache, stream_seed)
+        strat['shipment_analysis'] = calculate_shipment_risk(
+            strat['total_tonase'], skenario['target_schedule_id'], params, parse_sim_start_time(skenario), data, production
+        )
+
+def _enrich_sweep_result(res, data, enforce_schedule):
+    """Menambahkan jarak, info kapal, dan metrik turunan untuk ranking multi-objective."""
+    schedule_id = res.get('target_schedule_id')
+    road_data = data['roads'].loc[res['target_road_id']]
+    road_distance = road_data['distance']
+    
+    res['distance_km'] = road_distance
+    
+    # Add vessel info to result for frontend display
+    if schedule_id and not data['schedules'].empty and schedule_id in data['schedules'].index:
+        schedule_row = data['schedules'].loc[schedule_id]
+        vessel_id = schedule_row.get('vesselId')
+        if vessel_id and not data['vessels'].empty and vessel_id in data['vessels'].index:
+            vessel_row = data['vessels'].loc[vessel_id]
+            res['vessel_info'] = {
+                'id': vessel_id,
+                'name': vessel_row.get('name', 'Unknown'),
+                'capacity': vessel_row.get('capacity', 0),
+                'etsLoading': str(schedule_row.get('etsLoading', '')),
+                'plannedQuantity': schedule_row.get('plannedQuantity', 0),
+                'status': schedule_row.get('status', 'UNKNOWN'),
+                'enforced': enforce_schedule
+            }
+        else:
+            res['vessel_info'] = {'enforced': enforce_schedule, 'schedule_id': schedule_id}
+    else:
+        res['vessel_info'] = {'enforced': False, 'schedule_id': None}
+    truck_count = res['alokasi_truk']
+    res['fuel_per_ton'] = res['total_bbm_liter'] / res['total_tonase'] if res['total_tonase'] > 0 else 999
+    res['cycle_time_hours'] = 8 / res['jumlah_siklus_selesai'] if res['jumlah_siklus_selesai'] > 0 else 999
+    res['production_per_truck'] = res['total_tonase'] / truck_count if truck_count > 0 else 0
+    return res
+
+# Metrik fisik yang cukup untuk menghitung ulang compute_profit_components
+PHYSICAL_RESULT_FIELDS = (
+    'total_tonase', 'total_bbm_liter', 'total_maintenance_cost', 'total_waktu_antri_jam',
+    'total_probabilitas_delay', 'jumlah_siklus_selesai', 'cycle_time_hours', 'distance_km'
+)
+SCENARIO_ID_FIELDS = ('alokasi_truk', 'jumlah_excavator', 'target_road_id', 'target_excavator_id', 'target_schedule_id')
+
+# Default .get() di compute_profit_components / calculate_shipment_risk
+REPRICE_PARAM_DEFAULTS = {
+    'BiayaAntrianPerJam': 100000,
+    'BiayaRataRataInsiden': 500000,
+    'BiayaPenaltiKeterlambatanKapal': 100000000,
+    'BiayaDemurragePerJam': 5000000,
+    'GajiOperatorRataRata': 5000000
+}
+
+def build_physical_record(results, fixed, vars, params, data, duration_hours=8):
+    """Hasil sweep -> record kolom (metrik fisik + status kapal) untuk PHYSICAL_STORE."""
+    columns = {f: [] for f in SCENARIO_ID_FIELDS + PHYSICAL_RESULT_FIELDS}
+    ship_late, ship_hours_late = [], []
+    for res in results:
+        for f in SCENARIO_ID_FIELDS:
+            columns[f].append(_json_safe(res.get(f)))
+        for f in PHYSICAL_RESULT_FIELDS:
+            columns[f].append(_to_float(res.get(f), 0.0))
+        ship = res.get('shipment_analysis') or {}
+        ship_late.append(ship.get('status') == 'LATE')
+        ship_hours_late.append(_to_float(ship.get('hours_late'), 0.0))
+    
+    salary = get_data_operator_salary(data)
+    return {
+        'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        'data_fingerprint': watermark_fingerprint(data),
+        'fixed': _json_safe(fixed),
+        'vars': _json_safe(vars),
+        'financial_params': _json_safe(params),
+        'target_production': _to_float(fixed.get('totalProductionTarget', 0), 0.0),
+        'duration_hours': duration_hours,
+        'data_operator_salary': None if salary is None else float(salary),
+        'ship_late': ship_late,
+        'ship_hours_late': ship_hours_late,
+        **columns
+    }
+
+def _select_strategy_indices(profit, record, cycle_order, distance_order):
+    """Seleksi 3 strategi (sama dengan get_strategic_recommendations) dari array profit satu titik harga."""
+    target_production = record['target_production']
+    if target_production > 0:
+        tonase = np.asarray(record['total_tonase'])
+        primary_order = np.lexsort((-profit, np.abs(tonase - target_production)))[:20]
+    else:
+        primary_order = np.argsort(-profit, kind='stable')[:20]
+    
+    seen = set()
+    selected = []
+    for order in (primary_order, cycle_order, distance_order):
+        pick = order[0] if len(order) else None
+        for i in order:
+            config_key = tuple(record[f][i] for f in SCENARIO_ID_FIELDS[:4])
+            if config_key not in seen:
+                seen.add(config_key)
+                pick = i
+                break
+        if pick is not None:
+            selected.append(int(pick))
+    return selected
+
+def reprice_physical_results(key, price_points, base_params=None, data=None, top_k=5):
+    """
+    Hitung ulang finansial & ranking hasil sweep tersimpan untuk banyak titik harga
+    sekaligus. compute_profit_components dievaluasi pada matriks (titik harga x skenario).
+
+    price_points: list dict override parameter finansial (mis. {'HargaSolar': 17000}).
+    Mengembalikan None jika belum ada hasil fisik untuk key.
+    """
+    start = time.perf_counter()
+    record = PHYSICAL_STORE.get(key)
+    if record is None:
+        return None
+    
+    base = dict(REPRICE_PARAM_DEFAULTS)
+    base.update(record.get('financial_params') or {})
+    base.update(base_params or {})
+    points = [dict(base, **(pp or {})) for pp in (price_points or [{}])]
+    
+    # Parameter per titik harga sebagai kolom (m, 1) agar broadcast ke (m, n)
+    P = {k: np.array([_to_float(pt.get(k), base.get(k, 0.0)) for pt in points], dtype=np.float64)[:, None]
+         for k in set().union(*points)
+         if all(isinstance(pt.get(k, 0), (int, float, np.number)) for pt in points)}
+    
+    col = {f: np.asarray(record[f], dtype=np.float64) for f in PHYSICAL_RESULT_FIELDS}
+    trucks = np.asarray(record['alokasi_truk'], dtype=np.float64)
+    excavators = np.asarray(record['jumlah_excavator'], dtype=np.float64)
+    late = np.asarray(record['ship_late'], dtype=bool)
+    hours_late = np.asarray(record['ship_hours_late'], dtype=np.float64)
+    
+    salary = record.get('data_operator_salary')
+    avg_salary = P['GajiOperatorRataRata'] if salary is None else salary
+    demurrage = np.where(late, P['BiayaPenaltiKeterlambatanKapal'] + hours_late * P['BiayaDemurragePerJam'], 0.0)
+    
+    fin = compute_profit_components(
+        col['total_tonase'], col['total_bbm_liter'], col['total_maintenance_cost'],
+        col['total_waktu_antri_jam'], col['total_probabilitas_delay'],
+        trucks, excavators, record['duration_hours'], avg_salary, demurrage, P
+    )
+    profit = fin['net_profit']
+    
+    # Ranking kecepatan & jarak tidak bergantung harga: cukup sekali
+    cycle_order = np.argsort(col['cycle_time_hours'], kind='stable')[:20]
+    distance_order = np.argsort(col['distance_km'], kind='stable')[:20]
+    objectives = [
+        f"Target Production ({record['target_production']} Ton)" if record['target_production'] > 0 else 'Maximum Profit',
+        'Fastest Cycle Time',
+        'Shortest Distance'
+    ]
+    
+    def scenario_summary(m, i):
+        summary = {f: record[f][i] for f in SCENARIO_ID_FIELDS}
+        summary.update({
+            'total_tonase': col['total_tonase'][i],
+            'cycle_time_hours': col['cycle_time_hours'][i],
+            'distance_km': col['distance_km'][i],
+            'Z_SCORE_PROFIT': profit[m, i],
+            'financial_breakdown': {
+                'revenue': fin['revenue'][m, i],
+                'fuel_cost': fin['fuel_cost'][m, i],
+                'maintenance_cost': col['total_maintenance_cost'][i],
+                'operator_cost': np.broadcast_to(fin['operator_cost'], profit.shape)[m, i],
+                'queue_cost': fin['queue_cost'][m, i],
+                'incident_risk_cost': fin['incident_risk_cost'][m, i],
+                'demurrage_cost': demurrage[m, i],
+                'total_cost': fin['total_cost'][m, i],
+                'net_profit': profit[m, i]
+            }
+        })
+        return summary
+    
+    grid = []
+    for m, pt in enumerate(points):
+        strategies = []
+        for rank, i in enumerate(_select_strategy_indices(profit[m], record, cycle_order, distance_order), 1):
+            strat = scenario_summary(m, i)
+            strat['rank'] = rank
+            strat['strategy_objective'] = objectives[rank - 1]
+            strategies.append(strat)
+        top = np.argsort(-profit[m], kind='stable')[:top_k]
+        grid.append({
+            'financial_params': pt,
+            'strategies': strategies,
+            'top_by_profit': [scenario_summary(m, i) for i in top],
+            'profit_max': profit[m].max() if profit.shape[1] else 0.0,
+            'profit_mean': profit[m].mean() if profit.shape[1] else 0.0
+        })
+    
+    current = watermark_fingerprint(data) if data is not None else None
+    return _json_safe({
+        'physical_key': key,
+        'created_at': record['created_at'],
+        'scenarios': len(record['total_tonase']),
+        'price_points': len(points),
+        'data_changed': current is not None and record.get('data_fingerprint') not in (None, current),
+        'grid': grid,
+        'elapsed_ms': (time.perf_counter() - start) * 1000
+    })
+
+def get_data_version(data):
+    """Versi data bundle: sidik jari watermark snapshot, atau hash isi tabel (dihitung sekali)."""
+    derived = data.setdefault('derived', {})
+    if 'data_version' not in derived:
+        derived['data_version'] = watermark_fingerprint(data) or str(data_fingerprint(data))
+    return derived['data_version']
+
+def simulate_physics_batch(scenarios, data, calibrated_params, workers=1, duration_hours=8, engine=None, replication=0, seed=None, progress=None):
+    """
+    Simulasi fisik semua skenario dengan SCENARIO_CACHE: skenario yang sudah pernah
+    disimulasikan (versi data/kalibrasi/model sama) diambil dari cache, duplikat
+    dalam batch hanya disimulasikan sekali.
+
+    Semua skenario dalam batch memakai stream acak per truk yang sama (seed, replication)
+    -> common random numbers; replication > 0 memberi replikasi independen.
+    seed None = CRN_SEED.
+
+    progress (SweepProgress, opsional) diberi tahu setiap skenario selesai (termasuk
+    hit cache) dan dicek sebelum setiap simulasi -> SweepCancelled jika dibatalkan.
+
+    Returns:
+        (physics, prediction_cache_stats, scenario_cache_stats) - physics berurutan sama seperti scenarios
+    """
+    ensure_ml_models()
+    engine = engine or SIM_ENGINE
+    versions = versions_digest(get_data_version(data), versions_digest(calibrated_params), MODEL_VERSION)
+    stream_seed = (CRN_SEED if seed is None else int(seed), int(replication))
+    keys = [scenario_cache_key(f"{scenario_hash(sc, duration_hours)}s{stream_seed[0]}r{stream_seed[1]}", versions)
+            for sc in scenarios]
+    
+    physics = [None] * len(scenarios)
+    pending = {}
+    hits = duplicates = 0
+    for i, key in enumerate(keys):
+        if key in pending:
+            duplicates += 1
+            continue
+        cached = SCENARIO_CACHE.get(key)
+        if cached is not None:
+            physics[i] = cached
+            hits += 1
+        else:
+            pending[key] = i
+    
+    if progress is not None:
+        progress.add_total(len(scenarios))
+        for i, ph in enumerate(physics):
+            if ph is not None:
+                progress.advance(scenarios[i], ph, duration_hours)
+        progress.check()
+    
+    todo = list(pending.values())
+    if workers > 1 and len(todo) > 1:
+        computed, cache_stats = run_parallel_sweep(
+            [scenarios[i] for i in todo], data, calibrated_params, stream_seed, workers,
+            cache_size=PREDICTION_CACHE_SIZE, duration_hours=duration_hours,
+            data_key=data.get('snapshot', {}).get('version'), engine=engine, progress=progress
+        )
+    else:
+        # Cache prediksi ML dipakai bersama oleh semua skenario dalam batch ini
+        prediction_cache = PredictionCache(maxsize=PREDICTION_CACHE_SIZE)
+        computed = []
+        if engine == 'lockstep':
+            # Engine lockstep: satu panggilan untuk banyak skenario (progress per batch)
+            for start in range(0, len(todo), LOCKSTEP_BATCH_SIZE):
+                chunk = todo[start:start + LOCKSTEP_BATCH_SIZE]
+                if progress is not None:
+                    progress.check()
+                batch = simulate_physics_lockstep([scenarios[i] for i in chunk], data, duration_hours,
+                                                  calibrated_params, prediction_cache, stream_seed)
+                computed.extend(batch)
+                if progress is not None:
+                    for i, result in zip(chunk, batch):
+                        progress.advance(scenarios[i], result, duration_hours)
+        else:
+            for i in todo:
+                if progress is not None:
+                    progress.check()
+                computed.append(simulate_scenario_physics(scenarios[i], data, duration_hours, calibrated_params,
+                                                          prediction_cache, engine, stream_seed))
+                if progress is not None:
+                    progress.advance(scenarios[i], computed[-1], duration_hours)
+        cache_stats = prediction_cache.stats()
+        cache_stats['workers'] = 1
+    
+    for i, result in zip(todo, computed):
+        physics[i] = result
+        if result is not None:
+            SCENARIO_CACHE.put(keys[i], result)
+    
+    first = {}
+    for i, key in enumerate(keys):
+        if physics[i] is None and key in first:
+            # Duplikat: salin hasil skenario pertama dengan kunci yang sama
+            physics[i] = copy.deepcopy(physics[first[key]])
+            if progress is not None:
+                progress.advance(scenarios[i], None, duration_hours)
+        first.setdefault(key, i)
+    
+    scenario_cache_stats = {
+        'hits': hits,
+        'duplicates': duplicates,
+        'simulated': len(todo),
+        'hit_rate': (hits + duplicates) / len(scenarios) if scenarios else 0.0,
+        'cache': SCENARIO_CACHE.stats()
+    }
+    return physics, cache_stats, scenario_cache_stats
+
+def run_scenario_sweep(scenarios, params, data, calibrated_params, workers=1, duration_hours=8, engine=None, seed=None, progress=None):
+    """
+    simulate_physics_batch lalu finansial dihitung dengan `params`.
+
+    Returns:
+        (results, prediction_cache_stats, scenario_cache_stats)
+    """
+    physics, cache_stats, scenario_cache_stats = simulate_physics_batch(
+        scenarios, data, calibrated_params, workers, duration_hours, engine, seed=seed, progress=progress
+    )
+    results = [finalize_physics(dict(sc), phys, params, data) for sc, phys in zip(scenarios, physics)]
+    return results, cache_stats, scenario_cache_stats
+
+def average_physics(replicas):
+    """Rata-rata metrik fisik beberapa replikasi skenario yang sama (None jika ada replikasi kosong)."""
+    if not replicas or any(r is None for r in replicas):
+        return None
+    avg = copy.deepcopy(replicas[0])
+    for key in avg['metrics']:
+        avg['metrics'][key] = float(np.mean([r['metrics'][key] for r in replicas]))
+    avg['replications'] = len(replicas)
+    return avg
+
+# Metrik yang dilaporkan dengan interval kepercayaan pada mode replikasi
+REPLICATION_FIELDS = ('total_tonase', 'total_bbm_liter', 'total_waktu_antri_jam', 'Z_SCORE_PROFIT')
+
+def replicated_sweep(scenarios, params, data, calibrated_params, target_production, workers=1, duration_hours=8,
+                     engine=None, min_reps=REPLICATION_MIN, max_reps=5, precision=REPLICATION_PRECISION,
+                     confidence=REPLICATION_CONFIDENCE, top_k=5, seed=None, progress=None):
+    """
+    Sweep dengan replikasi Monte Carlo sekuensial (ReplicationManager): replikasi
+    ke-r memakai seed/cache key tersendiri (simulate_physics_batch replication=r),
+    dan skenario berhenti direplikasi begitu CI objektifnya (profit atau selisih
+    ke target, dan cycle time) cukup sempit atau jelas di luar top_k.
+    
+    Hasil per skenario difinalisasi dari rata-rata metrik fisik semua replikasinya
+    dan diberi ringkasan 'replication' (mean + CI tonase, BBM, antrian, profit).
+
+    Returns:
+        (results, prediction_cache_stats, scenario_cache_stats, replication_report)
+    """
+    replica_physics = [[] for _ in scenarios]
+    cache_totals = {'hits': 0, 'misses': 0}
+    scenario_totals = {'hits': 0, 'duplicates': 0, 'simulated': 0}
+    
+    def simulate(indices, rep):
+        physics, cache_stats, sc_stats = simulate_physics_batch(
+            [scenarios[i] for i in indices], data, calibrated_params, workers, duration_hours, engine,
+            replication=rep, seed=seed, progress=progress
+        )
+        _merge_cache_stats(cache_totals, cache_stats)
+        for key in scenario_totals:
+            scenario_totals[key] += sc_stats[key]
+        samples = []
+        for i, ph in zip(indices, physics):
+            if ph is None:
+                samples.append(None)
+                continue
+            replica_physics[i].append(ph)
+            res = finalize_physics(dict(scenarios[i]), copy.deepcopy(ph), params, data)
+            siklus = res['jumlah_siklus_selesai']
+            sample = {field: float(res[field]) for field in REPLICATION_FIELDS}
+            sample['objective'] = -abs(res['total_tonase'] - target_production) if target_production > 0 else res['Z_SCORE_PROFIT']
+            sample['neg_cycle_time'] = -(duration_hours / siklus) if siklus > 0 else -999.0
+            samples.append(sample)
+        return samples
+    
+    manager = ReplicationManager(
+        simulate, ('objective', 'neg_cycle_time'), min_reps=min_reps, max_reps=max_reps,
+        precision=precision, confidence=confidence, top_k=top_k,
+        scales={'objective': target_production} if target_production > 0 else None
+    )
+    _, stats, report = manager.run(len(scenarios))
+    
+    results = []
+    for sc, replicas, st in zip(scenarios, replica_physics, stats):
+        res = finalize_physics(dict(sc), average_physics(replicas), params, data)
+        if st is not None:
+            res['replication'] = {'n': st['objective']['n'], 'confidence': confidence}
+            res['replication'].update({field: st[field] for field in REPLICATION_FIELDS})
+        results.append(res)
+    
+    total = scenario_totals['hits'] + scenario_totals['duplicates'] + scenario_totals['simulated']
+    scenario_totals['hit_rate'] = ((scenario_totals['hits'] + scenario_totals['duplicates']) / total) if total > 0 else 0.0
+    scenario_totals['cache'] = SCENARIO_CACHE.stats()
+    return results, cache_totals, scenario_totals, report
+
+def _merge_cache_stats(total, stats):
+    for key in ('hits', 'misses'):
+        total[key] = total.get(key, 0) + stats.get(key, 0)
+    n = total['hits'] + total['misses']
+    total['hit_rate'] = (total['hits'] / n) if n > 0 else 0.0
+    total['workers'] = stats.get('workers', 1)
+    return total
+
+def successive_halving_sweep(scenarios, params, data, calibrated_params, target_production, workers=1,
+                             full_hours=8, min_hours=1.0, eta=3, replications=2, min_finalists=10, engine=None, seed=None,
+                             progress=None):
+    """
+    Pencarian multi-fidelity: semua kandidat disimulasikan dengan horizon pendek
+    (min_hours), 1/eta terbaik per objektif naik ke horizon eta kali lebih panjang,
+    sampai finalis disimulasikan penuh (full_hours) dengan maksimal `replications`
+    replikasi (replicated_sweep, berhenti lebih awal jika CI sudah sempit).
+
+    Objektif yang dipakai sama dengan seleksi top-3: profit (atau kedekatan produksi
+    ke target, diskalakan ke full_hours), cycle time, dan jarak rute (statis, kandidat
+    terdekat selalu dipromosikan).
+
+    Returns:
+        (finalist_results, prediction_cache_stats, scenario_cache_stats, search_report)
+    """
+    horizons = []
+    h = float(min_hours)
+    while h < full_hours:
+        horizons.append(h)
+        h *= eta
+    horizons.append(float(full_hours))
+    
+    distances = []
+    for sc in scenarios:
+        try: distances.append(float(data['roads'].loc[sc['target_road_id']]['distance']))
+        except: distances.append(float('inf'))
+    
+    candidates = list(range(len(scenarios)))
+    cache_totals = {'hits': 0, 'misses': 0}
+    scenario_totals = {'hits': 0, 'duplicates': 0, 'simulated': 0}
+    rungs = []
+    finalists = []
+    
+    for rung, horizon in enumerate(horizons):
+        is_final = rung == len(horizons) - 1
+        reps = max(1, int(replications)) if is_final else 1
+        subset = [scenarios[i] for i in candidates]
+        start = time.perf_counter()
+        replication_report = None
+        if reps > 1:
+            # Finalis: replikasi sekuensial, berhenti per skenario begitu CI cukup sempit
+            results, cache_stats, sc_stats, replication_report = replicated_sweep(
+                subset, params, data, calibrated_params, target_production, workers, horizon, engine,
+                min_reps=min(REPLICATION_MIN, reps), max_reps=reps, seed=seed, progress=progress
+            )
+            total_runs = replication_report['total_replications']
+        else:
+            physics, cache_stats, sc_stats = simulate_physics_batch(subset, data, calibrated_params, workers, horizon, engine,
+                                                                    seed=seed, progress=progress)
+            results = [finalize_physics(dict(sc), ph, params, data) for sc, ph in zip(subset, physics)]
+            total_runs = len(candidates)
+        _merge_cache_stats(cache_totals, cache_stats)
+        for key in scenario_totals:
+            scenario_totals[key] += sc_stats[key]
+        
+        rungs.append({
+            'rung': rung,
+            'horizon_hours': horizon,
+            'candidates': len(candidates),
+            'replications': total_runs / len(candidates) if candidates else 0,
+            'simulated_hours': total_runs * horizon,
+            'seconds': round(time.perf_counter() - start, 3)
+        })
+        if replication_report:
+            rungs[-1]['replication'] = replication_report
+        if is_final:
+            finalists = results
+            break
+        
+        # Promosi: top 1/eta per objektif (gabungan), minimal min_finalists
+        keep = max(int(min_finalists), int(np.ceil(len(candidates) / eta)))
+        profit = np.array([_to_float(r.get('Z_SCORE_PROFIT'), -np.inf) for r in results])
+        cycles = np.array([_to_float(r.get('jumlah_siklus_selesai'), 0.0) for r in results])
+        cycle_time = np.where(cycles > 0, horizon / np.maximum(cycles, 1e-12), np.inf)
+        if target_production > 0:
+            tonase_full = np.array([_to_float(r.get('total_tonase'), 0.0) for r in results]) * (full_hours / horizon)
+            primary_order = np.lexsort((-profit, np.abs(tonase_full - target_production)))
+        else:
+            primary_order = np.argsort(-profit, kind='stable')
+        promoted = set(primary_order[:keep].tolist())
+        promoted.update(np.argsort(cycle_time, kind='stable')[:keep].tolist())
+        promoted.update(np.argsort([distances[i] for i in candidates], kind='stable')[:max(3, keep // eta)].tolist())
+        candidates = [candidates[j] for j in sorted(promoted)]
+    
+    exhaustive_hours = len(scenarios) * float(full_hours)
+    total_hours = sum(r['simulated_hours'] for r in rungs)
+    search_report = {
+        'mode': 'successive_halving',
+        'eta': eta,
+        'rungs': rungs,
+        'finalists': len(finalists),
+        'simulated_hours': total_hours,
+        'exhaustive_hours': exhaustive_hours,
+        'compute_fraction': (total_hours / exhaustive_hours) if exhaustive_hours > 0 else 0.0
+    }
+    scenario_totals['hit_rate'] = 0.0
+    total = scenario_totals['hits'] + scenario_totals['duplicates'] + scenario_totals['simulated']
+    if total > 0:
+        scenario_totals['hit_rate'] = (scenario_totals['hits'] + scenario_totals['duplicates']) / total
+    scenario_totals['cache'] = SCENARIO_CACHE.stats()
+    return finalists, cache_totals, scenario_totals, search_report
+
+def select_top_strategies(results, target_production=0.0):
+    """
+    Ranking multi-objective: strategi 1 target produksi (atau profit maksimum),
+    strategi 2 cycle time tercepat, strategi 3 jarak terpendek, tanpa konfigurasi
+    yang sama. Menulis 'rank' dan 'strategy_objective' ke hasil yang terpilih.
+    """
+    # Strategy 1: Target Production (if specified) or Max Profit
+    if target_production > 0:
+        # Filter for scenarios that meet at least 80% of target (relaxed constraint)
+        # candidates = [r for r in results if r['total_tonase'] >= target_production * 0.8]
+        # if not candidates: candidates = results
+        
+        # STRICTER LOGIC: We want the closest match, period.
+        # Sort by absolute difference from target (closest first), then by profit
+        strategy_1_target = sorted(results, key=lambda x: (abs(x['total_tonase'] - target_production), -x['Z_SCORE_PROFIT']))[:20]
+        strategy_1_label = f'Target Production ({target_production} Ton)'
+    else:
+        strategy_1_target = sorted(results, key=lambda x: x['Z_SCORE_PROFIT'], reverse=True)[:20]
+        strategy_1_label = 'Maximum Profit'
+    
+    strategy_2_speed = sorted(results, key=lambda x: x['cycle_time_hours'])[:20]
+    
+    strategy_3_distance = sorted(results, key=lambda x: x['distance_km'])[:20]
+    
+    def get_unique_strategy(pool, excluded_configs):
+        for candidate in pool:
+            config_key = (
+                candidate['alokasi_truk'],
+                candidate['jumlah_excavator'],
+                candidate['target_road_id'],
+                candidate['target_excavator_id']
+            )
+            if config_key not in excluded_configs:
+                excluded_configs.add(config_key)
+                return candidate
+        return pool[0] if pool else None
+    
+    seen = set()
+    
+    best_primary = get_unique_strategy(strategy_1_target, seen)
+    best_speed = get_unique_strategy(strategy_2_speed, seen)
+    best_distance = get_unique_strategy(strategy_3_distance, seen)
+    
+    final_strategies = [best_primary, best_speed, best_distance]
+    final_strategies = [s for s in final_strategies if s is not None]
+    
+    for i, strat in enumerate(final_strategies, 1):
+        strat['rank'] = i
+        if i == 1:
+            strat['strategy_objective'] = strategy_1_label
+        elif i == 2:
+            strat['strategy_objective'] = 'Fastest Cycle Time'
+        else:
+            strat['strategy_objective'] = 'Shortest Distance'
+    
+    return final_strategies
+
+def get_strategic_recommendations(fixed, vars, params, options=None, data=None):
     print(f"\n--- [Multi-Objective Optimization Engine] ---")
     
-    data = load_fresh_data()
+    options = options or {}
+    screening_mode = options.get('screening_mode') or 'none'
+    search_mode = options.get('search_mode') or 'exhaustive'
+    if search_mode == 'metamodel' and load_metamodel() is None:
+        print("   ⚠️ Metamodel belum tersedia (jalankan metamodel.run_nightly_metamodel), memakai sweep biasa")
+        search_mode = 'exhaustive'
+    
+    data = data if data is not None else get_data_snapshot()
     calibrated_params = calibrate_simulation_parameters(data)
     
     # Use dynamic financial params if not provided by user
@@ -1235,23 +3012,29 @@ def get_strategic_recommendations(fixed, vars, params):
     
     import random
     
-    hash_seed = hash((user_weather, user_road_cond, min_trucks, max_trucks, min_excavators, max_excavators, target_road, target_excavator, str(pd.Timestamp.now())))
-    random.seed(hash_seed)
-    np.random.seed(abs(hash_seed) % (2**32))
+    seed = options.get('seed')
+    if seed is not None:
+        # Seed eksplisit: sampling kandidat & stream acak simulasi reproducible (hasil identik bit per bit)
+        seed = _to_int(seed, 0)
+        hash_seed = int(versions_digest(seed, user_weather, user_road_cond, min_trucks, max_trucks, min_excavators, max_excavators, target_road, target_excavator), 16)
+    else:
+        hash_seed = hash((user_weather, user_road_cond, min_trucks, max_trucks, min_excavators, max_excavators, target_road, target_excavator, str(pd.Timestamp.now())))
+    # RNG lokal per request: sweep konkuren (job/stream thread) tidak saling mengganggu urutan sampling
+    rng = random.Random(hash_seed)
     
     num_road_samples = min(30, len(all_roads))
     num_exc_samples = min(20, len(all_excavators))
     num_schedule_samples = min(10, len(all_schedules))
     
-    sample_roads = random.sample(all_roads, num_road_samples)
+    sample_roads = rng.sample(all_roads, num_road_samples)
     if target_road and target_road in all_roads and target_road not in sample_roads:
         sample_roads[0] = target_road
     
-    sample_excavators = random.sample(all_excavators, num_exc_samples)
+    sample_excavators = rng.sample(all_excavators, num_exc_samples)
     if target_excavator and target_excavator in all_excavators and target_excavator not in sample_excavators:
         sample_excavators[0] = target_excavator
     
-    sample_schedules = random.sample(all_schedules, num_schedule_samples)
+    sample_schedules = rng.sample(all_schedules, num_schedule_samples)
     if target_schedule and target_schedule in all_schedules and target_schedule not in sample_schedules:
         sample_schedules[0] = target_schedule
     
@@ -1352,134 +3135,167 @@ def get_strategic_recommendations(fixed, vars, params):
         truck_configs.append(max_trucks)
     
     excavator_configs = list(range(min_excavators, max_excavators + 1))
+    # Ruang pencarian integer penuh untuk mode surrogate (grid truck_configs + rentang user)
+    truck_range = list(range(max(1, min(truck_configs + [min_trucks])), max(truck_configs + [max_trucks]) + 1))
     
     print(f"   > Sampling: {len(sample_roads)} roads, {len(sample_excavators)} excavators")
     print(f"   > Configurations: {len(truck_configs)} truck options, {len(excavator_configs)} excavator options")
     
-    print(f"\n   🔬 Running ML-based simulations for multi-objective optimization...")
-    
-    results = []
     max_scenarios = 300
-    scenario_count = 0
     
-    for truck_count in truck_configs:
-        for exc_count in excavator_configs:
-            if scenario_count >= max_scenarios:
-                break
-            
-            combinations_per_config = min(5, len(sample_roads), len(sample_excavators))
-            
-            for _ in range(combinations_per_config):
-                road_id = random.choice(sample_roads)
-                excavator_id = random.choice(sample_excavators)
-                
-                # ENFORCE: Use target_schedule if user selected one, otherwise random
-                if enforce_schedule and target_schedule:
-                    schedule_id = target_schedule
-                else:
-                    schedule_id = random.choice(sample_schedules)
-                
-                scenario = {
-                    'weatherCondition': user_weather,
-                    'roadCondition': user_road_cond,
-                    'shift': user_shift,
-                    'target_road_id': road_id,
-                    'target_excavator_id': excavator_id,
-                    'target_schedule_id': schedule_id,
-                    'simulation_start_date': fixed.get('simulation_start_date'),
-                    'alokasi_truk': truck_count,
-                    'jumlah_excavator': exc_count,
-                    'miningSiteId': fixed.get('miningSiteId'),
-                }
-                
-                res = run_hybrid_simulation(scenario, params, data, duration_hours=8, calibrated_params=calibrated_params)
-                
-                road_data = data['roads'].loc[road_id]
-                road_distance = road_data['distance']
+    screening_report = None
+    if search_mode in ('surrogate', 'metamodel'):
+        scenarios = []  # dibangkitkan oleh surrogate_search_sweep / metamodel_sweep
+        if screening_mode == 'analytic':
+            # Kandidat dipilih oleh surrogate/metamodel sendiri, screening analitik tidak dipakai
+            print(f"   ⚠️ screening_mode='analytic' diabaikan untuk search_mode='{search_mode}'")
+            screening_report = 'ignored'
+    elif screening_mode == 'analytic':
+        scenarios, screening_report = screen_scenarios_analytic(
+            fixed, truck_configs, excavator_configs, sample_roads, sample_excavators, sample_schedules,
+            enforce_schedule, target_schedule, target_production, params, data, calibrated_params,
+            top_k=_to_int(options.get('screening_top_k', 30), 30),
+            max_candidates=_to_int(options.get('screening_max_candidates', 20000), 20000),
+            max_scenarios=max_scenarios, rng=rng
+        )
+    else:
+        scenarios = []
+        for truck_count in truck_configs:
+            for exc_count in excavator_configs:
+                if len(scenarios) >= max_scenarios:
+                    break
                 
-                res['distance_km'] = road_distance
+                combinations_per_config = min(5, len(sample_roads), len(sample_excavators))
                 
-                # Add vessel info to result for frontend display
-                if schedule_id and not data['schedules'].empty and schedule_id in data['schedules'].index:
-                    schedule_row = data['schedules'].loc[schedule_id]
-                    vessel_id = schedule_row.get('vesselId')
-                    if vessel_id and not data['vessels'].empty and vessel_id in data['vessels'].index:
-                        vessel_row = data['vessels'].loc[vessel_id]
-                        res['vessel_info'] = {
-                            'id': vessel_id,
-                            'name': vessel_row.get('name', 'Unknown'),
-                            'capacity': vessel_row.get('capacity', 0),
-                            'etsLoading': str(schedule_row.get('etsLoading', '')),
-                            'plannedQuantity': schedule_row.get('plannedQuantity', 0),
-                            'status': schedule_row.get('status', 'UNKNOWN'),
-                            'enforced': enforce_schedule
-                        }
+                for _ in range(combinations_per_config):
+                    road_id = rng.choice(sample_roads)
+                    excavator_id = rng.choice(sample_excavators)
+                    
+                    # ENFORCE: Use target_schedule if user selected one, otherwise random
+                    if enforce_schedule and target_schedule:
+                        schedule_id = target_schedule
                     else:
-                        res['vessel_info'] = {'enforced': enforce_schedule, 'schedule_id': schedule_id}
-                else:
-                    res['vessel_info'] = {'enforced': False, 'schedule_id': None}
-                res['fuel_per_ton'] = res['total_bbm_liter'] / res['total_tonase'] if res['total_tonase'] > 0 else 999
-                res['cycle_time_hours'] = 8 / res['jumlah_siklus_selesai'] if res['jumlah_siklus_selesai'] > 0 else 999
-                res['production_per_truck'] = res['total_tonase'] / truck_count if truck_count > 0 else 0
-                
-                results.append(res)
-                scenario_count += 1
-        
-        if scenario_count >= max_scenarios:
-            break
-    
-    print(f"   ✅ Generated {len(results)} scenarios via ML predictions")
+                        schedule_id = rng.choice(sample_schedules)
+                    
+                    scenarios.append(_build_sweep_scenario(fixed, truck_count, exc_count, road_id, excavator_id, schedule_id))
+            
+            if len(scenarios) >= max_scenarios:
+                break
     
-    print(f"\n   📊 Applying Multi-Objective Ranking...")
+    print(f"\n   🔬 Running ML-based simulations for multi-objective optimization...")
     
-    # Strategy 1: Target Production (if specified) or Max Profit
-    if target_production > 0:
-        # Filter for scenarios that meet at least 80% of target (relaxed constraint)
-        # candidates = [r for r in results if r['total_tonase'] >= target_production * 0.8]
-        # if not candidates: candidates = results
-        
-        # STRICTER LOGIC: We want the closest match, period.
-        # Sort by absolute difference from target (closest first), then by profit
-        strategy_1_target = sorted(results, key=lambda x: (abs(x['total_tonase'] - target_production), -x['Z_SCORE_PROFIT']))[:20]
-        strategy_1_label = f'Target Production ({target_production} Ton)'
+    # Progress streaming (endpoint /stream): hasil 8 jam difinalisasi untuk best/top-3 sementara
+    progress = options.get('progress')
+    if progress is not None:
+        progress.bind(
+            lambda sc, ph: _enrich_sweep_result(finalize_physics(dict(sc), copy.deepcopy(ph), params, data), data, enforce_schedule),
+            lambda res: select_top_strategies(res, target_production),
+            target_production
+        )
+        if search_mode == 'surrogate':
+            progress.plan(_to_int(options.get('surrogate_budget', 40), 40))
+        elif search_mode == 'metamodel':
+            progress.plan(_to_int(options.get('metamodel_verify_top', 3), 3))
+        else:
+            progress.plan(len(scenarios))
+        progress.step("simulating", f"Menjalankan simulasi ({search_mode})", search_mode=search_mode, scenarios=len(scenarios))
+    
+    # Stream acak per truk dari (seed, replikasi), sama untuk semua skenario (common random
+    # numbers): hasil identik berapapun jumlah worker, dan hasil SCENARIO_CACHE sama dengan simulasi ulang
+    workers = max(1, _to_int(options.get('workers') or SWEEP_WORKERS, 1))
+    search_report = None
+    replication_report = None
+    max_replications = max(1, _to_int(options.get('replications', 1), 1))
+    if search_mode == 'metamodel':
+        raw_results, cache_stats, scenario_cache_stats, search_report = metamodel_sweep(
+            fixed, truck_range, excavator_configs, sample_roads, sample_excavators, sample_schedules,
+            enforce_schedule, target_schedule, target_production, params, data, calibrated_params, workers,
+            verify_top=max(0, _to_int(options.get('metamodel_verify_top', 3), 3)),
+            engine=options.get('engine'), rng=rng, seed=seed, progress=progress
+        )
+        print(f"   > Metamodel: {search_report['candidates']} kandidat diranking dalam "
+              f"{search_report['ranking_time_ms']:.1f} ms, {search_report['verified']} diverifikasi simulasi")
+        for field, err in search_report['metamodel_error'].items():
+            print(f"   > Error metamodel {field}: MAE={err['mae']:.2f} ({err['mape_pct']:.1f}%)")
+    elif search_mode == 'surrogate':
+        raw_results, cache_stats, scenario_cache_stats, search_report = surrogate_search_sweep(
+            fixed, truck_range, excavator_configs, sample_roads, sample_excavators, sample_schedules,
+            enforce_schedule, target_schedule, target_production, params, data, calibrated_params, workers,
+            budget=max(1, _to_int(options.get('surrogate_budget', 40), 40)),
+            n_init=max(1, _to_int(options.get('surrogate_init', 12), 12)),
+            batch_size=max(1, _to_int(options.get('surrogate_batch', 4), 4)),
+            engine=options.get('engine'), rng=rng, seed=seed, progress=progress
+        )
+        print(f"   > Surrogate search: {search_report['evaluations']} simulasi dari {search_report['candidates']} kandidat "
+              f"({search_report['search_time_sec']:.2f}s)")
+    elif search_mode == 'successive_halving':
+        raw_results, cache_stats, scenario_cache_stats, search_report = successive_halving_sweep(
+            scenarios, params, data, calibrated_params, target_production, workers, full_hours=8,
+            min_hours=_to_float(options.get('sh_min_hours', 1.0), 1.0),
+            eta=max(2, _to_int(options.get('sh_eta', 3), 3)),
+            replications=max(1, _to_int(options.get('sh_replications', 2), 2)),
+            engine=options.get('engine'), seed=seed, progress=progress
+        )
+        for rung in search_report['rungs']:
+            print(f"   > Rung {rung['rung']}: {rung['candidates']} kandidat x {rung['horizon_hours']:g} jam x "
+                  f"{rung['replications']:.1f} replikasi ({rung['seconds']:.2f}s)")
+        print(f"   > Successive halving: {search_report['simulated_hours']:.0f} jam simulasi "
+              f"({search_report['compute_fraction']*100:.0f}% dari sweep penuh)")
+    elif max_replications > 1:
+        raw_results, cache_stats, scenario_cache_stats, replication_report = replicated_sweep(
+            scenarios, params, data, calibrated_params, target_production, workers, 8, options.get('engine'),
+            min_reps=min(max_replications, max(2, _to_int(options.get('replication_min', REPLICATION_MIN), REPLICATION_MIN))),
+            max_reps=max_replications,
+            precision=_to_float(options.get('replication_precision', REPLICATION_PRECISION), REPLICATION_PRECISION),
+            confidence=_to_float(options.get('replication_confidence', REPLICATION_CONFIDENCE), REPLICATION_CONFIDENCE),
+            top_k=max(1, _to_int(options.get('replication_top_k', 5), 5)), seed=seed, progress=progress
+        )
+        print(f"   > Replikasi: {replication_report['total_replications']} run untuk {len(scenarios)} skenario "
+              f"(maks {replication_report['full_budget_replications']}), berhenti: {replication_report['stopped']}")
     else:
-        strategy_1_target = sorted(results, key=lambda x: x['Z_SCORE_PROFIT'], reverse=True)[:20]
-        strategy_1_label = 'Maximum Profit'
-    
-    strategy_2_speed = sorted(results, key=lambda x: x['cycle_time_hours'])[:20]
+        raw_results, cache_stats, scenario_cache_stats = run_scenario_sweep(
+            scenarios, params, data, calibrated_params, workers, duration_hours=8,
+            engine=options.get('engine'), seed=seed, progress=progress
+        )
     
-    strategy_3_distance = sorted(results, key=lambda x: x['distance_km'])[:20]
+    results = [_enrich_sweep_result(res, data, enforce_schedule) for res in raw_results]
     
-    def get_unique_strategy(pool, excluded_configs):
-        for candidate in pool:
-            config_key = (
-                candidate['alokasi_truk'],
-                candidate['jumlah_excavator'],
-                candidate['target_road_id'],
-                candidate['target_excavator_id']
-            )
-            if config_key not in excluded_configs:
-                excluded_configs.add(config_key)
-                return candidate
-        return pool[0] if pool else None
+    print(f"   ✅ Generated {len(results)} scenarios via ML predictions ({workers} worker)")
+    print(f"   > Prediction cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']*100:.1f}% hit rate)")
+    print(f"   > Scenario cache: {scenario_cache_stats['hits']} hits, {scenario_cache_stats['duplicates']} duplikat, "
+          f"{scenario_cache_stats['simulated']} disimulasikan")
     
-    seen = set()
+    print(f"\n   📊 Applying Multi-Objective Ranking...")
+    if progress is not None:
+        progress.finish()
+        progress.step("ranking", "Ranking multi-objective")
     
-    best_primary = get_unique_strategy(strategy_1_target, seen)
-    best_speed = get_unique_strategy(strategy_2_speed, seen)
-    best_distance = get_unique_strategy(strategy_3_distance, seen)
+    final_strategies = select_top_strategies(results, target_production)
     
-    final_strategies = [best_primary, best_speed, best_distance]
-    final_strategies = [s for s in final_strategies if s is not None]
+    # Simpan hasil fisik untuk re-pricing (endpoint /reprice_strategies)
+    physical_key = condition_key(fixed, vars)
+    PHYSICAL_STORE.put(physical_key, build_physical_record(results, fixed, vars, params, data, duration_hours=8))
     
-    for i, strat in enumerate(final_strategies, 1):
-        strat['rank'] = i
-        if i == 1:
-            strat['strategy_objective'] = strategy_1_label
-        elif i == 2:
-            strat['strategy_objective'] = 'Fastest Cycle Time'
-        else:
-            strat['strategy_objective'] = 'Shortest Distance'
+    sweep_report = {
+        'scenarios_evaluated': len(scenarios) or len(results),
+        'prediction_cache': cache_stats,
+        'scenario_cache': scenario_cache_stats,
+        'physical_key': physical_key
+    }
+    if screening_report:
+        sweep_report['screening'] = screening_report
+    if search_report:
+        sweep_report['search'] = search_report
+    if replication_report:
+        sweep_report['replication'] = replication_report
+    for strat in final_strategies:
+        strat['sweep_report'] = sweep_report
+    if options.get('record_events'):
+        attach_cycle_breakdown(final_strategies[:3], data, calibrated_params, seed=seed, engine=options.get('engine'))
+    # Sweep memakai ekstrapolasi 8 jam (demurrage hanya bergantung pada status LATE, jadi ranking sama);
+    # kesiapan kapal strategi final dihitung ulang dengan simulasi shift berurutan sampai ETS
+    refresh_shipment_analysis(final_strategies[:3], params, data, calibrated_params, seed=seed)
     
     print(f"   ✅ Selected 3 strategies with different objectives:")
     for i, strat in enumerate(final_strategies, 1):
@@ -1525,7 +3341,8 @@ def analyze_hauling_for_production(fixed, data):
         print("   ⚠️ No hauling activities found in database")
         return {"status": "NO_DATA", "hauling_activities": [], "aggregated": {}}
     
-    # Ensure datetime columns
+    # Ensure datetime columns (copy: bundle snapshot dipakai bersama antar request)
+    hauling_df = hauling_df.copy()
     date_columns = ['loadingStartTime', 'loadingEndTime', 'dumpingStartTime', 'dumpingEndTime']
     for col in date_columns:
         if col in hauling_df.columns:
@@ -1774,7 +3591,7 @@ def analyze_hauling_for_production(fixed, data):
     return _json_safe(result)
 
 
-def get_hauling_based_recommendations(fixed, vars, params):
+def get_hauling_based_recommendations(fixed, vars, params, options=None, data=None):
     """
     Enhanced recommendation function that combines ML predictions with actual hauling data.
     Returns both simulated strategies AND matching hauling activities that can be used
@@ -1782,11 +3599,11 @@ def get_hauling_based_recommendations(fixed, vars, params):
     """
     print(f"\n--- [Hauling-Integrated Recommendation Engine] ---")
     
-    # Get fresh data
-    data = load_fresh_data()
+    # Snapshot data dipakai bersama dengan get_strategic_recommendations
+    data = data if data is not None else get_data_snapshot()
     
     # 1. Get ML-based strategic recommendations (existing logic)
-    strategies = get_strategic_recommendations(fixed, vars, params)
+    strategies = get_strategic_recommendations(fixed, vars, params, options, data)
     
     # 2. Analyze existing hauling activities
     hauling_analysis = analyze_hauling_for_production(fixed, data)
@@ -2023,7 +3840,7 @@ def generate_dynamic_hauling_allocation(strategy, data, fixed):
     return hauling_allocations
 
 
-def get_recommendations_with_allocations(fixed, vars, params):
+def get_recommendations_with_allocations(fixed, vars, params, options=None, data=None):
     """
     Enhanced recommendation function that returns strategies with pre-computed
     hauling activity allocations. This allows the frontend to directly create
@@ -2036,10 +3853,10 @@ def get_recommendations_with_allocations(fixed, vars, params):
     """
     print(f"\n--- [Recommendations with Dynamic Allocations] ---")
     
-    data = load_fresh_data()
+    data = data if data is not None else get_data_snapshot()
     
     # Get strategic recommendations
-    strategies = get_hauling_based_recommendations(fixed, vars, params)
+    strategies = get_hauling_based_recommendations(fixed, vars, params, options, data)
     
     # Enrich each strategy with dynamic hauling allocations
     for strategy in strategies:
@@ -2054,6 +3871,8 @@ def get_recommendations_with_allocations(fixed, vars, params):
 
 
 if __name__ == "__main__":
+    print("\n--- INITIALIZING SYSTEM (v3.1 - Dynamic Data) ---")
+    load_models()
     if LLM_PROVIDER:
         data = load_fresh_data()
         if not data['roads'].empty:
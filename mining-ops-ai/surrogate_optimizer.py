@@ -0,0 +1,124 @@
+import numpy as np
+from scipy.stats import norm
+from sklearn.ensemble import RandomForestRegressor
+
+# Jumlah pohon surrogate; variansi antar pohon dipakai sebagai ketidakpastian prediksi
+SURROGATE_TREES = 100
+
+
+def encode_candidates(candidates, road_features, road_ids, excavator_ids):
+    """
+    Matriks fitur kandidat (jumlah truk, jumlah excavator, rute, excavator).
+
+    Variabel integer dipakai apa adanya (plus rasio truk/excavator); rute diwakili
+    atribut numeriknya (jarak, gradient) dan one-hot, excavator one-hot. Pohon
+    keputusan menangani campuran integer dan kategori ini tanpa normalisasi.
+
+    Args:
+        candidates: list tuple (num_trucks, num_excavators, road_id, excavator_id).
+        road_features: dict road_id -> (distance, gradient).
+        road_ids, excavator_ids: daftar kategori untuk kolom one-hot.
+
+    Returns:
+        array float64 (C, F).
+    """
+    road_col = {r: i for i, r in enumerate(road_ids)}
+    exc_col = {e: i for i, e in enumerate(excavator_ids)}
+    n_base = 5
+    X = np.zeros((len(candidates), n_base + len(road_ids) + len(excavator_ids)), dtype=np.float64)
+    for i, (trucks, excavators, road_id, exc_id) in enumerate(candidates):
+        distance, gradient = road_features.get(road_id, (5.0, 0.0))
+        X[i, 0] = trucks
+        X[i, 1] = excavators
+        X[i, 2] = trucks / max(excavators, 1)
+        X[i, 3] = distance
+        X[i, 4] = gradient
+        if road_id in road_col:
+            X[i, n_base + road_col[road_id]] = 1.0
+        if exc_id in exc_col:
+            X[i, n_base + len(road_ids) + exc_col[exc_id]] = 1.0
+    return X
+
+
+def forest_mean_std(model, X):
+    """Prediksi rata-rata dan simpangan baku antar pohon random forest."""
+    per_tree = np.stack([tree.predict(X) for tree in model.estimators_])
+    return per_tree.mean(axis=0), per_tree.std(axis=0)
+
+
+def expected_improvement(mu, sigma, best, xi=0.01):
+    """
+    Expected improvement (maksimisasi) terhadap nilai terbaik saat ini.
+    xi relatif terhadap skala objektif agar eksplorasi tidak bergantung satuan.
+    """
+    sigma = np.maximum(sigma, 1e-12)
+    improvement = mu - best - xi * max(abs(best), 1.0)
+    z = improvement / sigma
+    return improvement * norm.cdf(z) + sigma * norm.pdf(z)
+
+
+def run_surrogate_search(X, evaluate, budget, n_init=12, batch_size=4, rng=None, initial=(), stop=None):
+    """
+    Optimasi berbasis surrogate di atas kumpulan kandidat diskrit.
+
+    Desain awal acak (n_init kandidat, ditambah indeks `initial`), lalu tiap
+    iterasi random forest di-fit ke kandidat yang sudah dievaluasi dan
+    batch_size kandidat dengan expected improvement tertinggi dievaluasi
+    berikutnya, sampai total evaluasi mencapai budget.
+
+    Args:
+        X: matriks fitur (C, F) dari encode_candidates.
+        evaluate: callable(list indeks) -> list nilai objektif (lebih besar lebih baik;
+            None jika simulasi gagal).
+        budget: maksimum jumlah kandidat yang dievaluasi.
+        stop: callable(best_value) -> True untuk berhenti lebih awal (mis. target tercapai).
+
+    Returns:
+        (evaluated_indices, values, history) - history berisi nilai terbaik per iterasi.
+    """
+    rng = rng or np.random.default_rng()
+    n = len(X)
+    budget = min(int(budget), n)
+    evaluated = []
+    values = []
+    history = []
+
+    def _run(indices):
+        for idx, value in zip(indices, evaluate(indices)):
+            evaluated.append(idx)
+            values.append(-np.inf if value is None else float(value))
+
+    init = list(dict.fromkeys(int(i) for i in initial))[:budget]
+    seeded = set(init)
+    remaining = [i for i in rng.permutation(n).tolist() if i not in seeded]
+    init += remaining[:max(0, min(n_init, budget) - len(init))]
+    _run(init)
+
+    while len(evaluated) < budget:
+        best = max(values)
+        history.append({'evaluations': len(evaluated), 'best': best})
+        if stop is not None and stop(best):
+            break
+
+        mask = np.ones(n, dtype=bool)
+        mask[evaluated] = False
+        pool = np.flatnonzero(mask)
+        if pool.size == 0:
+            break
+        take = min(batch_size, budget - len(evaluated), pool.size)
+
+        finite = np.isfinite(values)
+        if finite.sum() < 2:
+            # Belum cukup data untuk surrogate: lanjutkan sampling acak
+            _run(rng.choice(pool, take, replace=False).tolist())
+            continue
+        model = RandomForestRegressor(n_estimators=SURROGATE_TREES, min_samples_leaf=1,
+                                      random_state=int(rng.integers(2**31 - 1)))
+        model.fit(X[evaluated][finite], np.asarray(values)[finite])
+
+        mu, sigma = forest_mean_std(model, X[pool])
+        ei = expected_improvement(mu, sigma, best)
+        _run(pool[np.argsort(-ei, kind='stable')[:take]].tolist())
+
+    history.append({'evaluations': len(evaluated), 'best': max(values) if values else None})
+    return evaluated, values, history
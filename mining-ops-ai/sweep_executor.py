@@ -0,0 +1,208 @@
+import os
+import uuid
+import atexit
+import threading
+import multiprocessing as mp
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Jumlah worker default untuk sweep skenario (1 = serial di proses API)
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "1"))
+# 'spawn' aman untuk server multi-thread (uvicorn); 'fork' lebih cepat start di Linux
+SWEEP_MP_START = os.getenv("SWEEP_MP_START", "spawn")
+# Ukuran pool proses bersama (dibuat sekali); `workers` per request membatasi chunk yang berjalan bersamaan
+SWEEP_POOL_SIZE = int(os.getenv("SWEEP_POOL_SIZE", str(max(SWEEP_WORKERS, os.cpu_count() or 1))))
+
+_POOL = None
+_POOL_KEY = None
+_POOL_LOCK = threading.Lock()
+# Jumlah sweep yang sedang memakai tiap pool (id(pool) -> n); pool lama di-shutdown saat n = 0
+_POOL_USERS = {}
+
+# State per proses worker, diisi oleh _init_worker
+_WORKER = {}
+
+
+def data_fingerprint(data):
+    """Sidik jari murah dari bundle data, dipakai untuk menentukan apakah pool worker masih valid."""
+    parts = []
+    for key in sorted(data.keys()):
+        df = data[key]
+        if isinstance(df, pd.DataFrame):
+            try:
+                h = int(pd.util.hash_pandas_object(df, index=True).sum()) if not df.empty else 0
+            except Exception:
+                h = 0
+            parts.append((key, df.shape, h))
+    return hash(tuple(parts))
+
+
+def _init_worker(data, cache_size):
+    """Initializer pool: memuat model joblib dan snapshot data sekali per proses worker."""
+    import simulator
+    from prediction_cache import PredictionCache
+    simulator.ensure_ml_models()
+    _WORKER['data'] = data
+    _WORKER['cache'] = PredictionCache(maxsize=cache_size)
+    _WORKER['sweep_id'] = None
+
+
+def _sweep_cache(sweep_id):
+    cache = _WORKER['cache']
+    if _WORKER['sweep_id'] != sweep_id:
+        # Cache prediksi hanya dibagi di dalam satu sweep
+        cache.clear()
+        _WORKER['sweep_id'] = sweep_id
+    return cache
+
+
+def _run_task(task):
+    import simulator
+    sweep_id, index, scenario, calibrated_params, stream_seed, duration_hours, engine = task
+    cache = _sweep_cache(sweep_id)
+    hits_before, misses_before = cache.hits, cache.misses
+    physics = simulator.simulate_scenario_physics(
+        scenario, _WORKER['data'], duration_hours=duration_hours,
+        calibrated_params=calibrated_params, prediction_cache=cache, engine=engine, stream_seed=stream_seed
+    )
+    return index, physics, (cache.hits - hits_before, cache.misses - misses_before)
+
+
+def _run_lockstep_chunk(tasks):
+    """Satu chunk = satu batch simulate_physics_lockstep (statistik cache dicatat di task pertama)."""
+    import simulator
+    sweep_id, _, _, calibrated_params, stream_seed, duration_hours, _ = tasks[0]
+    cache = _sweep_cache(sweep_id)
+    hits_before, misses_before = cache.hits, cache.misses
+    physics = simulator.simulate_physics_lockstep(
+        [task[2] for task in tasks], _WORKER['data'], duration_hours=duration_hours,
+        calibrated_params=calibrated_params, prediction_cache=cache, stream_seed=stream_seed
+    )
+    stats = (cache.hits - hits_before, cache.misses - misses_before)
+    return [(task[1], result, stats if j == 0 else (0, 0)) for j, (task, result) in enumerate(zip(tasks, physics))]
+
+
+def _run_chunk(tasks):
+    if tasks and tasks[0][-1] == 'lockstep':
+        return _run_lockstep_chunk(tasks)
+    return [_run_task(task) for task in tasks]
+
+
+def acquire_pool(data, cache_size, data_key=None):
+    """
+    Pool proses yang tetap hangat selama snapshot data (data_key) tidak berubah.
+    Setiap acquire_pool harus dipasangkan dengan release_pool. Jika snapshot berubah,
+    pool lama dipensiunkan tanpa membatalkan chunk sweep lain yang masih memakainya.
+    """
+    global _POOL, _POOL_KEY
+    data_key = data_key if data_key is not None else data_fingerprint(data)
+    key = (data_key, cache_size)
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_KEY != key:
+            if _POOL is not None:
+                print(f"   🔄 Snapshot data berubah, membuat ulang pool sweep...")
+                _retire(_POOL)
+            print(f"   🚀 Starting sweep pool: {SWEEP_POOL_SIZE} workers ({SWEEP_MP_START})")
+            _POOL = ProcessPoolExecutor(
+                max_workers=SWEEP_POOL_SIZE,
+                mp_context=mp.get_context(SWEEP_MP_START),
+                initializer=_init_worker,
+                initargs=(data, cache_size)
+            )
+            _POOL_KEY = key
+        _POOL_USERS[id(_POOL)] = _POOL_USERS.get(id(_POOL), 0) + 1
+        return _POOL
+
+
+def release_pool(pool):
+    """Lepas pool dari acquire_pool; pool yang sudah diganti di-shutdown saat pemakai terakhir selesai."""
+    with _POOL_LOCK:
+        users = _POOL_USERS.get(id(pool), 0) - 1
+        if users > 0:
+            _POOL_USERS[id(pool)] = users
+            return
+        _POOL_USERS.pop(id(pool), None)
+        if pool is not _POOL:
+            pool.shutdown(wait=False)
+
+
+def _retire(pool):
+    # Dipanggil dengan _POOL_LOCK; pool yang masih dipakai ditutup oleh release_pool terakhir
+    if not _POOL_USERS.get(id(pool)):
+        _POOL_USERS.pop(id(pool), None)
+        pool.shutdown(wait=False)
+
+
+def shutdown_pool():
+    global _POOL, _POOL_KEY
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL = None
+        _POOL_KEY = None
+        _POOL_USERS.clear()
+
+
+atexit.register(shutdown_pool)
+
+
+def run_parallel_sweep(scenarios, data, calibrated_params, stream_seed, workers,
+                       cache_size, duration_hours=8, data_key=None, engine=None, progress=None):
+    """
+    Menjalankan simulate_scenario_physics untuk setiap skenario di pool proses,
+    dengan stream acak truk dari stream_seed (seed, replication) yang sama untuk
+    semua skenario. Perhitungan finansial dilakukan pemanggil di proses utama.
+
+    Pool proses dibagi semua sweep; paling banyak `workers` chunk sweep ini yang
+    berjalan bersamaan (chunk berikutnya dikirim saat ada yang selesai).
+
+    progress (sweep_progress.SweepProgress, opsional) diberi tahu setiap chunk
+    selesai; jika dibatalkan, chunk yang belum dikirim tidak dijalankan dan
+    SweepCancelled diteruskan ke pemanggil.
+
+    Returns:
+        (physics, cache_stats) - physics berurutan sama seperti `scenarios`
+        sehingga seleksi top-3 identik dengan jalur serial.
+    """
+    sweep_id = uuid.uuid4().hex
+    tasks = [
+        (sweep_id, i, scenario, calibrated_params, stream_seed, duration_hours, engine)
+        for i, scenario in enumerate(scenarios)
+    ]
+    results = [None] * len(scenarios)
+    hits = misses = 0
+    # Engine lockstep efisien untuk batch besar: chunk lebih sedikit tapi lebih besar
+    chunksize = max(1, len(tasks) // (workers * (1 if engine == 'lockstep' else 4)))
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+    chunks.reverse()
+    pool = acquire_pool(data, cache_size, data_key)
+    running = set()
+    try:
+        while chunks or running:
+            while chunks and len(running) < workers:
+                running.add(pool.submit(_run_chunk, chunks.pop()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                for index, physics, (h, m) in future.result():
+                    results[index] = physics
+                    hits += h
+                    misses += m
+                    if progress is not None:
+                        progress.advance(scenarios[index], physics, duration_hours)
+            if progress is not None:
+                progress.check()
+    except BaseException:
+        # Chunk yang sedang berjalan dibiarkan selesai di worker, sisanya tidak dikirim
+        for future in running:
+            future.cancel()
+        raise
+    finally:
+        release_pool(pool)
+    total = hits + misses
+    cache_stats = {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': (hits / total) if total > 0 else 0.0,
+        'workers': workers
+    }
+    return results, cache_stats
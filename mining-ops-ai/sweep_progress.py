@@ -0,0 +1,150 @@
+import time
+import threading
+
+# Interval minimum antar event progress (detik); provisional top-3 tetap dikirim saat berubah
+PROGRESS_INTERVAL = 0.5
+
+# Field identitas skenario (sama dengan simulator.SCENARIO_ID_FIELDS)
+_ID_FIELDS = ('alokasi_truk', 'jumlah_excavator', 'target_road_id', 'target_excavator_id', 'target_schedule_id')
+# Field ringkas untuk event provisional
+_SUMMARY_FIELDS = (
+    'rank', 'strategy_objective', 'alokasi_truk', 'jumlah_excavator', 'target_road_id', 'target_excavator_id',
+    'target_schedule_id', 'total_tonase', 'Z_SCORE_PROFIT', 'cycle_time_hours', 'distance_km'
+)
+
+
+class SweepCancelled(Exception):
+    """Sweep dihentikan karena pemanggil membatalkan (mis. client streaming disconnect)."""
+
+
+class SweepProgress:
+    """
+    Pelacak progress sweep strategi untuk endpoint streaming.
+
+    Dipanggil oleh simulate_physics_batch / run_parallel_sweep setiap skenario selesai
+    (advance) dan sebelum skenario berikutnya dimulai (check -> SweepCancelled jika
+    cancel_event di-set). Event dikirim lewat callback(dict):
+      - progress: done/total, ETA, nilai terbaik per objektif
+      - provisional: top-3 sementara setiap kali pilihannya berubah
+      - step: tahap proses (ranking, format hasil, ...)
+
+    Hanya hasil horizon penuh (full_hours) yang dipakai untuk best/provisional,
+    horizon pendek successive halving hanya dihitung sebagai progress.
+    """
+
+    def __init__(self, callback, cancel_event=None, full_hours=8, interval=PROGRESS_INTERVAL):
+        """
+        Args:
+            callback: callable(event dict), dipanggil dari thread yang menjalankan sweep.
+            cancel_event: threading.Event yang di-set pemanggil untuk membatalkan sweep.
+        """
+        self.callback = callback
+        self.cancel_event = cancel_event or threading.Event()
+        self.finalize = None
+        self.rank = None
+        self.target_production = 0.0
+        self.full_hours = full_hours
+        self.interval = interval
+        self.total = 0
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last_emit = 0.0
+        self._results = {}
+        self._top_keys = None
+
+    def bind(self, finalize, rank, target_production=0.0):
+        """
+        Dipanggil get_strategic_recommendations sebelum simulasi dimulai.
+
+        Args:
+            finalize: callable(scenario, physics) -> hasil sweep (finansial + metrik turunan).
+            rank: callable(list hasil) -> top-3 (simulator.select_top_strategies).
+        """
+        self.finalize = finalize
+        self.rank = rank
+        self.target_production = target_production
+        self.started = time.perf_counter()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise SweepCancelled("Sweep dibatalkan")
+
+    def plan(self, total):
+        """Estimasi total simulasi (mode adaptif bisa menambah lewat add_total)."""
+        self.total = max(self.total, int(total))
+
+    def add_total(self, n):
+        # Batch baru: total tumbuh jika melebihi rencana awal
+        self.total = max(self.total, self.done + int(n))
+
+    def step(self, status, message, **extra):
+        event = {'type': 'step', 'status': status, 'message': message}
+        event.update(extra)
+        self.callback(event)
+
+    def advance(self, scenario, physics, duration_hours=None):
+        self.done += 1
+        if physics is not None and self.finalize is not None and (duration_hours or self.full_hours) >= self.full_hours:
+            try:
+                res = self.finalize(scenario, physics)
+                self._results[tuple(res.get(f) for f in _ID_FIELDS)] = res
+                self._update_provisional()
+            except Exception as e:
+                print(f"   ⚠️ Progress: gagal memproses hasil sementara: {e}")
+        self._emit_progress()
+
+    def finish(self):
+        self._emit_progress(force=True)
+
+    def best(self):
+        results = list(self._results.values())
+        if not results:
+            return {}
+        best = {
+            'profit': max(r.get('Z_SCORE_PROFIT', float('-inf')) for r in results),
+            'total_tonase': max(r.get('total_tonase', 0.0) for r in results),
+            'cycle_time_hours': min(r.get('cycle_time_hours', 999) for r in results),
+            'distance_km': min(float(r.get('distance_km', float('inf'))) for r in results)
+        }
+        if self.target_production > 0:
+            best['target_gap_ton'] = min(abs(r.get('total_tonase', 0.0) - self.target_production) for r in results)
+        return best
+
+    def _emit_progress(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_emit < self.interval:
+            return
+        self._last_emit = now
+        elapsed = now - self.started
+        total = max(self.total, self.done)
+        eta = (elapsed / self.done) * (total - self.done) if self.done else None
+        self.callback({
+            'type': 'progress',
+            'done': self.done,
+            'total': total,
+            'elapsed_seconds': round(elapsed, 2),
+            'eta_seconds': round(eta, 2) if eta is not None else None,
+            'best': self.best()
+        })
+
+    def _update_provisional(self):
+        if self.rank is None:
+            return
+        # Salinan dangkal: rank/strategy_objective tidak ditulis ke hasil yang disimpan
+        top = self.rank([dict(r) for r in self._results.values()])
+        keys = [tuple(r.get(f) for f in _ID_FIELDS) for r in top]
+        if keys == self._top_keys:
+            return
+        self._top_keys = keys
+        self.callback({
+            'type': 'provisional',
+            'done': self.done,
+            'top_3': [{f: r.get(f) for f in _SUMMARY_FIELDS} for r in top]
+        })
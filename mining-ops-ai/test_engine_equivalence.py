@@ -0,0 +1,100 @@
+"""
+Test kesetaraan engine simulasi fisik (simpy vs kernel vs lockstep)
+Skenario yang sama dengan stream_seed tetap harus menghasilkan metrik identik di semua
+engine, termasuk mode dispatch per excavator (lockstep meneruskannya ke kernel).
+"""
+import os
+import sys
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import simulator
+
+STREAM_SEED = (20240101, 0)
+DURATION_HOURS = 8
+SCENARIOS = [
+    {'alokasi_truk': 6, 'jumlah_excavator': 1},
+    {'alokasi_truk': 12, 'jumlah_excavator': 2},
+    {'alokasi_truk': 20, 'jumlah_excavator': 3},
+    {'alokasi_truk': 12, 'jumlah_excavator': 3, 'dispatch_policy': 'shortest_queue'},
+    {'alokasi_truk': 15, 'jumlah_excavator': 3, 'dispatch_policy': 'min_expected_wait'},
+    {'alokasi_truk': 9, 'jumlah_excavator': 2, 'dispatch_policy': 'fixed'}
+]
+
+_CONTEXT = {}
+
+
+def setup_context():
+    if not _CONTEXT:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = simulator.get_data_snapshot()
+            _CONTEXT['data'] = data
+            _CONTEXT['calibrated'] = simulator.calibrate_simulation_parameters(data)
+            simulator.ensure_ml_models()
+        roads = data['roads'].index.tolist()
+        excavators = data['excavators'].index.tolist()
+        _CONTEXT['scenarios'] = [
+            dict(base, weatherCondition='Cerah', roadCondition='GOOD', shift='SHIFT_1',
+                 target_road_id=roads[i % len(roads)], target_excavator_id=excavators[0],
+                 target_schedule_id=None, simulation_start_date='2025-11-10T06:00:00')
+            for i, base in enumerate(SCENARIOS)
+        ]
+    return _CONTEXT
+
+
+def run_engine(scenario, engine):
+    ctx = setup_context()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return simulator.simulate_scenario_physics(
+            scenario, ctx['data'], DURATION_HOURS, ctx['calibrated'], None, engine=engine, stream_seed=STREAM_SEED
+        )['metrics']
+
+
+def run_lockstep(scenarios):
+    ctx = setup_context()
+    with contextlib.redirect_stdout(io.StringIO()):
+        physics = simulator.simulate_physics_lockstep(
+            scenarios, ctx['data'], DURATION_HOURS, ctx['calibrated'], None, stream_seed=STREAM_SEED
+        )
+    return [p['metrics'] for p in physics]
+
+
+def assert_same_metrics(expected, actual, label):
+    assert expected.keys() == actual.keys(), f"{label}: kunci metrik berbeda"
+    for key, value in expected.items():
+        assert actual[key] == value, f"{label}: {key} {value!r} != {actual[key]!r}"
+
+
+def test_kernel_matches_simpy():
+    for scenario in setup_context()['scenarios']:
+        label = f"{scenario['alokasi_truk']} truk / {scenario.get('dispatch_policy', 'pooled')}"
+        reference = run_engine(scenario, 'simpy')
+        assert reference['jumlah_siklus_selesai'] > 0, f"{label}: tidak ada siklus selesai"
+        assert_same_metrics(reference, run_engine(scenario, 'kernel'), f"kernel {label}")
+
+
+def test_lockstep_matches_simpy():
+    scenarios = setup_context()['scenarios']
+    for scenario, metrics in zip(scenarios, run_lockstep(scenarios)):
+        label = f"{scenario['alokasi_truk']} truk / {scenario.get('dispatch_policy', 'pooled')}"
+        assert_same_metrics(run_engine(scenario, 'simpy'), metrics, f"lockstep {label}")
+
+
+def main():
+    print("=" * 60)
+    print("TESTING ENGINE EQUIVALENCE (simpy / kernel / lockstep)")
+    print("=" * 60)
+    failed = False
+    for test in (test_kernel_matches_simpy, test_lockstep_matches_simpy):
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"   ❌ {test.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
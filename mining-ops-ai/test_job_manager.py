@@ -0,0 +1,151 @@
+"""
+Test JobManager (job simulasi asinkron)
+Fungsi job palsu func(progress) menggantikan sweep: pembatalan job queued & running,
+timeout, antrian penuh (JobQueueFull), job terputus saat restart, dan satu executor
+untuk submit() konkuren. Database job memakai file sementara.
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import job_manager
+from job_manager import JobManager, JobQueueFull, CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, TIMEOUT
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def blocking_job(release=None, result='ok'):
+    """Fungsi job yang berjalan sampai `release` di-set, sambil memeriksa pembatalan seperti sweep."""
+    def func(progress):
+        while release is None or not release.is_set():
+            progress.check()
+            time.sleep(0.01)
+        return result
+    return func
+
+
+def status(manager, job_id):
+    return manager.get(job_id)['status']
+
+
+def new_manager(folder, **kwargs):
+    kwargs.setdefault('workers', 1)
+    kwargs.setdefault('queue_max', 1)
+    return JobManager(db_path=os.path.join(folder, 'jobs.sqlite3'), **kwargs)
+
+
+def test_queue_full_and_cancel():
+    with tempfile.TemporaryDirectory() as folder:
+        manager = new_manager(folder)
+        release = threading.Event()
+        running = manager.submit('test', blocking_job(release))['id']
+        assert wait_for(lambda: status(manager, running) == RUNNING)
+        queued = manager.submit('test', blocking_job(release))['id']
+        assert status(manager, queued) == QUEUED
+        assert manager.get(queued)['queue_position'] == 1
+
+        try:
+            manager.submit('test', blocking_job(release))
+            raise AssertionError("submit ketiga seharusnya JobQueueFull")
+        except JobQueueFull:
+            pass
+
+        # Job queued langsung selesai tanpa pernah dijalankan
+        assert manager.cancel(queued)['status'] == CANCELLED
+        assert manager.get(queued)['started_at'] is None
+
+        # Job running berhenti di progress.check() berikutnya
+        manager.cancel(running)
+        assert wait_for(lambda: status(manager, running) == CANCELLED)
+
+        # Slot kembali tersedia setelah pembatalan
+        release.set()
+        done = manager.submit('test', blocking_job(release, result={'top_3': []}))['id']
+        assert wait_for(lambda: status(manager, done) == SUCCEEDED)
+        assert manager.get(done)['result'] == {'top_3': []}
+        manager.shutdown()
+
+
+def test_timeout():
+    with tempfile.TemporaryDirectory() as folder:
+        manager = new_manager(folder, timeout_seconds=0.2)
+        job_id = manager.submit('test', blocking_job())['id']
+        assert wait_for(lambda: status(manager, job_id) == TIMEOUT)
+        assert 'batas waktu' in manager.get(job_id)['error']
+        manager.shutdown()
+
+
+def test_interrupted_jobs_marked_failed_on_restart():
+    with tempfile.TemporaryDirectory() as folder:
+        manager = new_manager(folder)
+        release = threading.Event()
+        running = manager.submit('test', blocking_job(release))['id']
+        assert wait_for(lambda: status(manager, running) == RUNNING)
+        queued = manager.submit('test', blocking_job(release))['id']
+
+        # Manager baru pada database yang sama = server restart
+        restarted = new_manager(folder)
+        for job_id in (running, queued):
+            job = restarted.get(job_id)
+            assert job['status'] == FAILED, job
+            assert 'restart' in job['error']
+        release.set()
+        manager.shutdown()
+
+
+def test_concurrent_submit_single_executor():
+    created = []
+
+    class CountingExecutor(job_manager.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)  # perlebar jendela race
+            super().__init__(*args, **kwargs)
+
+    original = job_manager.ThreadPoolExecutor
+    job_manager.ThreadPoolExecutor = CountingExecutor
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            manager = new_manager(folder, workers=4, queue_max=8)
+            release = threading.Event()
+            threads = [threading.Thread(target=manager.submit, args=('test', blocking_job(release)))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            release.set()
+            assert len(created) == 1, f"{len(created)} executor dibuat"
+            manager.shutdown()
+    finally:
+        job_manager.ThreadPoolExecutor = original
+
+
+def main():
+    print("=" * 60)
+    print("TESTING JOB MANAGER (cancel / timeout / queue full / restart)")
+    print("=" * 60)
+    failed = False
+    for test in (test_queue_full_and_cancel, test_timeout, test_interrupted_jobs_marked_failed_on_restart,
+                 test_concurrent_submit_single_executor):
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"   ❌ {test.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Quick Test: Re-pricing hasil sweep tanpa simulasi ulang
+Sweep ber-seed, lalu reprice_physical_results pada parameter sweep itu sendiri dan pada
+satu harga yang diubah. Strategi & profit harus sama dengan sweep penuh pada parameter tsb.
+"""
+
+import sys
+import contextlib
+import io
+from simulator import get_strategic_recommendations, reprice_physical_results, SCENARIO_ID_FIELDS
+
+SEED = 11
+CHANGED_PRICE = {'HargaSolar': 20000}
+
+FIXED_CONDITIONS = {
+    "weatherCondition": "Cerah",
+    "roadCondition": "GOOD",
+    "shift": "SHIFT_1",
+    "target_road_id": None,
+    "target_excavator_id": None,
+    "target_schedule_id": None,
+    "simulation_start_date": "2025-11-10T00:00:00"
+}
+
+DECISION_VARIABLES = {
+    "min_trucks": 5,
+    "max_trucks": 8,
+    "min_excavators": 1,
+    "max_excavators": 2
+}
+
+
+def run_sweep(params):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return get_strategic_recommendations(
+            FIXED_CONDITIONS, DECISION_VARIABLES, params, {'seed': SEED, 'engine': 'kernel'}
+        )
+
+
+def reprice(key, price_point):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return reprice_physical_results(key, [price_point])['grid'][0]['strategies']
+
+
+def strategy_summary(strategies):
+    return [tuple(s[f] for f in SCENARIO_ID_FIELDS) + (float(s['Z_SCORE_PROFIT']),) for s in strategies[:3]]
+
+
+def test_reprice_matches_full_sweep():
+    base = run_sweep(None)
+    key = base[0]['sweep_report']['physical_key']
+    same = reprice(key, {})
+    changed = reprice(key, CHANGED_PRICE)
+
+    assert strategy_summary(same) == strategy_summary(base), "reprice pada parameter sweep != sweep"
+    full = run_sweep(CHANGED_PRICE)
+    assert strategy_summary(changed) == strategy_summary(full), f"reprice {CHANGED_PRICE} != sweep penuh"
+    return base, full
+
+
+def main():
+    print("=" * 80)
+    print("💱 RE-PRICING VALIDATION (reprice_physical_results vs sweep penuh)")
+    print("=" * 80)
+    try:
+        base, full = test_reprice_matches_full_sweep()
+        for label, strategies in (("default", base), (str(CHANGED_PRICE), full)):
+            print(f"\n   {label}:")
+            for s in strategies[:3]:
+                print(f"   - {s['alokasi_truk']} truk / {s['jumlah_excavator']} exc @ {s['target_road_id']}: "
+                      f"profit {s['Z_SCORE_PROFIT']:,.0f}")
+        print("\n✅ Re-pricing identik dengan sweep penuh")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
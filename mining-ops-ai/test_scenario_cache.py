@@ -0,0 +1,117 @@
+"""
+Test ScenarioResultCache (cache hasil fisik per skenario)
+LRU eviction, baca ulang dari disk (setelah restart), isolasi deepcopy, pruning file
+disk, dan kunci cache simulate_physics_batch yang berubah bila seed/replication berubah.
+"""
+import os
+import sys
+import tempfile
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from scenario_cache import ScenarioResultCache
+
+
+def physics(n):
+    return {'metrics': {'total_tonase': float(n), 'jumlah_siklus_selesai': n}, 'used_truck_ids': [f"T{n}"]}
+
+
+def test_lru_eviction():
+    cache = ScenarioResultCache(maxsize=2, folder='')
+    cache.put('a', physics(1))
+    cache.put('b', physics(2))
+    assert cache.get('a') is not None  # 'a' jadi paling baru dipakai
+    cache.put('c', physics(3))
+    assert cache.get('b') is None, "entri least-recently-used seharusnya dibuang"
+    assert cache.get('a')['metrics']['total_tonase'] == 1.0
+    assert cache.get('c')['metrics']['total_tonase'] == 3.0
+    assert cache.evictions == 1 and len(cache) == 2
+
+
+def test_deepcopy_isolation():
+    cache = ScenarioResultCache(maxsize=4, folder='')
+    value = physics(5)
+    cache.put('k', value)
+    value['metrics']['total_tonase'] = -1.0  # ubah objek asli setelah put
+    first = cache.get('k')
+    first['metrics']['total_tonase'] = -2.0  # ubah hasil get (seperti tahap finalisasi)
+    first['used_truck_ids'].append('X')
+    second = cache.get('k')
+    assert second['metrics']['total_tonase'] == 5.0
+    assert second['used_truck_ids'] == ['T5']
+
+
+def test_disk_read_back():
+    with tempfile.TemporaryDirectory() as folder:
+        ScenarioResultCache(maxsize=4, folder=folder).put('k', physics(7))
+        restarted = ScenarioResultCache(maxsize=4, folder=folder)
+        assert len(restarted) == 0
+        value = restarted.get('k')
+        assert value == physics(7)
+        assert restarted.disk_hits == 1 and len(restarted) == 1
+        assert restarted.get('missing') is None and restarted.misses == 1
+
+
+def test_disk_pruning():
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ScenarioResultCache(maxsize=5, folder=folder)
+        for n in range(100):  # pruning berjalan tiap 100 put
+            cache.put(f"k{n}", physics(n))
+        files = [f for f in os.listdir(folder) if f.endswith('.pkl')]
+        assert len(files) == 5, f"{len(files)} file tersisa"
+        assert not [f for f in os.listdir(folder) if f.endswith('.tmp')]
+
+
+def test_batch_key_depends_on_seed_and_replication():
+    import simulator
+
+    class RecordingCache(ScenarioResultCache):
+        def __init__(self):
+            super().__init__(maxsize=100, folder='')
+            self.keys = []
+
+        def get(self, key):
+            self.keys.append(key)
+            return super().get(key)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = simulator.get_data_snapshot()
+        calibrated = simulator.calibrate_simulation_parameters(data)
+    scenario = {
+        'weatherCondition': 'Cerah', 'roadCondition': 'GOOD', 'shift': 'SHIFT_1',
+        'alokasi_truk': 5, 'jumlah_excavator': 1,
+        'target_road_id': data['roads'].index[0], 'target_excavator_id': data['excavators'].index[0],
+        'target_schedule_id': None, 'simulation_start_date': '2025-11-10T06:00:00'
+    }
+    original = simulator.SCENARIO_CACHE
+    simulator.SCENARIO_CACHE = cache = RecordingCache()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for seed, replication in ((1, 0), (2, 0), (1, 1), (1, 0)):
+                simulator.simulate_physics_batch([scenario], data, calibrated, engine='kernel',
+                                                 seed=seed, replication=replication)
+    finally:
+        simulator.SCENARIO_CACHE = original
+    assert len(set(cache.keys[:3])) == 3, "seed/replication berbeda harus memakai kunci berbeda"
+    assert cache.keys[3] == cache.keys[0] and cache.hits == 1, "seed & replication sama harus hit cache"
+
+
+def main():
+    print("=" * 60)
+    print("TESTING SCENARIO RESULT CACHE")
+    print("=" * 60)
+    failed = False
+    for test in (test_lru_eviction, test_deepcopy_isolation, test_disk_read_back, test_disk_pruning,
+                 test_batch_key_depends_on_seed_and_replication):
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except AssertionError as e:
+            print(f"   ❌ {test.__name__}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
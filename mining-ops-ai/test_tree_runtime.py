@@ -0,0 +1,101 @@
+"""
+Test CompiledForest (tree_runtime) vs pipeline sklearn
+Fit RF kecil dengan layout kolom train_pipeline, kompilasi, lalu bandingkan
+predict / predict_proba (termasuk kategori yang tidak dikenal dan save/load .npz)
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from feature_store import NUMERICAL_FEATURES, CATEGORICAL_FEATURES
+from tree_runtime import CompiledForest, compile_pipeline
+
+CATEGORY_VALUES = {
+    'weatherCondition': ['Cerah', 'Hujan Ringan', 'Hujan Lebat'],
+    'roadCondition': ['GOOD', 'FAIR', 'POOR'],
+    'shift': ['SHIFT_1', 'SHIFT_2', 'SHIFT_3'],
+    'truck_brand': ['CAT', 'KOMATSU', 'VOLVO', 'HITACHI'],
+    'excavator_model': ['PC2000', 'EX1200', '6015B']
+}
+
+
+def make_frame(n, seed, unseen=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.uniform(0, 100, n) for col in NUMERICAL_FEATURES})
+    for col in CATEGORICAL_FEATURES:
+        values = CATEGORY_VALUES[col] + (['UNSEEN'] if unseen else [])
+        df[col] = rng.choice(values, n)
+    return df[NUMERICAL_FEATURES + CATEGORICAL_FEATURES]
+
+
+def make_pipeline(model):
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', 'passthrough', NUMERICAL_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=False), CATEGORICAL_FEATURES)
+        ],
+        remainder='drop'
+    )
+    return Pipeline(steps=[('preprocessor', preprocessor), ('model', model)])
+
+
+def targets(X):
+    noise = np.random.default_rng(7).normal(0, 5, len(X))
+    y = X['distance'] * 2 + X['truck_capacity'] + (X['weatherCondition'] == 'Hujan Lebat') * 40 + noise
+    return y, y > y.median()
+
+
+def roundtrip(compiled):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'model.npz')
+        compiled.save(path)
+        return CompiledForest.load(path)
+
+
+def test_regressor_matches_sklearn():
+    X = make_frame(400, 1)
+    y, _ = targets(X)
+    pipeline = make_pipeline(RandomForestRegressor(n_estimators=15, max_depth=8, random_state=42)).fit(X, y)
+    compiled = compile_pipeline(pipeline)
+    X_test = make_frame(300, 2, unseen=True)
+    expected = pipeline.predict(X_test)
+    assert np.allclose(compiled.predict(X_test), expected)
+    assert np.allclose(roundtrip(compiled).predict(X_test), expected)
+
+
+def test_classifier_matches_sklearn():
+    X = make_frame(400, 3)
+    _, label = targets(X)
+    pipeline = make_pipeline(RandomForestClassifier(n_estimators=15, max_depth=6, random_state=42)).fit(X, label)
+    compiled = compile_pipeline(pipeline)
+    X_test = make_frame(300, 4, unseen=True)
+    assert list(compiled.classes_) == list(pipeline.classes_)
+    assert np.allclose(compiled.predict_proba(X_test), pipeline.predict_proba(X_test))
+    assert np.array_equal(compiled.predict(X_test), pipeline.predict(X_test))
+    assert np.allclose(roundtrip(compiled).predict_proba(X_test), pipeline.predict_proba(X_test))
+
+
+def main():
+    print("=" * 60)
+    print("TESTING COMPILED FOREST (tree_runtime) VS SKLEARN")
+    print("=" * 60)
+    failed = False
+    for test in (test_regressor_matches_sklearn, test_classifier_matches_sklearn):
+        try:
+            test()
+            print(f"   ✅ {test.__name__}")
+        except AssertionError:
+            print(f"   ❌ {test.__name__}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
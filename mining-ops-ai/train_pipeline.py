@@ -12,6 +12,12 @@ from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from database import fetch_dataframe, get_engine
+from feature_store import (
+    NUMERICAL_FEATURES, CATEGORICAL_FEATURES, DEFAULT_DAYS_SINCE_MAINTENANCE,
+    extract_operator_experience, truck_age_days, days_since_last_maintenance,
+    build_maintenance_index, to_utc_ns
+)
+from tree_runtime import export_compiled_models
 
 warnings.filterwarnings('ignore')
 
@@ -21,15 +27,6 @@ MODEL_FOLDER = 'models'
 os.makedirs(DATA_FOLDER, exist_ok=True)
 os.makedirs(MODEL_FOLDER, exist_ok=True)
 
-def extract_operator_experience(competency_json):
-    if pd.isna(competency_json) or competency_json == '':
-        return 0
-    try:
-        data = json.loads(competency_json)
-        return data.get('years_experience', 0)
-    except:
-        return 0
-
 def run_daily_training():
     print(f"[{datetime.now()}] 🔄 Memulai Training Harian dengan Data Real-time dari Database...")
     
@@ -114,34 +111,25 @@ def run_daily_training():
         print("\n🔧 Processing and engineering features...")
         
         df_hauling['loadingStartTime'] = pd.to_datetime(df_hauling['loadingStartTime'])
-        df_hauling['truck_purchase_date'] = pd.to_datetime(df_hauling['truck_purchase_date'], errors='coerce')
         
-        df_hauling['truck_age_days'] = (
-            df_hauling['loadingStartTime'] - df_hauling['truck_purchase_date']
-        ).dt.days
-        df_hauling['truck_age_days'] = df_hauling['truck_age_days'].fillna(365).clip(lower=0)
+        # Definisi fitur dipakai bersama dengan simulator (feature_store)
+        activity_ns = [to_utc_ns(t) for t in df_hauling['loadingStartTime']]
+        purchase_dates = pd.to_datetime(df_hauling['truck_purchase_date'], errors='coerce', utc=True)
+        df_hauling['truck_age_days'] = [
+            truck_age_days(None if pd.isna(p) else p.value, t_ns)
+            for p, t_ns in zip(purchase_dates, activity_ns)
+        ]
         
         df_hauling['operator_experience_years'] = df_hauling['operator_competency'].apply(extract_operator_experience)
         
-        df_hauling['days_since_last_maintenance'] = 365
+        df_hauling['days_since_last_maintenance'] = DEFAULT_DAYS_SINCE_MAINTENANCE
         
         if not df_maintenance.empty:
-            df_maintenance['completionDate'] = pd.to_datetime(df_maintenance['completionDate'])
-            df_maintenance = df_maintenance.sort_values('completionDate')
-            
-            for idx, row in df_hauling.iterrows():
-                truck_id = row['truckId']
-                activity_date = row['loadingStartTime']
-                
-                truck_maint = df_maintenance[
-                    (df_maintenance['truckId'] == truck_id) &
-                    (df_maintenance['completionDate'] < activity_date)
-                ]
-                
-                if not truck_maint.empty:
-                    last_maint_date = truck_maint.iloc[-1]['completionDate']
-                    days_diff = (activity_date - last_maint_date).days
-                    df_hauling.at[idx, 'days_since_last_maintenance'] = max(0, days_diff)
+            maintenance_ns = build_maintenance_index(df_maintenance)
+            df_hauling['days_since_last_maintenance'] = [
+                days_since_last_maintenance(maintenance_ns.get(truck_id), t_ns)
+                for truck_id, t_ns in zip(df_hauling['truckId'], activity_ns)
+            ]
         
         print("   ✅ Feature engineering completed")
         
@@ -159,24 +147,8 @@ def run_daily_training():
         df_hauling['distance'] = df_hauling['distance'].fillna(df_hauling['distance'].median())
         df_hauling['road_gradient'] = df_hauling['road_gradient'].fillna(0)
         
-        numerical_features = [
-            'truck_capacity',
-            'excavator_bucket_capacity',
-            'operator_rating',
-            'operator_experience_years',
-            'distance',
-            'road_gradient',
-            'truck_age_days',
-            'days_since_last_maintenance'
-        ]
-        
-        categorical_features = [
-            'weatherCondition',
-            'roadCondition',
-            'shift',
-            'truck_brand',
-            'excavator_model'
-        ]
+        numerical_features = list(NUMERICAL_FEATURES)
+        categorical_features = list(CATEGORICAL_FEATURES)
         
         for col in numerical_features:
             df_hauling[col] = pd.to_numeric(df_hauling[col], errors='coerce').fillna(0)
@@ -358,6 +330,9 @@ def run_daily_training():
         with open(os.path.join(MODEL_FOLDER, 'categorical_columns.json'), 'w') as f:
             json.dump(categorical_features, f)
         
+        print("\n🔧 Compiling models for serving runtime...")
+        export_compiled_models(MODEL_FOLDER, X_verify=X_test.head(1000))
+        
         print("\n" + "="*70)
         print("✅ TRAINING PIPELINE SELESAI!")
         print("="*70)
@@ -0,0 +1,275 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.preprocessing import OneHotEncoder, FunctionTransformer
+
+# Nama file model (tanpa ekstensi) yang dipakai simulator
+MODEL_NAMES = [
+    'model_fuel',
+    'model_fuel_real',
+    'model_load_weight',
+    'model_tonase',
+    'model_delay_probability',
+    'model_risiko'
+]
+
+COMPILED_EXT = '.npz'
+DEFAULT_VERIFY_TOLERANCE = 1e-9
+
+
+class CompiledForest:
+    """
+    Random forest hasil kompilasi pipeline sklearn (ColumnTransformer + OneHotEncoder + RF)
+    ke array NumPy datar. Semua pohon digabung dalam satu array node; akar tiap pohon
+    disimpan di `roots`.
+
+    Kolom kategori tidak di-one-hot: nilai diubah ke kode integer per kolom, dan node
+    yang memecah kolom one-hot menjadi node kesetaraan kategori (node_category).
+    Node daun menunjuk ke dirinya sendiri sehingga traversal cukup diulang max_depth kali.
+
+    Interface predict / predict_proba sama dengan pipeline aslinya.
+    """
+
+    def __init__(self, meta, feature, threshold, node_category, left, right, values, roots):
+        self.kind = meta['kind']
+        self.columns = meta['columns']
+        self.numerical_columns = meta['numerical_columns']
+        self.categorical_columns = meta['categorical_columns']
+        self.categories = meta['categories']
+        self.classes_ = np.array(meta.get('classes', []))
+        self.max_depth = int(meta['max_depth'])
+        self.meta = meta
+
+        self.feature = feature
+        self.threshold = threshold
+        self.node_category = node_category
+        self.left = left
+        self.right = right
+        self.values = values
+        self.roots = roots
+        self._category_codes = [{c: k for k, c in enumerate(cats)} for cats in self.categories]
+        self._num_pos = None
+        self._cat_pos = None
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def encode(self, X):
+        """
+        Feature matrix -> float64 array (n, n_num + n_cat).
+        Nilai numerik di-cast ke float32 seperti sklearn; kategori jadi kode integer (-1 = unknown).
+        X boleh DataFrame (kolom by name) atau list/array baris dalam urutan self.columns.
+        """
+        n_num = len(self.numerical_columns)
+        n_cat = len(self.categorical_columns)
+        if isinstance(X, pd.DataFrame):
+            num = X[self.numerical_columns].to_numpy(dtype=np.float64) if n_num else np.empty((len(X), 0))
+            cat_cols = [X[c].tolist() for c in self.categorical_columns]
+            n = len(X)
+        else:
+            if self._num_pos is None:
+                pos = {c: i for i, c in enumerate(self.columns)}
+                self._num_pos = [pos[c] for c in self.numerical_columns]
+                self._cat_pos = [pos[c] for c in self.categorical_columns]
+            rows = X if isinstance(X, list) else list(X)
+            n = len(rows)
+            num = np.array([[r[i] for i in self._num_pos] for r in rows], dtype=np.float64).reshape(n, n_num)
+            cat_cols = [[r[i] for r in rows] for i in self._cat_pos]
+
+        out = np.empty((n, n_num + n_cat), dtype=np.float64)
+        out[:, :n_num] = num.astype(np.float32)
+        for j, (values, codes) in enumerate(zip(cat_cols, self._category_codes)):
+            out[:, n_num + j] = [codes.get(v, -1) for v in values]
+        return out
+
+    def _leaf_index(self, Xe):
+        n = Xe.shape[0]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        rows = np.arange(n)[:, None]
+        for _ in range(self.max_depth):
+            f = self.feature[node]
+            x = Xe[rows, f]
+            cat = self.node_category[node]
+            x = np.where(cat >= 0, (x == cat).astype(np.float64), x)
+            node = np.where(x <= self.threshold[node], self.left[node], self.right[node])
+        return node
+
+    def predict(self, X):
+        leaves = self._leaf_index(self.encode(X))
+        if self.kind == 'regressor':
+            return self.values[leaves, 0].mean(axis=1)
+        proba = self.values[leaves].mean(axis=1)
+        return self.classes_[np.argmax(proba, axis=1)]
+
+    def predict_proba(self, X):
+        if self.kind != 'classifier':
+            raise AttributeError("predict_proba hanya tersedia untuk classifier")
+        leaves = self._leaf_index(self.encode(X))
+        return self.values[leaves].mean(axis=1)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            meta=np.array(json.dumps(self.meta)),
+            feature=self.feature,
+            threshold=self.threshold,
+            node_category=self.node_category,
+            left=self.left,
+            right=self.right,
+            values=self.values,
+            roots=self.roots
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z['meta']))
+            return cls(meta, z['feature'], z['threshold'], z['node_category'],
+                       z['left'], z['right'], z['values'], z['roots'])
+
+
+def _is_passthrough(transformer):
+    # Setelah fit, 'passthrough' diganti FunctionTransformer tanpa fungsi
+    if isinstance(transformer, str):
+        return transformer == 'passthrough'
+    return isinstance(transformer, FunctionTransformer) and transformer.func is None
+
+
+def compile_pipeline(pipeline):
+    """Kompilasi Pipeline(preprocessor, RandomForest*) hasil train_pipeline menjadi CompiledForest."""
+    preprocessor = pipeline.named_steps['preprocessor']
+    forest = pipeline.named_steps['model']
+
+    numerical_columns, categorical_columns, categories = [], [], []
+    for name, transformer, cols in preprocessor.transformers_:
+        if isinstance(transformer, str) and transformer == 'drop':
+            continue
+        if _is_passthrough(transformer):
+            numerical_columns.extend(cols)
+        elif isinstance(transformer, OneHotEncoder):
+            if transformer.drop is not None or getattr(transformer, 'infrequent_categories_', None) is not None and any(
+                    c is not None for c in transformer.infrequent_categories_):
+                raise ValueError("OneHotEncoder dengan drop/infrequent categories tidak didukung")
+            categorical_columns.extend(cols)
+            categories.extend([c.tolist() for c in transformer.categories_])
+        else:
+            raise ValueError(f"Transformer '{name}' tidak didukung oleh tree_runtime")
+
+    # Indeks kolom hasil transformasi -> (kolom input, kode kategori atau -1)
+    n_num = len(numerical_columns)
+    column_map = [(i, -1) for i in range(n_num)]
+    for j, cats in enumerate(categories):
+        column_map.extend((n_num + j, k) for k in range(len(cats)))
+    column_map = np.array(column_map, dtype=np.int64)
+
+    kind = 'classifier' if hasattr(forest, 'classes_') else 'regressor'
+    features, thresholds, node_cats, lefts, rights, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in forest.estimators_:
+        tree = est.tree_
+        n_nodes = tree.node_count
+        is_leaf = tree.children_left < 0
+        idx = np.arange(n_nodes)
+
+        tf = np.where(is_leaf, 0, tree.feature)
+        features.append(np.where(is_leaf, 0, column_map[tf, 0]))
+        node_cats.append(np.where(is_leaf, -1, column_map[tf, 1]))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+        lefts.append(np.where(is_leaf, idx, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, idx, tree.children_right) + offset)
+
+        if kind == 'regressor':
+            values.append(tree.value[:, 0, :1].astype(np.float64))
+        else:
+            v = tree.value[:, 0, :].astype(np.float64)
+            values.append(v / np.maximum(v.sum(axis=1, keepdims=True), 1e-300))
+
+        roots.append(offset)
+        offset += n_nodes
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    meta = {
+        'kind': kind,
+        'columns': list(numerical_columns) + list(categorical_columns),
+        'numerical_columns': list(numerical_columns),
+        'categorical_columns': list(categorical_columns),
+        'categories': categories,
+        'max_depth': max_depth
+    }
+    if kind == 'classifier':
+        meta['classes'] = [c.item() if hasattr(c, 'item') else c for c in forest.classes_]
+
+    return CompiledForest(
+        meta,
+        np.concatenate(features).astype(np.int32),
+        np.concatenate(thresholds).astype(np.float64),
+        np.concatenate(node_cats).astype(np.int32),
+        np.concatenate(lefts).astype(np.int32),
+        np.concatenate(rights).astype(np.int32),
+        np.concatenate(values),
+        np.array(roots, dtype=np.int32)
+    )
+
+
+def verify_compiled(pipeline, compiled, X):
+    """Selisih absolut maksimum antara output pipeline sklearn dan CompiledForest pada X."""
+    if compiled.kind == 'classifier':
+        expected = pipeline.predict_proba(X)
+        actual = compiled.predict_proba(X)
+    else:
+        expected = pipeline.predict(X)
+        actual = compiled.predict(X)
+    return float(np.max(np.abs(np.asarray(expected, dtype=np.float64) - actual))) if len(X) else 0.0
+
+
+def compiled_path(model_folder, name):
+    return os.path.join(model_folder, name + COMPILED_EXT)
+
+
+def export_compiled_models(model_folder, X_verify=None, tolerance=DEFAULT_VERIFY_TOLERANCE):
+    """
+    Kompilasi semua model_*.joblib di model_folder menjadi artefak .npz.
+    Jika X_verify diberikan, artefak hanya disimpan bila output identik (dalam toleransi).
+    """
+    exported = {}
+    for name in MODEL_NAMES:
+        src = os.path.join(model_folder, name + '.joblib')
+        if not os.path.exists(src):
+            continue
+        try:
+            pipeline = joblib.load(src)
+            compiled = compile_pipeline(pipeline)
+            if X_verify is not None:
+                err = compiled.meta['verify_max_abs_error'] = verify_compiled(pipeline, compiled, X_verify)
+                if err > tolerance:
+                    print(f"   ⚠️ {name}: compiled output berbeda {err:.2e} > {tolerance:.0e}, artefak tidak disimpan")
+                    continue
+            compiled.save(compiled_path(model_folder, name))
+            exported[name] = compiled
+            print(f"   ✅ Compiled {name}: {compiled.n_estimators} trees, {len(compiled.feature)} nodes")
+        except Exception as e:
+            print(f"   ⚠️ Gagal kompilasi {name}: {e}")
+    return exported
+
+
+def load_model(model_folder, name, prefer_compiled=True):
+    """
+    Muat model untuk serving. Artefak .npz dipakai jika ada dan tidak lebih tua
+    dari .joblib-nya; selain itu fallback ke pipeline joblib.
+    """
+    src = os.path.join(model_folder, name + '.joblib')
+    npz = compiled_path(model_folder, name)
+    if prefer_compiled and os.path.exists(npz):
+        if not os.path.exists(src) or os.path.getmtime(npz) >= os.path.getmtime(src):
+            return CompiledForest.load(npz)
+    return joblib.load(src)
+
+
+if __name__ == '__main__':
+    MODEL_FOLDER = 'models'
+    print(f"🔧 Compiling models in '{MODEL_FOLDER}'...")
+    export_compiled_models(MODEL_FOLDER)
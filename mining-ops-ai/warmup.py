@@ -0,0 +1,133 @@
+import os
+import time
+import threading
+from datetime import datetime
+
+# Jeda minimum sebelum komponen yang gagal dicoba lagi (dipicu oleh request)
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class WarmupManager:
+    """
+    Warmup komponen server di background setelah proses start.
+
+    Setiap komponen punya fungsi load tanpa argumen dan daftar dependensi.
+    Komponen dijalankan di thread masing-masing; komponen menunggu dependensinya
+    siap dulu, dan ikut gagal jika dependensinya gagal. Status per komponen
+    (state, durasi, error) tersedia lewat status() untuk endpoint /ready.
+    Komponen optional (mis. LLM) tetap dilaporkan, tapi tidak ikut menentukan 'ready'.
+    """
+
+    def __init__(self, retry_seconds=WARMUP_RETRY_SECONDS):
+        self.retry_seconds = retry_seconds
+        self._components = {}
+        self._lock = threading.Lock()
+        self._started_at = None
+
+    def register(self, name, func, depends_on=(), optional=False):
+        self._components[name] = {
+            'func': func,
+            'depends_on': list(depends_on),
+            'optional': optional,
+            'state': PENDING,
+            'error': None,
+            'started_at': None,
+            'finished_at': None,
+            'seconds': None,
+            'attempts': 0,
+            'done': threading.Event()
+        }
+
+    def start(self):
+        """Jalankan semua komponen yang belum mulai di background (tidak blocking)."""
+        self._started_at = time.monotonic()
+        for name in self._components:
+            self._spawn(name)
+
+    def _spawn(self, name):
+        comp = self._components[name]
+        with self._lock:
+            if comp['state'] in (LOADING, READY):
+                return False
+            comp['state'] = LOADING
+            comp['done'].clear()
+        threading.Thread(target=self._run, args=(name,), name=f"warmup-{name}", daemon=True).start()
+        return True
+
+    def _run(self, name):
+        comp = self._components[name]
+        comp['attempts'] += 1
+        try:
+            for dep in comp['depends_on']:
+                self._components[dep]['done'].wait()
+                if self._components[dep]['state'] != READY:
+                    raise RuntimeError(f"dependensi '{dep}' gagal")
+            comp['started_at'] = datetime.now().isoformat()
+            start = time.perf_counter()
+            comp['func']()
+            comp['seconds'] = round(time.perf_counter() - start, 4)
+            comp['error'] = None
+            comp['state'] = READY
+            print(f"   ✅ Warmup '{name}' siap ({comp['seconds']:.2f}s)")
+        except Exception as e:
+            comp['error'] = str(e)
+            comp['state'] = FAILED
+            print(f"   ⚠️ Warmup '{name}' gagal: {e}")
+        finally:
+            comp['finished_at'] = time.monotonic()
+            comp['done'].set()
+
+    def missing(self, *names):
+        """Komponen (dari names) yang belum READY. Komponen gagal dicoba ulang di background."""
+        not_ready = []
+        for name in names:
+            comp = self._components[name]
+            if comp['state'] == READY:
+                continue
+            if comp['state'] == FAILED and time.monotonic() - comp['finished_at'] >= self.retry_seconds:
+                # Ulangi juga dependensi yang gagal
+                for dep in comp['depends_on']:
+                    self.missing(dep)
+                self._spawn(name)
+            not_ready.append(name)
+        return not_ready
+
+    def required(self):
+        """Nama komponen inti (non-optional)."""
+        return tuple(name for name, comp in self._components.items() if not comp['optional'])
+
+    def is_ready(self, *names):
+        return not self.missing(*(names or self.required()))
+
+    def wait(self, names=None, timeout=None):
+        """Blok sampai komponen selesai (siap atau gagal). True jika semua READY."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in (names or list(self._components)):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self._components[name]['done'].wait(remaining)
+        return all(self._components[n]['state'] == READY for n in (names or self._components))
+
+    def status(self):
+        components = {
+            name: {
+                'state': comp['state'],
+                'seconds': comp['seconds'],
+                'started_at': comp['started_at'],
+                'attempts': comp['attempts'],
+                'depends_on': comp['depends_on'],
+                'optional': comp['optional'],
+                'error': comp['error']
+            }
+            for name, comp in self._components.items()
+        }
+        return {
+            'ready': all(components[name]['state'] == READY for name in self.required()),
+            'optional': [name for name, c in components.items() if c['optional']],
+            'uptime_seconds': round(time.monotonic() - self._started_at, 2) if self._started_at else None,
+            'components': components
+        }